@@ -59,7 +59,7 @@ import logging
 import Libs.Prism_Fusion_lib_Fus as Fus
 import Libs.Prism_Fusion_lib_Helper as Helper
 
-from PrismUtils.Decorators import err_catcher as err_catcher
+from Libs.Prism_Fusion_lib_Profiler import err_catcher
 
 from typing import TYPE_CHECKING, Any, Literal
 if TYPE_CHECKING:
@@ -100,6 +100,9 @@ def createUsdScene(plugin, origin, UUID):
     flow.SetPos(uMerge, usdTool_x + 2, usdTool_y)
     flow.SetPos(uRender, usdTool_x + 4, usdTool_y)
 
+    #   AddTool, ConnectInput and SetPos for both tools
+    Fus.countOps(6)
+
 
 def create3dScene(plugin, origin, UUID):
 
@@ -125,6 +128,9 @@ def create3dScene(plugin, origin, UUID):
     flow.SetPos(merge3d, fbxTool_x + 2, fbxTool_y)
     flow.SetPos(render3d, fbxTool_x + 4, fbxTool_y)
 
+    #   AddTool, ConnectInput and SetPos for both tools
+    Fus.countOps(6)
+
 
 abc_options = {
     "Points": True,
@@ -395,6 +401,7 @@ def createLegacy3DScene(origin:Legacy3D_ImportClass, comp:Composition_, flow:Flo
                 newx = x+(atx-fstnx)
                 newy = y+(aty-fstny)
                 flow.SetPos(tool, newx-1, newy)
+                Fus.countOps()
 
     ##########
    
@@ -493,7 +500,7 @@ def deleteTools(comp:Composition_, stateUID:str):
     print("stateTools: \n", stateTools)
     for tool in stateTools:
         try:
-            tool.Delete()
+            Fus.deleteTool(comp, tool)
             if tool.GetData("Prism_UUID"):
                 pass
                 # CompDb.removeNodeFromDB(comp, "import3d", tool.GetData("Prism_UUID"), saveDB=False, aggregateData=aggregateData)
@@ -514,25 +521,14 @@ def deleteTools(comp:Composition_, stateUID:str):
 def getAllNodes(comp:Composition_) -> dict:
     # cpData = CompDb.loadPrismFileDb(comp)
     # stateTypes:list[str] = getNodeStateTypes(comp)
-    nodes: dict = {}
-    for l in comp.GetToolList(False).values():
-        uuid = l.GetData("Prism_UUID")
-        tool_data = l.GetData("Prism_ToolData")
-
-        if uuid and isinstance(tool_data, dict) and tool_data.get("stateUID"):
-            nodes[uuid] = l
+    nodes: dict = Fus.getStateToolsByUID(comp)
 
     return nodes
 
 
 def getStateNodesList(comp:Composition_, stuid:str) -> list[str]:
     # Get a list of the state nodes UIDS
-    tools: list[str] = []
-    for l in comp.GetToolList(False).values():
-        uuid = l.GetData("Prism_UUID")
-        tool_data = l.GetData("Prism_ToolData")
-        if uuid and tool_data and tool_data.get("stateUID") == stuid:
-            tools.append(uuid)
+    tools: list[str] = list(Fus.getStateToolsByUID(comp, stuid))
 
     return tools
 
@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2023 Richard Frangenberg
+# Copyright (C) 2023 Prism Software GmbH
+#
+# Licensed under GNU LGPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+###########################################################################
+#
+#                BMD Fusion Studio Integration for Prism2
+#
+#             https://github.com/Animatect/Prism2_PluginFusion
+#
+#                           Esteban Covo
+#                     e.covo@magichammer.com.mx
+#                     https://magichammer.com.mx
+#
+#                           Joshua Breckeen
+#                              Alta Arts
+#                          josh@alta-arts.com
+#
+###########################################################################
+
+
+
+##  THIS IS A LIBRARY FOR FUSION API CALL STATISTICS FOR THE FUSION PRISM PLUGIN  ##
+
+
+import os
+import sys
+import json
+import time
+import atexit
+import logging
+import threading
+
+import Libs.Prism_Fusion_lib_Cache as Cache
+
+
+logger = logging.getLogger(__name__)
+
+
+#   Every method call on a Fusion object goes through the FusionScript bridge.
+#   If the environment variable is set when Fusion starts, the Fusion object
+#   used by the plugin is wrapped in a proxy.  Objects returned by the proxy
+#   (comps, flows, tools, inputs) are wrapped as well, so every call, attribute
+#   read and attribute write is counted per Fusion method and per calling
+#   plugin function, with a latency histogram per method.  Without the
+#   variable the Fusion object is used directly.
+#
+#   Histogram buckets are powers of two in microseconds:  bucket n holds the
+#   calls that took from 2^(n-1) to 2^n us.
+
+CALLSTATS_ENV = "PRISM_FUSION_CALLSTATS"
+CALLSTATS_ENABLED = bool(os.environ.get(CALLSTATS_ENV))
+
+#   Type name of the objects returned by the FusionScript bridge
+REMOTE_TYPES = {"PyRemoteObject"}
+
+_PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_THIS_FILE = os.path.normcase(os.path.abspath(__file__))
+
+_statsLock = threading.Lock()
+_stats = {
+    "startTime": time.time(),
+    "calls": 0,
+    "methods": {},
+    "callers": {},
+}
+
+
+def isEnabled() -> bool:
+    return CALLSTATS_ENABLED
+
+
+#   Returns the Fusion object wrapped in a counting proxy if enabled
+def wrapFusion(fusion):
+    if not CALLSTATS_ENABLED or fusion is None:
+        return fusion
+
+    atexit.register(_saveSessionReport)
+    logger.debug("Fusion API call statistics enabled")
+
+    return FusionProxy(fusion)
+
+
+#   Returns the total number of counted calls
+def getCallCount() -> int:
+    return _stats["calls"]
+
+
+def resetStats() -> None:
+    with _statsLock:
+        _stats["startTime"] = time.time()
+        _stats["calls"] = 0
+        _stats["methods"] = {}
+        _stats["callers"] = {}
+
+
+def _isRemote(obj) -> bool:
+    return type(obj).__name__ in REMOTE_TYPES
+
+
+def _wrap(obj, typeName:str):
+    if _isRemote(obj):
+        return FusionProxy(obj, typeName)
+
+    #   Fusion returns tables of tools as dicts or lists
+    if isinstance(obj, dict):
+        if any(_isRemote(val) for val in obj.values()):
+            return {key: _wrap(val, typeName) for key, val in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        if any(_isRemote(val) for val in obj):
+            return type(obj)(_wrap(val, typeName) for val in obj)
+
+    return obj
+
+
+def _unwrap(obj):
+    if isinstance(obj, FusionProxy):
+        return object.__getattribute__(obj, "_target")
+
+    if isinstance(obj, dict):
+        if any(isinstance(val, FusionProxy) for val in obj.values()):
+            return {key: _unwrap(val) for key, val in obj.items()}
+    elif isinstance(obj, (list, tuple)):
+        if any(isinstance(val, FusionProxy) for val in obj):
+            return type(obj)(_unwrap(val) for val in obj)
+
+    return obj
+
+
+#   Returns "module.function" of the first plugin function up the stack
+def _getCaller() -> str:
+    frame = sys._getframe(3)
+    while frame:
+        fileName = os.path.normcase(frame.f_code.co_filename)
+        if fileName != _THIS_FILE and fileName.startswith(os.path.normcase(_PLUGIN_DIR)):
+            moduleName = os.path.splitext(os.path.basename(fileName))[0]
+            funcName = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+            return f"{moduleName}.{funcName}"
+        frame = frame.f_back
+
+    return "<external>"
+
+
+def _record(method:str, elapsed:float) -> None:
+    caller = _getCaller()
+    bucket = int(elapsed * 1000000).bit_length()
+
+    with _statsLock:
+        _stats["calls"] += 1
+
+        methodStats = _stats["methods"].get(method)
+        if methodStats is None:
+            methodStats = _stats["methods"][method] = {"calls": 0, "seconds": 0.0, "max": 0.0, "histogram": {}}
+        methodStats["calls"] += 1
+        methodStats["seconds"] += elapsed
+        methodStats["max"] = max(methodStats["max"], elapsed)
+        methodStats["histogram"][bucket] = methodStats["histogram"].get(bucket, 0) + 1
+
+        callerStats = _stats["callers"].setdefault(caller, {})
+        callerStats[method] = callerStats.get(method, 0) + 1
+
+
+#   Counts the calls, attribute reads and writes on a Fusion object.  Names
+#   are recorded as "Type.Name", with the type taken from the object it was
+#   returned from (Fusion, Composition, Frame, FlowView, Tool or Input).
+#   Attributes that are Fusion objects themselves (methods and tool inputs)
+#   are counted when they are called or indexed.
+class FusionProxy(object):
+    __slots__ = ("_target", "_typeName", "_name")
+
+    #   typeName is the type of the object, and name is how it was accessed
+    #   (like "Tool.Clip"), which is used to record calls and indexing
+    def __init__(self, target, typeName:str="Fusion", name:str=None):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_typeName", typeName)
+        object.__setattr__(self, "_name", name or typeName)
+
+
+    def _getName(self) -> str:
+        return object.__getattribute__(self, "_name")
+
+
+    def __getattr__(self, name):
+        target = object.__getattribute__(self, "_target")
+        typeName = object.__getattribute__(self, "_typeName")
+
+        startTime = time.perf_counter()
+        attr = getattr(target, name)
+        elapsed = time.perf_counter() - startTime
+
+        if _isRemote(attr):
+            return FusionProxy(attr, _getResultType(name, typeName), f"{typeName}.{name}")
+
+        #   Bound methods of the bridge are counted when called
+        if callable(attr):
+            def counted(*args, **kwargs):
+                return _callCounted(attr, f"{typeName}.{name}", _getResultType(name, typeName), args, kwargs)
+            return counted
+
+        _record(f"{typeName}.{name}", elapsed)
+        return attr
+
+
+    def __setattr__(self, name, value):
+        target = object.__getattribute__(self, "_target")
+        typeName = object.__getattribute__(self, "_typeName")
+
+        startTime = time.perf_counter()
+        try:
+            setattr(target, name, _unwrap(value))
+        finally:
+            _record(f"{typeName}.{name}=", time.perf_counter() - startTime)
+
+
+    def __call__(self, *args, **kwargs):
+        target = object.__getattribute__(self, "_target")
+        typeName = object.__getattribute__(self, "_typeName")
+        return _callCounted(target, self._getName(), typeName, args, kwargs)
+
+
+    def __getitem__(self, key):
+        target = object.__getattribute__(self, "_target")
+
+        startTime = time.perf_counter()
+        try:
+            result = target[_unwrap(key)]
+        finally:
+            _record(f"{self._getName()}[]", time.perf_counter() - startTime)
+
+        return _wrap(result, "Input")
+
+
+    def __setitem__(self, key, value):
+        target = object.__getattribute__(self, "_target")
+
+        startTime = time.perf_counter()
+        try:
+            target[_unwrap(key)] = _unwrap(value)
+        finally:
+            _record(f"{self._getName()}[]=", time.perf_counter() - startTime)
+
+
+    def __eq__(self, other):
+        return object.__getattribute__(self, "_target") == _unwrap(other)
+
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+
+    def __hash__(self):
+        return hash(object.__getattribute__(self, "_target"))
+
+
+    def __bool__(self):
+        return bool(object.__getattribute__(self, "_target"))
+
+
+    def __repr__(self):
+        return repr(object.__getattribute__(self, "_target"))
+
+
+    def __str__(self):
+        return str(object.__getattribute__(self, "_target"))
+
+
+def _callCounted(func, name:str, resultType:str, args, kwargs):
+    args = tuple(_unwrap(arg) for arg in args)
+    kwargs = {key: _unwrap(val) for key, val in kwargs.items()}
+
+    startTime = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        _record(name, time.perf_counter() - startTime)
+
+    return _wrap(result, resultType)
+
+
+#   Names the type of returned objects for the report
+def _getResultType(name:str, typeName:str) -> str:
+    if name in ("GetCurrentComp", "LoadComp", "NewComp", "GetCompList"):
+        return "Composition"
+    if name in ("CurrentFrame",):
+        return "Frame"
+    if name in ("FlowView",):
+        return "FlowView"
+    if name in ("AddTool", "FindTool", "GetToolList", "ActiveTool", "GetTool", "Copy", "Paste"):
+        return "Tool"
+    if typeName == "Tool":
+        return "Input"
+
+    return typeName
+
+
+#   Returns the report of the counted calls:
+#       {
+#           "startTime", "endTime", "calls",
+#           "methods": {method: {"calls", "seconds", "max", "histogram"}}   sorted by time
+#           "callers": {caller: {"calls", "methods": {method: calls}}}     sorted by calls
+#       }
+def getReport() -> dict:
+    with _statsLock:
+        methods = {method: dict(stats, histogram=dict(stats["histogram"]))
+                   for method, stats in _stats["methods"].items()}
+        callers = {caller: dict(stats) for caller, stats in _stats["callers"].items()}
+        report = {
+            "startTime": _stats["startTime"],
+            "endTime": time.time(),
+            "calls": _stats["calls"],
+        }
+
+    for stats in methods.values():
+        stats["histogram"] = {f"<{2 ** bucket}us": count for bucket, count in sorted(stats["histogram"].items())}
+
+    report["methods"] = dict(sorted(methods.items(), key=lambda item: item[1]["seconds"], reverse=True))
+    report["callers"] = dict(sorted(
+        ((caller, {"calls": sum(callerMethods.values()),
+                   "methods": dict(sorted(callerMethods.items(), key=lambda item: item[1], reverse=True))})
+         for caller, callerMethods in callers.items()),
+        key=lambda item: item[1]["calls"],
+        reverse=True))
+
+    return report
+
+
+#   Returns a short summary of the report
+def formatReport(report:dict, top:int=15) -> str:
+    lines = [f"Fusion API calls:  {report['calls']}", "", "Slowest methods:"]
+    for method, stats in list(report["methods"].items())[:top]:
+        lines.append(f"    {method}:  {stats['calls']} calls,  {stats['seconds'] * 1000:.1f} ms")
+
+    lines += ["", "Most calls by:"]
+    for caller, stats in list(report["callers"].items())[:top]:
+        lines.append(f"    {caller}:  {stats['calls']} calls")
+
+    return "\n".join(lines)
+
+
+#   Saves the report to the plugin cache and returns the file path
+def saveReport(outputDir:str=None) -> str:
+    outputDir = outputDir or Cache.getCacheDir("apicalls")
+    reportFile = os.path.join(outputDir, f"fusionCalls_{time.strftime('%Y%m%d_%H%M%S')}.json")
+
+    try:
+        with open(reportFile, "w") as f:
+            json.dump(getReport(), f, indent=1)
+    except OSError as e:
+        logger.warning(f"ERROR: Unable to save Fusion call report:\n{e}")
+        return None
+
+    logger.debug(f"Saved Fusion call report to {reportFile}")
+    return reportFile
+
+
+def _saveSessionReport() -> None:
+    if _stats["calls"]:
+        saveReport()
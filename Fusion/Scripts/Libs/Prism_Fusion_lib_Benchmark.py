@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2023 Richard Frangenberg
+# Copyright (C) 2023 Prism Software GmbH
+#
+# Licensed under GNU LGPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+###########################################################################
+#
+#                BMD Fusion Studio Integration for Prism2
+#
+#             https://github.com/Animatect/Prism2_PluginFusion
+#
+#                           Esteban Covo
+#                     e.covo@magichammer.com.mx
+#                     https://magichammer.com.mx
+#
+#                           Joshua Breckeen
+#                              Alta Arts
+#                          josh@alta-arts.com
+#
+###########################################################################
+
+
+
+##  THIS IS A LIBRARY FOR BENCHMARK FUNCTIONS FOR THE FUSION PRISM PLUGIN  ##
+
+
+import os
+import json
+import time
+import logging
+import platform
+import threading
+
+import Libs.Prism_Fusion_lib_Fus as Fus
+import Libs.Prism_Fusion_lib_Cache as Cache
+import Libs.Prism_Fusion_lib_Helper as Helper
+import Libs.Prism_Fusion_lib_MockFusion as MockFusion
+
+
+logger = logging.getLogger(__name__)
+
+
+#   Benchmark runs are appended to a json file in the plugin cache, so the
+#   timings of a comp can be compared between plugin versions.
+#
+#   Run:
+#       {
+#           "date":     "2024-01-01 12:00:00",
+#           "host":     platform node name,
+#           "sizes":    {"tools": int, "states": int, "aovs": int},
+#           "cases":    {caseName: {"seconds": float, "best": float, "calls": int or None}}
+#       }
+
+HISTORY_FILE = "history.json"
+HISTORY_MAX_RUNS = 200
+
+#   Sizes of the generated Comps of the mock benchmark
+MOCK_TOOL_COUNTS = [100, 1000, 10000]
+MOCK_STATE_COUNTS = [10, 100, 500]
+MOCK_AOV_COUNT = 4
+
+#   Size of the generated render folders of the directory scan benchmark
+SCAN_FILE_COUNT = 100000
+SCAN_AOV_COUNT = 10
+
+_historyLock = threading.Lock()
+
+
+def getHistoryFile() -> str:
+    return os.path.join(Cache.getCacheDir("benchmark"), HISTORY_FILE)
+
+
+#   Returns the saved runs, oldest first
+def loadHistory() -> list:
+    try:
+        with open(getHistoryFile(), "r") as f:
+            history = json.load(f)
+        if isinstance(history, list):
+            return history
+    except (OSError, ValueError):
+        pass
+
+    return []
+
+
+def saveRun(run:dict) -> None:
+    with _historyLock:
+        history = loadHistory()
+        history.append(run)
+        history = history[-HISTORY_MAX_RUNS:]
+
+        historyFile = getHistoryFile()
+        tempFile = f"{historyFile}.{threading.get_ident()}.tmp"
+        try:
+            with open(tempFile, "w") as f:
+                json.dump(history, f, indent=1)
+            os.replace(tempFile, historyFile)
+        except OSError as e:
+            logger.warning(f"ERROR: Unable to write benchmark history:\n{e}")
+
+
+#   Times a case.  counter() returns the current number of Fusion API calls
+#   if call counting is available.
+def runCase(func, repeat:int=3, counter=None) -> dict:
+    times = []
+    calls = None
+
+    for idx in range(max(1, repeat)):
+        startCalls = counter() if counter else None
+        startTime = time.perf_counter()
+
+        func()
+
+        times.append(time.perf_counter() - startTime)
+        if counter and idx == 0:
+            calls = counter() - startCalls
+
+    return {"seconds": sum(times) / len(times), "best": min(times), "calls": calls}
+
+
+#   Runs the cases {caseName: func} and saves the run to the history
+def runBenchmark(cases:dict, sizes:dict, repeat:int=3, counter=None, save:bool=True) -> dict:
+    run = {
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "host": platform.node(),
+        "sizes": sizes,
+        "cases": {},
+    }
+
+    for caseName, func in cases.items():
+        try:
+            run["cases"][caseName] = runCase(func, repeat=repeat, counter=counter)
+        except Exception as e:
+            logger.warning(f"ERROR: Benchmark case {caseName} failed:\n{e}")
+
+    if save:
+        saveRun(run)
+
+    return run
+
+
+#   Returns the last saved run with the same sizes before the given run
+def getPreviousRun(run:dict, history:list=None) -> dict:
+    if history is None:
+        history = loadHistory()
+
+    for prevRun in reversed(history):
+        #   Skip the run itself once it is saved
+        if prevRun == run:
+            continue
+        if prevRun.get("sizes") == run.get("sizes"):
+            return prevRun
+
+    return None
+
+
+#   Returns {caseName: {"seconds", "prevSeconds", "change", "calls", "prevCalls"}}
+#   change is the relative difference of the average time (0.1 = 10% slower)
+def compareRuns(run:dict, prevRun:dict) -> dict:
+    diffs = {}
+    prevCases = prevRun.get("cases", {}) if prevRun else {}
+
+    for caseName, case in run.get("cases", {}).items():
+        prevCase = prevCases.get(caseName)
+        diff = {
+            "seconds": case["seconds"],
+            "prevSeconds": None,
+            "change": None,
+            "calls": case.get("calls"),
+            "prevCalls": None,
+        }
+        if prevCase:
+            diff["prevSeconds"] = prevCase["seconds"]
+            diff["prevCalls"] = prevCase.get("calls")
+            if prevCase["seconds"]:
+                diff["change"] = (case["seconds"] - prevCase["seconds"]) / prevCase["seconds"]
+
+        diffs[caseName] = diff
+
+    return diffs
+
+
+#   Returns a readable table of the run compared to the previous run
+def formatRun(run:dict, prevRun:dict=None, threshold:float=0.2) -> str:
+    sizes = run.get("sizes", {})
+    lines = [", ".join(f"{key}: {val}" for key, val in sizes.items()), ""]
+
+    for caseName, diff in compareRuns(run, prevRun).items():
+        line = f"{caseName}:  {diff['seconds'] * 1000:.1f} ms"
+        if diff["calls"] is not None:
+            line += f",  {diff['calls']} calls"
+        if diff["change"] is not None:
+            line += f"  ({diff['change'] * 100:+.0f}%)"
+            if diff["change"] > threshold:
+                line += "  SLOWER"
+        lines.append(line)
+
+    return "\n".join(lines)
+
+
+
+#################################################
+####    MOCK COMPS
+
+
+#   Returns (fusion, comp) of a MockFusion Comp with toolCount Loaders spread
+#   over stateCount Image Import States of aovCount AOVs each
+def makeMockComp(toolCount:int, stateCount:int, aovCount:int=MOCK_AOV_COUNT, latency:float=0.0) -> tuple:
+    fusion = MockFusion.MockFusion(latency=latency)
+    comp = fusion.NewComp(f"Benchmark_{toolCount}_{stateCount}")
+
+    def _toolData(idx:int, tool) -> dict:
+        stateIdx = idx % stateCount
+        return {"Prism_UUID": f"tool{idx}",
+                "Prism_ToolData": {"toolName": f"Loader_{idx}",
+                                   "stateUID": f"state{stateIdx}",
+                                   "mediaId": f"Shot_010_Comp_{stateIdx}",
+                                   "aov": f"aov{idx // stateCount % aovCount}",
+                                   "listType": "import2d"}}
+
+    comp.populate(toolCount, dataFunc=_toolData)
+
+    states = []
+    for stateIdx in range(stateCount):
+        files = [{"aov": f"aov{aovIdx}", "channel": "Color",
+                  "basefile": f"Shot_010_Comp_{stateIdx}_aov{aovIdx}.####.exr"}
+                 for aovIdx in range(aovCount)]
+        states.append({"statename": f"Image_Import_{stateIdx}", "stateclass": "Image_Import",
+                       "stateUID": f"state{stateIdx}", "importData": {"files": files}})
+
+    Fus.invalidateStateStore()
+    Fus.sm_saveStates(comp, json.dumps({"states": states}))
+    Fus.invalidateToolIndex()
+    Fus.invalidateStateStore()
+
+    return fusion, comp
+
+
+#   Returns the benchmark cases {caseName: func} against a Comp of
+#   makeMockComp()
+def getMockCases(comp, toolCount:int, stateCount:int) -> dict:
+    stateUIDs = [f"state{stateIdx}" for stateIdx in range(stateCount)]
+    saveCount = [0]
+
+    def _readStates():
+        Fus.invalidateStateStore()
+        return Fus.getStatesData(comp)
+
+    def _saveState():
+        stateData = Fus.getStatesData(comp)
+        saveCount[0] += 1
+        stateData["states"][0]["comment"] = f"Save {saveCount[0]}"
+        Fus.sm_saveStates(comp, json.dumps(stateData))
+
+    return {
+        "getCompSnapshot": lambda: Fus.getCompSnapshot(comp),
+        "buildToolIndex": lambda: Fus.getToolIndex(comp, rebuild=True),
+        "getToolByUID": lambda: [Fus.getToolByUID(comp, f"tool{idx}") for idx in range(0, toolCount, 10)],
+        "getStatesData": _readStates,
+        "getStateTools": lambda: [Fus.getToolsFromStateUIDs(comp, stateUID) for stateUID in stateUIDs],
+        "saveState": _saveState,
+        }
+
+
+#   Runs the cases against generated Comps of every combination of the sizes
+#   and returns the runs.  The sizes of the runs are marked as "mock" so they
+#   are only compared to other mock runs.
+def runMockBenchmark(toolCounts:list=None, stateCounts:list=None, aovCount:int=MOCK_AOV_COUNT,
+                     repeat:int=3, latency:float=0.0, save:bool=True) -> list:
+    runs = []
+
+    try:
+        for toolCount in toolCounts or MOCK_TOOL_COUNTS:
+            for stateCount in stateCounts or MOCK_STATE_COUNTS:
+                fusion, comp = makeMockComp(toolCount, stateCount, aovCount=aovCount, latency=latency)
+                sizes = {"tools": toolCount, "states": stateCount, "aovs": stateCount * aovCount, "source": "mock"}
+
+                runs.append(runBenchmark(getMockCases(comp, toolCount, stateCount), sizes,
+                                         repeat=repeat, counter=fusion.getCallCount, save=save))
+    finally:
+        #   Do not leave the mock Comps in the caches
+        Fus.invalidateToolIndex()
+        Fus.invalidateStateStore()
+
+    return runs
+
+
+
+#################################################
+####    DIRECTORY SCANS
+
+#   Writes empty frames of an EXR sequence into aovCount AOV folders under
+#   rootDir, fileCount files in total.  Every gapEvery frame is left out so
+#   the sequences have gaps.  Returns the AOV folder paths.
+def makeSequenceDirs(rootDir:str, fileCount:int=SCAN_FILE_COUNT, aovCount:int=SCAN_AOV_COUNT,
+                     gapEvery:int=500, startFrame:int=1001) -> list:
+    dirPaths = []
+    framesPerAov = fileCount // aovCount
+
+    for aovIdx in range(aovCount):
+        aov = f"aov{aovIdx:02d}"
+        dirPath = os.path.join(rootDir, aov)
+        os.makedirs(dirPath, exist_ok=True)
+
+        frameCount = 0
+        frame = startFrame
+        while frameCount < framesPerAov:
+            if gapEvery and (frame - startFrame) % gapEvery == gapEvery - 1:
+                frame += 1
+                continue
+
+            open(os.path.join(dirPath, f"Shot_010_Comp_{aov}.{frame:06d}.exr"), "wb").close()
+            frameCount += 1
+            frame += 1
+
+        dirPaths.append(dirPath)
+
+    return dirPaths
+
+
+#   Times the sequence detection of the folders with a plain listing each
+#   time, and through the directory index cold and warm
+def runDirScanBenchmark(dirPaths:list, repeat:int=3, save:bool=True) -> dict:
+    def _listDirs():
+        return [Helper.getSequenceInfo(sorted(os.listdir(dirPath))) for dirPath in dirPaths]
+
+    def _indexDirs():
+        return [Cache.getDirData(dirPath, "sequenceInfo", lambda names: Helper.getSequenceInfo(sorted(names)))
+                for dirPath in dirPaths]
+
+    def _indexDirsCold():
+        Cache.invalidateDirIndex()
+        return _indexDirs()
+
+    cases = {
+        "listdir": _listDirs,
+        "dirIndexCold": _indexDirsCold,
+        "dirIndexWarm": _indexDirs,
+        }
+
+    fileCount = sum(len(os.listdir(dirPath)) for dirPath in dirPaths)
+    sizes = {"files": fileCount, "dirs": len(dirPaths), "source": "dirScan"}
+
+    try:
+        return runBenchmark(cases, sizes, repeat=repeat, save=save)
+    finally:
+        Cache.invalidateDirIndex()
@@ -0,0 +1,520 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2023 Richard Frangenberg
+# Copyright (C) 2023 Prism Software GmbH
+#
+# Licensed under GNU LGPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+###########################################################################
+#
+#                BMD Fusion Studio Integration for Prism2
+#
+#             https://github.com/Animatect/Prism2_PluginFusion
+#
+#                           Esteban Covo
+#                     e.covo@magichammer.com.mx
+#                     https://magichammer.com.mx
+#
+#                           Joshua Breckeen
+#                              Alta Arts
+#                          josh@alta-arts.com
+#
+###########################################################################
+
+
+
+##  THIS IS A LIBRARY FOR CACHING FUNCTIONS FOR THE FUSION PRISM PLUGIN  ##
+
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+#   Root of the per-user plugin cache
+CACHE_ROOT = os.path.join(tempfile.gettempdir(), "PrismFusionCache")
+
+#   Thumbnail cache limits
+THUMB_CACHE_MAX_BYTES = 500 * 1024 * 1024
+THUMB_MEMCACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+#   Returns (and creates) a sub directory of the cache
+def getCacheDir(subDir:str) -> str:
+    cacheDir = os.path.join(CACHE_ROOT, subDir)
+    try:
+        os.makedirs(cacheDir, exist_ok=True)
+    except Exception as e:
+        logger.warning(f"ERROR: Unable to create cache directory {cacheDir}:\n{e}")
+
+    return cacheDir
+
+
+#   Returns (size, mtime_ns) of a file or None if it does not exist
+def getFileSignature(filePath:str) -> tuple:
+    try:
+        stat = os.stat(filePath)
+        return stat.st_size, stat.st_mtime_ns
+    except OSError:
+        return None
+
+
+
+#########################
+####    THUMBNAILS   ####
+
+#   Thumbnails are stored as ready-to-use PNG bytes on disk, keyed by the
+#   source path, channel, source mtime/size and target width.  The least
+#   recently used files are evicted when the cache grows over the cap, and
+#   recently used thumbnails are also kept in memory.
+
+_thumbLock = threading.Lock()
+_thumbMemCache = OrderedDict()
+_thumbState = {"memBytes": 0, "diskBytes": None}
+
+
+#   Returns the cache key for a thumbnail or None if the source does not exist.
+#   A signature of the source that was already read can be passed.
+def getThumbCacheKey(filePath:str, channel:str=None, width:int=None, allowThumb:bool=True, signature:tuple=None) -> str:
+    if signature is None:
+        signature = getFileSignature(filePath)
+    if not signature:
+        return None
+
+    keyStr = f"{os.path.normcase(os.path.normpath(filePath))}|{channel}|{width}|{allowThumb}|{signature[0]}|{signature[1]}"
+    return hashlib.sha1(keyStr.encode("utf-8")).hexdigest()
+
+
+def _getThumbFile(key:str) -> str:
+    return os.path.join(getCacheDir("thumbs"), f"{key}.png")
+
+
+#   Adds bytes to the in-memory cache (lock must be held)
+def _addToMemCache(key:str, data:bytes) -> None:
+    if key in _thumbMemCache:
+        _thumbState["memBytes"] -= len(_thumbMemCache.pop(key))
+
+    _thumbMemCache[key] = data
+    _thumbState["memBytes"] += len(data)
+
+    while _thumbState["memBytes"] > THUMB_MEMCACHE_MAX_BYTES and _thumbMemCache:
+        _, oldData = _thumbMemCache.popitem(last=False)
+        _thumbState["memBytes"] -= len(oldData)
+
+
+#   Returns the cached thumbnail bytes or None
+def getCachedThumb(key:str) -> bytes:
+    if not key:
+        return None
+
+    with _thumbLock:
+        if key in _thumbMemCache:
+            _thumbMemCache.move_to_end(key)
+            return _thumbMemCache[key]
+
+    thumbFile = _getThumbFile(key)
+    try:
+        with open(thumbFile, "rb") as f:
+            data = f.read()
+        #   Mark as recently used for the eviction
+        os.utime(thumbFile)
+    except OSError:
+        return None
+
+    with _thumbLock:
+        _addToMemCache(key, data)
+
+    return data
+
+
+#   Saves thumbnail bytes to the cache
+def saveCachedThumb(key:str, data:bytes) -> None:
+    if not key or not data:
+        return
+
+    with _thumbLock:
+        _addToMemCache(key, data)
+
+    thumbFile = _getThumbFile(key)
+    tempFile = f"{thumbFile}.{threading.get_ident()}.tmp"
+    try:
+        with open(tempFile, "wb") as f:
+            f.write(data)
+        os.replace(tempFile, thumbFile)
+    except OSError as e:
+        logger.warning(f"ERROR: Unable to write thumbnail cache file:\n{e}")
+        return
+
+    with _thumbLock:
+        if _thumbState["diskBytes"] is not None:
+            _thumbState["diskBytes"] += len(data)
+
+    evictThumbCache()
+
+
+#   Removes the least recently used thumbnails if the cache is over the cap
+def evictThumbCache(maxBytes:int=THUMB_CACHE_MAX_BYTES) -> None:
+    with _thumbLock:
+        diskBytes = _thumbState["diskBytes"]
+
+    if diskBytes is not None and diskBytes <= maxBytes:
+        return
+
+    try:
+        thumbDir = getCacheDir("thumbs")
+        entries = []
+        for entry in os.scandir(thumbDir):
+            if entry.is_file() and entry.name.endswith(".png"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        totalBytes = sum(size for _, size, _ in entries)
+
+        #   Evict down to 80% to avoid evicting on every write
+        if totalBytes > maxBytes:
+            entries.sort()
+            target = int(maxBytes * 0.8)
+            for _, size, path in entries:
+                if totalBytes <= target:
+                    break
+                try:
+                    os.remove(path)
+                    totalBytes -= size
+                except OSError:
+                    pass
+
+            logger.debug("Evicted old thumbnails from the cache")
+
+        with _thumbLock:
+            _thumbState["diskBytes"] = totalBytes
+
+    except Exception as e:
+        logger.warning(f"ERROR: Unable to evict thumbnail cache:\n{e}")
+
+
+
+#########################
+####    DURATIONS    ####
+
+#   Video frame counts are stored in a single json file keyed by the
+#   normalized path, and are only valid while the size and mtime match.
+
+DURATION_CACHE_FILE = "durations.json"
+
+_durationLock = threading.Lock()
+_durationCache = {"entries": None}
+
+
+def _getDurationEntries() -> dict:
+    #   Lock must be held
+    if _durationCache["entries"] is None:
+        entries = {}
+        cacheFile = os.path.join(getCacheDir("media"), DURATION_CACHE_FILE)
+        try:
+            with open(cacheFile, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        _durationCache["entries"] = entries
+
+    return _durationCache["entries"]
+
+
+def _getDurationKey(filePath:str) -> str:
+    return os.path.normcase(os.path.normpath(filePath))
+
+
+#   Returns the cached frame count of a video or None
+def getCachedDuration(filePath:str) -> int:
+    signature = getFileSignature(filePath)
+    if not signature:
+        return None
+
+    with _durationLock:
+        entry = _getDurationEntries().get(_getDurationKey(filePath))
+
+    if entry and entry[0] == signature[0] and entry[1] == signature[1]:
+        return entry[2]
+
+    return None
+
+
+#   Saves frame counts to the cache:  {filePath: frames}
+def saveCachedDurations(durations:dict) -> None:
+    updated = False
+
+    with _durationLock:
+        entries = _getDurationEntries()
+        for filePath, frames in durations.items():
+            signature = getFileSignature(filePath)
+            if not signature or not frames:
+                continue
+            entries[_getDurationKey(filePath)] = [signature[0], signature[1], frames]
+            updated = True
+
+        if not updated:
+            return
+
+        cacheFile = os.path.join(getCacheDir("media"), DURATION_CACHE_FILE)
+        tempFile = f"{cacheFile}.{threading.get_ident()}.tmp"
+        try:
+            with open(tempFile, "w") as f:
+                json.dump(entries, f)
+            os.replace(tempFile, cacheFile)
+        except OSError as e:
+            logger.warning(f"ERROR: Unable to write duration cache file:\n{e}")
+
+
+
+#########################
+#### DIRECTORY INDEX ####
+
+#   Directory listings are kept per directory and reused while the directory
+#   mtime is unchanged (files added, removed or renamed update the mtime).
+#   Data derived from a listing, like detected sequences, is stored with the
+#   listing and dropped with it.
+
+DIR_INDEX_MAX_ENTRIES = 2048
+DIR_PREFETCH_THREADS = 4
+
+_dirLock = threading.Lock()
+_dirIndex = OrderedDict()
+_dirPrefetch = {"executor": None}
+
+
+def _getDirKey(dirPath:str) -> str:
+    return os.path.normcase(os.path.normpath(dirPath))
+
+
+#   Returns the cached record of a directory, scanning it if it changed
+def _getDirRecord(dirPath:str) -> dict:
+    key = _getDirKey(dirPath)
+    mtime = os.stat(dirPath).st_mtime_ns
+
+    with _dirLock:
+        record = _dirIndex.get(key)
+        if record and record["mtime"] == mtime:
+            _dirIndex.move_to_end(key)
+            return record
+
+    entries = []
+    with os.scandir(dirPath) as scan:
+        for entry in scan:
+            try:
+                isDir = entry.is_dir()
+            except OSError:
+                isDir = False
+            entries.append((entry.name, isDir))
+
+    record = {"mtime": mtime, "entries": entries, "data": {}}
+
+    with _dirLock:
+        _dirIndex[key] = record
+        _dirIndex.move_to_end(key)
+        while len(_dirIndex) > DIR_INDEX_MAX_ENTRIES:
+            _dirIndex.popitem(last=False)
+
+    return record
+
+
+#   Returns the names in a directory like os.listdir()
+def listDir(dirPath:str, dirsOnly:bool=False, filesOnly:bool=False) -> list:
+    record = _getDirRecord(dirPath)
+
+    if dirsOnly:
+        return [name for name, isDir in record["entries"] if isDir]
+    if filesOnly:
+        return [name for name, isDir in record["entries"] if not isDir]
+
+    return [name for name, _isDir in record["entries"]]
+
+
+#   Returns data derived from a directory listing.  func(names) is only called
+#   if the directory changed since the data was stored.
+def getDirData(dirPath:str, dataKey:str, func):
+    record = _getDirRecord(dirPath)
+
+    with _dirLock:
+        if dataKey in record["data"]:
+            return record["data"][dataKey]
+
+    result = func([name for name, _isDir in record["entries"]])
+
+    with _dirLock:
+        record["data"][dataKey] = result
+
+    return result
+
+
+#   Scans the directories in the background so later lookups are cached
+def prefetchDirs(dirPaths:list) -> None:
+    with _dirLock:
+        if not _dirPrefetch["executor"]:
+            _dirPrefetch["executor"] = ThreadPoolExecutor(max_workers=DIR_PREFETCH_THREADS,
+                                                          thread_name_prefix="PrismDirIndex")
+        executor = _dirPrefetch["executor"]
+
+    def _prefetch(dirPath):
+        try:
+            _getDirRecord(dirPath)
+        except OSError:
+            pass
+
+    for dirPath in dirPaths:
+        executor.submit(_prefetch, dirPath)
+
+
+def invalidateDirIndex(dirPath:str=None) -> None:
+    with _dirLock:
+        if dirPath:
+            _dirIndex.pop(_getDirKey(dirPath), None)
+        else:
+            _dirIndex.clear()
+
+
+
+#########################
+####  MEDIA VERSIONS ####
+
+#   Registry of the output paths generated by Prism for each product folder.
+#   Generating a path lists the product folder to find the next version, so
+#   the result is reused while the product folder mtime is unchanged.  The
+#   entries of a product are dropped when this session creates a version.
+#
+#   {productKey: {"dir": productDir, "mtime": int or None, "paths": {argsKey: outputPathData}}}
+
+MEDIA_VERSION_MAX_PRODUCTS = 512
+
+_versionLock = threading.Lock()
+_versionRegistry = OrderedDict()
+#   {argsKey: productKey}
+_versionKeys = {}
+
+
+def _getMtime(dirPath:str) -> int:
+    try:
+        return os.stat(dirPath).st_mtime_ns
+    except OSError:
+        return None
+
+
+#   Returns the key for the generateMediaProductPath() arguments
+def getMediaPathKey(kwargs:dict) -> str:
+    return json.dumps(kwargs, sort_keys=True, default=str)
+
+
+#   Returns the product folder (the parent of the version folder) of a path
+def getProductDir(filePath:str, version:str) -> str:
+    if not filePath or not version:
+        return None
+
+    dirPath = os.path.dirname(os.path.normpath(filePath))
+    while os.path.basename(dirPath) != version:
+        parentDir = os.path.dirname(dirPath)
+        if parentDir == dirPath:
+            return None
+        dirPath = parentDir
+
+    return os.path.dirname(dirPath)
+
+
+#   Removes a product from the registry (lock must be held)
+def _dropProduct(productKey:str) -> None:
+    entry = _versionRegistry.pop(productKey, None)
+    if entry:
+        for key in entry["paths"]:
+            _versionKeys.pop(key, None)
+
+
+#   Returns the cached outputPathData or None
+def getCachedMediaPath(key:str) -> dict:
+    with _versionLock:
+        productKey = _versionKeys.get(key)
+        entry = _versionRegistry.get(productKey)
+        if not entry:
+            return None
+
+    if _getMtime(entry["dir"]) != entry["mtime"]:
+        with _versionLock:
+            _dropProduct(productKey)
+        return None
+
+    with _versionLock:
+        if productKey in _versionRegistry:
+            _versionRegistry.move_to_end(productKey)
+        outputPathData = entry["paths"].get(key)
+
+    return dict(outputPathData) if outputPathData else None
+
+
+def saveCachedMediaPath(key:str, outputPathData:dict) -> None:
+    if not outputPathData:
+        return
+
+    productDir = getProductDir(outputPathData.get("path"), outputPathData.get("version"))
+    if not productDir:
+        return
+
+    productKey = os.path.normcase(productDir)
+    mtime = _getMtime(productDir)
+
+    with _versionLock:
+        entry = _versionRegistry.get(productKey)
+        if not entry or entry["mtime"] != mtime:
+            _dropProduct(productKey)
+            entry = _versionRegistry[productKey] = {"dir": productDir, "mtime": mtime, "paths": {}}
+
+        entry["paths"][key] = dict(outputPathData)
+        _versionKeys[key] = productKey
+        _versionRegistry.move_to_end(productKey)
+
+        while len(_versionRegistry) > MEDIA_VERSION_MAX_PRODUCTS:
+            _dropProduct(next(iter(_versionRegistry)))
+
+
+#   Drops the registry entries of the product containing the path, or all
+def invalidateMediaVersions(filePath:str=None) -> None:
+    with _versionLock:
+        if not filePath:
+            _versionRegistry.clear()
+            _versionKeys.clear()
+            return
+
+        pathKey = os.path.normcase(os.path.normpath(filePath))
+        for productKey in list(_versionRegistry):
+            if pathKey == productKey or pathKey.startswith(productKey + os.sep):
+                _dropProduct(productKey)
@@ -52,11 +52,17 @@
 
 import os
 import re
+import json
+import copy
+import time
+import hashlib
 import logging
+import contextlib
 
 import Libs.Prism_Fusion_lib_Helper as Helper
+import Libs.Prism_Fusion_lib_Image as Image
 
-from PrismUtils.Decorators import err_catcher as err_catcher
+from Libs.Prism_Fusion_lib_Profiler import err_catcher
 
 from typing import TYPE_CHECKING, Union, Dict, Any, Tuple
 if TYPE_CHECKING:
@@ -140,6 +146,9 @@ def openScene(fusion, sceneFormats:list, filepath:str, force=False) -> bool:
 
 def saveScene(comp, filepath:str, details={}) -> bool:
     try:
+        #   Update the States for older plugin versions with the saved file
+        writeLegacyStates(comp)
+
         #Save function returns True on success, False on failure
         result = comp.Save(filepath)
         if result:
@@ -261,6 +270,10 @@ def getCurrentFrame(comp) -> int:
 def addTool(comp:Composition_, toolType:str, toolData:dict={}, xPos:int=-32768, yPos:int=-32768, autoConnect=1) -> Tool:
     try:
         tool = comp.AddTool(toolType, xPos, yPos, autoConnect)
+        countOps()
+        #   Keep the Tool Index count in step with the Comp
+        if _toolIndex["compName"] is not None:
+            _toolIndex["toolCount"] += 1
         configureTool(tool, toolData)
 
         return tool
@@ -302,27 +315,37 @@ def configureTool(tool:Tool_, toolData:dict={}) -> None:
     if "fuseFormat" in toolData:
         tool["OutputFormat"] = toolData['fuseFormat']
 
-    if "frame_start" in toolData:
-        tool.GlobalOut[0] = toolData["frame_end"]
-        tool.GlobalIn[0] = toolData["frame_start"]
-
-        tool.ClipTimeStart = 0
-        tool.ClipTimeEnd = toolData["frame_end"] - toolData["frame_start"]
-
-        tool.HoldFirstFrame = 0
-        tool.HoldLastFrame = 0
+    #   The range of a video that could not be probed yet is unknown
+    if "frame_start" in toolData and toolData.get("frame_end") is not None:
+        setClipRange(tool, toolData["frame_start"], toolData["frame_end"])
 
     #   TODO    TRYING TO HAVE TOOL SHOW NAME NOT CLIP PATH
     tool.SetAttrs({'TOOLS_NameSet': True})
+    countOps()
 
     addToolData(tool, toolData)
 
     return tool
 
 
+#   Sets the global and clip range of a Loader
+def setClipRange(tool:Tool_, frameStart:int, frameEnd:int) -> None:
+    tool.GlobalOut[0] = frameEnd
+    tool.GlobalIn[0] = frameStart
+
+    tool.ClipTimeStart = 0
+    tool.ClipTimeEnd = frameEnd - frameStart
+
+    tool.HoldFirstFrame = 0
+    tool.HoldLastFrame = 0
+
+
 def addToolData(tool:Tool_, toolData:dict={}) -> None:
     #   add the DB data to be able to reconstruct it
     tool.SetData('Prism_ToolData', toolData)
+    countOps()
+    #   Update the Tool Index with the new data
+    indexTool(tool, toolData=toolData)
 
 
 def updateToolData(tool:Tool_, updateData:dict={}) -> None:
@@ -457,7 +480,7 @@ def groupTools(comp,
     if success:
         #   Deletes the original tools
         for tool in toolList:
-            tool.Delete()
+            deleteTool(comp, tool)
 
     try:
         #   Create group settings code
@@ -520,6 +543,436 @@ def groupTools(comp,
         return None
     
 
+#################################################
+####    TOOL INDEX
+
+#   Per-Comp index of the Prism Tools.  It is built with a single pass
+#   over the Comp, kept current by addTool/addToolData/deleteTool, and
+#   rebuilt when the Comp changes or its tool count no longer matches.
+#   Reading the tool count lists the whole Comp, so it is only checked
+#   once per TOOL_INDEX_CHECK_INTERVAL.  Every Tool returned from the
+#   index is checked against its UID, and the index is rebuilt once if a
+#   Tool was deleted or replaced in the meantime.
+TOOL_INDEX_CHECK_INTERVAL = 2.0
+
+_toolIndex = {
+    "compName": None,
+    "toolCount": -1,
+    "checkedAt": 0.0,
+    "byUID": {},
+    "byState": {},
+    "byType": {},
+    "byName": {},
+    "stats": {"builds": 0, "hits": 0, "misses": 0},
+}
+
+
+#   Returns the name used to tell Comps apart
+def _getCompName(comp) -> str:
+    try:
+        return comp.GetAttrs("COMPS_Name")
+    except:
+        return None
+
+
+#   Clears the Tool Index so the next lookup rebuilds it
+def invalidateToolIndex() -> None:
+    _toolIndex["compName"] = None
+    _toolIndex["toolCount"] = -1
+    _toolIndex["checkedAt"] = 0.0
+    _toolIndex["byUID"] = {}
+    _toolIndex["byState"] = {}
+    _toolIndex["byType"] = {}
+    _toolIndex["byName"] = {}
+
+
+#   Returns build/hit/miss counters of the Tool Index
+def getToolIndexStats() -> dict:
+    stats = dict(_toolIndex["stats"])
+    stats["tools"] = len(_toolIndex["byUID"])
+    return stats
+
+
+#   Removes a Tool UID from the Tool Index
+def _unindexUID(toolUID:UUID) -> None:
+    entry = _toolIndex["byUID"].pop(toolUID, None)
+    if not entry:
+        return
+
+    for key, mapName in [(entry["stateUID"], "byState"),
+                         (entry["type"], "byType"),
+                         (entry["name"], "byName")]:
+        uids = _toolIndex[mapName].get(key)
+        if uids and toolUID in uids:
+            uids.remove(toolUID)
+            if not uids:
+                del _toolIndex[mapName][key]
+
+
+#   Adds or refreshes a Tool in the Tool Index.  Without attrs only the name
+#   and type of the Tool are read, and the type of an indexed Tool is reused.
+def indexTool(tool:Tool_, toolData:dict=None, toolUID:UUID=None, attrs:dict=None) -> None:
+    try:
+        if not tool:
+            return
+
+        if toolData is None:
+            toolData = tool.GetData('Prism_ToolData')
+        if not toolData:
+            return
+
+        if toolUID is None:
+            toolUID = tool.GetData('Prism_UUID')
+        if not toolUID:
+            return
+
+        if attrs is None:
+            entry = _toolIndex["byUID"].get(toolUID)
+            toolType = entry["type"] if entry and entry["tool"] is tool else tool.ID
+            attrs = {"TOOLS_RegID": toolType, "TOOLS_Name": tool.Name}
+
+        _unindexUID(toolUID)
+
+        entry = {"tool": tool,
+                 "toolData": toolData,
+                 "stateUID": toolData.get("stateUID"),
+                 "type": attrs.get("TOOLS_RegID"),
+                 "name": attrs.get("TOOLS_Name")}
+
+        _toolIndex["byUID"][toolUID] = entry
+        _toolIndex["byState"].setdefault(entry["stateUID"], []).append(toolUID)
+        _toolIndex["byType"].setdefault(entry["type"], []).append(toolUID)
+        _toolIndex["byName"].setdefault(entry["name"], []).append(toolUID)
+
+    except Exception as e:
+        logger.warning(f"ERROR: Unable to add tool to the Tool Index:\n{e}")
+
+
+#   Removes a Tool from the Tool Index
+def unindexTool(tool:Tool_=None, toolUID:UUID=None) -> None:
+    try:
+        if toolUID is None and tool:
+            toolUID = tool.GetData('Prism_UUID')
+        if toolUID in _toolIndex["byUID"]:
+            _unindexUID(toolUID)
+            _toolIndex["toolCount"] -= 1
+
+    except Exception as e:
+        logger.warning(f"ERROR: Unable to remove tool from the Tool Index:\n{e}")
+
+
+#   Builds the Tool Index with a single pass over the Comp
+def buildToolIndex(comp) -> dict:
+    invalidateToolIndex()
+
+    allTools = list(comp.GetToolList(False).values())
+
+    for tool in allTools:
+        toolUID = tool.GetData('Prism_UUID')
+        if not toolUID:
+            continue
+        toolData = tool.GetData('Prism_ToolData')
+        if not toolData:
+            continue
+
+        indexTool(tool, toolData=toolData, toolUID=toolUID, attrs=tool.GetAttrs())
+
+    _toolIndex["compName"] = _getCompName(comp)
+    _toolIndex["toolCount"] = len(allTools)
+    _toolIndex["checkedAt"] = time.perf_counter()
+    _toolIndex["stats"]["builds"] += 1
+
+    logger.debug(f"Built Tool Index with {len(_toolIndex['byUID'])} Prism tools")
+    return _toolIndex
+
+
+#   Returns the Tool Index for the Comp, rebuilding it if it is stale
+def getToolIndex(comp, rebuild:bool=False) -> dict:
+    try:
+        if (rebuild
+            or _toolIndex["compName"] is None
+            or _toolIndex["compName"] != _getCompName(comp)):
+            return buildToolIndex(comp)
+
+        #   Compare the tool count if it was not checked recently
+        now = time.perf_counter()
+        if now - _toolIndex["checkedAt"] >= TOOL_INDEX_CHECK_INTERVAL:
+            if _toolIndex["toolCount"] != len(comp.GetToolList(False)):
+                return buildToolIndex(comp)
+            _toolIndex["checkedAt"] = now
+
+        return _toolIndex
+
+    except Exception as e:
+        logger.warning(f"ERROR: Unable to get the Tool Index:\n{e}")
+        invalidateToolIndex()
+        return _toolIndex
+
+
+#   Returns the indexed Tool if it still matches the UID
+def _getIndexedTool(toolUID:UUID) -> Tool:
+    entry = _toolIndex["byUID"].get(toolUID)
+    if not entry:
+        return None
+    try:
+        tool = entry["tool"]
+        if tool and tool.GetData('Prism_UUID') == toolUID:
+            return tool
+    except:
+        pass
+    return None
+
+
+#   Returns {toolUID: Tool} of the valid indexed Tools for the UIDs listed
+#   under a key of one of the index maps, or of all entries that pass
+#   entryFilter.  The index is rebuilt once if any Tool is no longer valid.
+def _getIndexedToolMap(comp, mapName:str=None, key=None, entryFilter=None) -> dict:
+    for rebuild in [False, True]:
+        index = getToolIndex(comp, rebuild=rebuild)
+
+        if mapName:
+            toolUIDs = list(index[mapName].get(key, []))
+        else:
+            toolUIDs = [uid for uid, entry in list(index["byUID"].items())
+                        if entryFilter is None or entryFilter(entry)]
+
+        tools = {uid: _getIndexedTool(uid) for uid in toolUIDs}
+        if all(tools.values()):
+            _toolIndex["stats"]["hits"] += 1
+            return tools
+
+        _toolIndex["stats"]["misses"] += 1
+
+    return {uid: tool for uid, tool in tools.items() if tool}
+
+
+def _getIndexedTools(comp, mapName:str=None, key=None, entryFilter=None) -> list:
+    return list(_getIndexedToolMap(comp, mapName, key, entryFilter).values())
+
+
+#   Returns {toolUID: Tool} of the Prism Tools of a State, or of all Prism
+#   Tools that belong to a State
+def getStateToolsByUID(comp, stateUID:str=None) -> dict:
+    try:
+        if stateUID is None:
+            return _getIndexedToolMap(comp, entryFilter=lambda entry: bool(entry["stateUID"]))
+        return _getIndexedToolMap(comp, "byState", stateUID)
+
+    except Exception as e:
+        logger.warning(f"ERROR: Unable to get the State Tools from the Tool Index:\n{e}")
+        return {}
+
+
+#   Returns the Prism Data stored in the Tool Index
+def getIndexedToolData(comp, toolUID:UUID) -> dict:
+    entry = getToolIndex(comp)["byUID"].get(toolUID)
+    if entry:
+        return entry["toolData"]
+    return None
+
+
+#   Deletes a Tool from the Comp and the Tool Index
+def deleteTool(comp, tool:Tool_) -> bool:
+    try:
+        unindexTool(tool=tool)
+        tool.Delete()
+        countOps()
+        return True
+
+    except Exception as e:
+        logger.warning(f"ERROR: Unable to delete tool:\n{e}")
+        invalidateToolIndex()
+        return False
+
+
+#################################################
+####    COMP TRANSACTIONS
+
+#   Bulk graph edits run inside a transaction, which locks the Comp and records
+#   a single undo step.  Both are released even if the edit raises.  Nested
+#   transactions join the outermost one.  The graph edit functions in this
+#   library count their calls on the open transaction, and when it closes the
+#   metrics hooks are called with:
+#
+#       {"name": str, "ops": int, "seconds": float, "failed": bool}
+_transaction = {
+    "current": None,
+    "hooks": [],
+    "stats": {},
+}
+
+
+#   Adds a function that is called with the metrics of each transaction
+def addTransactionHook(hook) -> None:
+    if hook not in _transaction["hooks"]:
+        _transaction["hooks"].append(hook)
+
+
+def removeTransactionHook(hook) -> None:
+    if hook in _transaction["hooks"]:
+        _transaction["hooks"].remove(hook)
+
+
+#   Returns {name: {"count", "ops", "seconds"}} totals of the transactions
+def getTransactionStats() -> dict:
+    return {name: dict(stats) for name, stats in _transaction["stats"].items()}
+
+
+#   Counts graph edit operations on the open transaction
+def countOps(count:int=1) -> None:
+    current = _transaction["current"]
+    if current:
+        current["ops"] += count
+
+
+@contextlib.contextmanager
+def compTransaction(comp:Composition_, name:str, lock:bool=True, undo:bool=True):
+    #   Join the open transaction
+    if _transaction["current"]:
+        yield _transaction["current"]
+        return
+
+    record = {"name": name, "ops": 0, "seconds": 0.0, "failed": False}
+    _transaction["current"] = record
+
+    locked = False
+    undoStarted = False
+    startTime = time.perf_counter()
+
+    try:
+        if lock:
+            comp.Lock()
+            locked = True
+        if undo:
+            comp.StartUndo(name)
+            undoStarted = True
+
+        yield record
+
+    except Exception:
+        record["failed"] = True
+        raise
+
+    finally:
+        if undoStarted:
+            try:
+                comp.EndUndo()
+            except Exception as e:
+                logger.warning(f"ERROR: Unable to end undo for {name}:\n{e}")
+        if locked:
+            try:
+                comp.Unlock()
+            except Exception as e:
+                logger.warning(f"ERROR: Unable to unlock Comp after {name}:\n{e}")
+
+        record["seconds"] = time.perf_counter() - startTime
+        _transaction["current"] = None
+        _reportTransaction(record)
+
+
+def _reportTransaction(record:dict) -> None:
+    stats = _transaction["stats"].setdefault(record["name"], {"count": 0, "ops": 0, "seconds": 0.0})
+    stats["count"] += 1
+    stats["ops"] += record["ops"]
+    stats["seconds"] += record["seconds"]
+
+    logger.debug(f"Comp transaction '{record['name']}':  {record['ops']} operations "
+                 f"in {record['seconds']:.3f}s{' (failed)' if record['failed'] else ''}")
+
+    for hook in list(_transaction["hooks"]):
+        try:
+            hook(dict(record))
+        except Exception as e:
+            logger.warning(f"ERROR: Comp transaction hook failed:\n{e}")
+
+
+
+#################################################
+####    COMP SNAPSHOT
+
+#   Reads the commonly used data of each tool in a single sweep and returns it as
+#   plain records, so callers do not query the Fusion bridge per tool repeatedly.
+#
+#   Record:
+#       {
+#           "tool":         Fusion tool object (only used for writes),
+#           "name":         TOOLS_Name,
+#           "type":         TOOLS_RegID,
+#           "uid":          Prism_UUID or None,
+#           "toolData":     Prism_ToolData or None,
+#           "pos":          [x, y] or None,
+#           "passThrough":  TOOLB_PassThrough
+#       }
+#
+#   With dataOnly only the Prism data is read, and name/type/pos/passThrough are None.
+def getCompSnapshot(comp, toolType:str=None, selected:bool=False, prismOnly:bool=False, dataOnly:bool=False) -> list[dict]:
+    records = []
+
+    try:
+        flow = comp.CurrentFrame.FlowView
+        toolList = comp.GetToolList(selected, toolType) if toolType else comp.GetToolList(selected)
+
+        for tool in toolList.values():
+            toolUID = tool.GetData('Prism_UUID')
+            toolData = tool.GetData('Prism_ToolData') if toolUID else None
+
+            if prismOnly and not toolData:
+                continue
+
+            if dataOnly:
+                records.append({
+                    "tool": tool,
+                    "name": None,
+                    "type": None,
+                    "uid": toolUID,
+                    "toolData": toolData,
+                    "pos": None,
+                    "passThrough": None,
+                })
+                continue
+
+            attrs = tool.GetAttrs() or {}
+            posTable = flow.GetPosTable(tool)
+
+            records.append({
+                "tool": tool,
+                "name": attrs.get("TOOLS_Name"),
+                "type": attrs.get("TOOLS_RegID"),
+                "uid": toolUID,
+                "toolData": toolData,
+                "pos": [posTable[1], posTable[2]] if posTable else None,
+                "passThrough": bool(attrs.get("TOOLB_PassThrough", False)),
+            })
+
+        logger.debug(f"Made Comp Snapshot of {len(records)} tools")
+
+    except Exception as e:
+        logger.warning(f"ERROR: Unable to make Comp Snapshot:\n{e}")
+
+    return records
+
+
+#   Returns the Snapshot records of Prism Tools keyed by UID
+def getSnapshotByUID(records:list[dict]) -> dict:
+    return {rec["uid"]: rec for rec in records if rec["uid"] and rec["toolData"]}
+
+
+#   Returns the leftmost upper record of a Snapshot
+def findLeftmostUpperRecord(records:list[dict], threshold:float=0.5) -> dict:
+    nodes = [rec for rec in records if rec["pos"] and rec["type"] != 'Underlay']
+
+    if not nodes:
+        return None
+
+    leftmost = min(nodes, key=lambda rec: rec["pos"][0])   # Smallest x (leftmost)
+    upmost   = min(nodes, key=lambda rec: rec["pos"][1])   # Smallest y (upmost)
+
+    if abs(upmost["pos"][0] - leftmost["pos"][0]) <= threshold:
+        return upmost
+    else:
+        return leftmost
+
+
 def getAllTools(comp, selected:bool=False, cache:dict=None) -> list:
     # Check if cache is provided and ensure it's a dictionary
     if cache is not None:
@@ -533,6 +986,17 @@ def getAllTools(comp, selected:bool=False, cache:dict=None) -> list:
 
     
 def getAllPrismTools(comp, selected:bool=False, category:str=None, toolType:str=None, cache:dict=None) -> list:
+    #   Use the Tool Index for the whole Comp
+    if not selected and cache is None:
+        def entryFilter(entry):
+            if category is not None and entry["toolData"].get("listType") != category:
+                return False
+            if toolType is not None and entry["type"] != toolType:
+                return False
+            return True
+
+        return _getIndexedTools(comp, entryFilter=entryFilter)
+
     allTools = getAllTools(comp, selected=selected, cache=cache)
     prismTools = []
 
@@ -551,10 +1015,24 @@ def getAllPrismTools(comp, selected:bool=False, category:str=None, toolType:str=
 
 def getToolByUID(comp, toolUID:str, cache:dict=None) -> Tool:
     try:
-        for tool in getAllPrismTools(comp, cache=cache):
-            if toolUID == tool.GetData('Prism_UUID'):
-                return tool
-        return None
+        if cache is not None:
+            for tool in getAllPrismTools(comp, cache=cache):
+                if toolUID == tool.GetData('Prism_UUID'):
+                    return tool
+            return None
+
+        getToolIndex(comp)
+        tool = _getIndexedTool(toolUID)
+
+        #   Rebuild once if the indexed Tool is missing or no longer valid
+        if not tool:
+            _toolIndex["stats"]["misses"] += 1
+            getToolIndex(comp, rebuild=True)
+            tool = _getIndexedTool(toolUID)
+        else:
+            _toolIndex["stats"]["hits"] += 1
+
+        return tool
     
     except Exception as e:
         logger.warning(f"ERROR: Unable to get tool by UID: {toolUID}\n{e}")
@@ -562,14 +1040,18 @@ def getToolByUID(comp, toolUID:str, cache:dict=None) -> Tool:
         
 
 def toolExists(comp, toolUID:str, cache:dict=None) -> bool:
-    searchTool = getToolByUID(comp, toolUID, cache=cache)
-    if not searchTool:
-        return False
+    if cache is not None:
+        searchTool = getToolByUID(comp, toolUID, cache=cache)
+        if not searchTool:
+            return False
+
+        searchTool_FusID = searchTool.GetAttrs("TOOLS_UniqueID")
 
-    searchTool_FusID = searchTool.GetAttrs("TOOLS_UniqueID")
+        allTools = getAllTools(comp, cache=cache)
+        return any(searchTool_FusID == tool.GetAttrs("TOOLS_UniqueID") for tool in allTools)
 
-    allTools = getAllTools(comp, cache=cache)
-    return any(searchTool_FusID == tool.GetAttrs("TOOLS_UniqueID") for tool in allTools)
+    #   The Tool Index validates the Tool against the Comp
+    return getToolByUID(comp, toolUID) is not None
 
 
 #   Return Tool's Name
@@ -586,9 +1068,14 @@ def getToolNameByUID(comp, toolUID:str) -> str:
 #   Returns tool that matches name
 def getToolByName(comp, toolName:str) -> Tool:
     try:
-        for tool in getAllPrismTools(comp):
-            if tool.Name == toolName:
-                return tool
+        #   Rebuild once in case the Tool was renamed or pasted
+        for rebuild in [False, True]:
+            index = getToolIndex(comp, rebuild=rebuild)
+            for toolUID in list(index["byName"].get(toolName, [])):
+                tool = _getIndexedTool(toolUID)
+                if tool and tool.Name == toolName:
+                    return tool
+
         logger.warning(f"ERROR: No tool found with the name: {toolName}")
         return None
     
@@ -611,28 +1098,17 @@ def getToolType(tool:Tool) -> str:
 
 def getAllToolsByType(comp, toolType:str) -> list[Tool]:
     try:
-        toolList = []
-        for tool in getAllPrismTools(comp):
-            if getToolType(tool) == toolType:
-                toolList.append(tool)
+        return _getIndexedTools(comp, "byType", toolType)
 
-        return toolList
     except:
         logger.warning(f"ERROR: Unable to get all {toolType} tools from the Comp")
         return None
-    #   Return list of Tool UIDs for a given State UID
 
 
+#   Return list of Tools for a given State UID
 def getToolsFromStateUIDs(comp, stateUID:str) -> list:
-    toolList = []
-
     try:
-        for tool in getAllPrismTools(comp):
-            tData = getToolData(tool)
-            if tData and "stateUID" in tData and tData["stateUID"] == stateUID:
-                toolList.append(tool)
-
-        return toolList
+        return _getIndexedTools(comp, "byState", stateUID)
     
     except:
         logger.warning(f"ERROR:  Unable to get Tools from Comp for State UID {stateUID}")
@@ -678,10 +1154,14 @@ def getUIDsFromImportData(comp, importData:dict, category:str=None, toolType:str
         #   List of items to compare
         compareKeys = ["mediaId", "mediaType", "extension", "aov", "channel", "itemType", "asset", "sequence", "shot"]
 
+        #   Use the indexed Prism Data instead of querying each Tool
+        index = getToolIndex(comp)
+        indexedData = {id(entry["tool"]): entry["toolData"] for entry in index["byUID"].values()}
+
         # Search for a record matching all the available items
         for tool in prismTools:
             match = True  # Assume match unless proven otherwise
-            tData = getToolData(tool)
+            tData = indexedData.get(id(tool)) or getToolData(tool)
             
             #   Itterate through keys and compare if exist in both dicts
             for key in compareKeys:
@@ -753,6 +1233,7 @@ def setPassThrough(comp, toolUID:str=None, tool:str=None, passThrough=False):
     if toolUID:
         tool = getToolByUID(comp, toolUID)
     tool.SetAttrs({"TOOLB_PassThrough": passThrough})
+    countOps()
 
 
 #   Finds if tool has any outputs connected
@@ -798,6 +1279,7 @@ def connectTools(toolFrom:Tool, toolTo:Tool) -> bool:
     try:
         #   Connect MainOutput to 1st MainInput (works for most situations)
         toolTo.FindMainInput(1).ConnectTo(toolFrom)
+        countOps()
         return True
     
     except:
@@ -811,6 +1293,7 @@ def connectInputToOutput(input:ToolOption, output:ToolOption) -> bool:
     try:
         #   Connects input socket object to output socket object
         input.ConnectTo(output)
+        countOps()
         return True
     
     except Exception as e:
@@ -992,6 +1475,7 @@ def getToolPosition(comp, tool:Tool) -> Tuple[float, float]:
 def setToolPosition(flow, tool:Tool, xPos:float, yPos:float):
     try:
         flow.SetPos(tool, xPos, yPos)
+        countOps()
 
     except:
         logger.warning(f"ERROR: Unable to set position of {tool}")
@@ -1226,26 +1710,11 @@ def findLeftmostLowerTool(comp, threshold:float=0.5) -> Tool:
         return None
     
 def findLeftmostUpperTool(comp, threshold: float = 0.5, toolType:str = None) -> Tool:
-    flow = comp.CurrentFrame.FlowView
-
     try:
-        tool_list = comp.GetToolList(False, toolType) if toolType else comp.GetToolList(False)
-
-        nodes = [
-            t for t in tool_list.values()
-            if flow.GetPosTable(t) and t.GetAttrs('TOOLS_RegID') != 'Underlay'
-        ]
-
-        if not nodes:
-            return None
+        records = getCompSnapshot(comp, toolType=toolType)
+        record = findLeftmostUpperRecord(records, threshold=threshold)
 
-        leftmost = min(nodes, key=lambda t: flow.GetPosTable(t)[1])   # Smallest x (leftmost)
-        upmost   = min(nodes, key=lambda t: flow.GetPosTable(t)[2])   # Smallest y (upmost)
-
-        if abs(flow.GetPosTable(upmost)[1] - flow.GetPosTable(leftmost)[1]) <= threshold:
-            return upmost
-        else:
-            return leftmost
+        return record["tool"] if record else None
 
     except Exception as e:
         logger.warning(f"ERROR: Failed to find leftmost upper node: {e}")
@@ -1267,24 +1736,40 @@ def getRefPosition(comp:Composition_, flow:FlowView_) -> tuple[float,float]:
     return atx, aty
 
 
+#   Channels that are not assigned by layer
+LOADER_SKIP_CHANNELS = {
+    "SomethingThatWontMatchHopefully".lower(),
+    "r",
+    "red",
+    "g",
+    "green",
+    "b",
+    "blue",
+    "a",
+    "alpha",
+    "rgb","rgb.r","rgb.g","rgb.b","rgb.a", # Mantra channels
+}
+
+
 def getLoaderChannels(tool) -> list[str]:
     # Get all loader channels and filter out the ones to skip
-    skip = {			
-        "SomethingThatWontMatchHopefully".lower(),
-        "r", 
-        "red", 
-        "g", 
-        "green", 
-        "b", 
-        "blue", 
-        "a", 
-        "alpha",
-        "rgb","rgb.r","rgb.g","rgb.b","rgb.a", # Mantra channels
-    }
     sourceChannels = tool.Clip1.OpenEXRFormat.RedName.GetAttrs("INPIDT_ComboControl_ID")
+    return filterLoaderChannels(sourceChannels.values())
+
+
+#   Gets the channels from the EXR header instead of querying the Loader
+def getFileChannels(filePath:str, partName:str=None) -> list[str]:
+    channels = Image.getExrChannels(filePath, partName)
+    if channels is None:
+        return None
+
+    return filterLoaderChannels(channels)
+
+
+def filterLoaderChannels(channels:list) -> list[str]:
     allChannels = []
-    for channelName in sourceChannels.values():
-        if channelName.lower() not in skip:
+    for channelName in channels:
+        if channelName.lower() not in LOADER_SKIP_CHANNELS:
             allChannels.append(channelName)
 
     # Sort the channel list
@@ -1369,6 +1854,304 @@ def focusOnTool(comp:Composition_, tool:Tool_, scalefactor = 0.5):
 ###        STATE DATA        ###
 
 
+#   The State Manager data is stored per State so a single State change only
+#   writes that entry to the Comp:
+#
+#       prismStateStore     = JSON string of {"version", "revision", "order", "extra", "legacyHash"}
+#       prismState_<key>    = JSON string of each State, keyed by its stateUID/toolUID
+#       prismImportPaths    = Import paths string
+#
+#   States without a UID keep the key of their unchanged entry, or get a new
+#   random key, so reordering States does not rewrite them.
+#
+#   Comps saved with the legacy "prismStates" blob are migrated on first read.
+#   The legacy blob is only written when the Comp is saved through Prism, so
+#   older plugin versions can open the saved file.  If an older version
+#   changed the blob (its hash no longer matches when the store is loaded)
+#   the States are migrated from it again.
+#
+#   The cached store is checked against the prismStateStore string on each
+#   read.  The revision in it changes with every write, so a Comp with the
+#   same name or an undo of the State data is read from the Comp again.
+
+STATESTORE_VERSION = 1
+
+#   Writes the legacy "prismStates" blob on scene save for older plugin versions
+WRITE_LEGACY_STATES = True
+
+_stateStore = {
+    "compName": None,
+    "storeData": None,
+    "revision": 0,
+    "order": [],
+    "extra": "{}",
+    "entries": {},
+    "importPaths": "",
+    "legacyHash": None,
+    "parsed": None,
+    "uidMap": None,
+    "stats": {"writes": 0, "skipped": 0, "reads": 0},
+}
+
+
+#   Clears the cached State data so the next read loads it from the Comp
+def invalidateStateStore() -> None:
+    _stateStore["compName"] = None
+    _stateStore["storeData"] = None
+    _stateStore["revision"] = 0
+    _stateStore["order"] = []
+    _stateStore["extra"] = "{}"
+    _stateStore["entries"] = {}
+    _stateStore["importPaths"] = ""
+    _stateStore["legacyHash"] = None
+    _stateStore["parsed"] = None
+    _stateStore["uidMap"] = None
+
+
+#   Returns write/skip/read counters of the State store
+def getStateStoreStats() -> dict:
+    stats = dict(_stateStore["stats"])
+    stats["states"] = len(_stateStore["order"])
+    return stats
+
+
+#   Returns the index string of the loaded State store, which changes with
+#   every write, so callers can tell if State data they derived is current.
+#   With a Comp the cached store is checked against it first, which only
+#   reads the store index.
+def getStateStoreRevision(comp=None) -> str:
+    if comp is not None:
+        try:
+            if not _loadStateStore(comp):
+                return None
+        except Exception as e:
+            logger.warning(f"ERROR: Unable to read the State store revision:\n{e}")
+            return None
+
+    return _stateStore["storeData"]
+
+
+#   Returns a unique store key for a State.  prevKeys is {entry: key} of the
+#   stored entries, used for States without a UID or with a duplicate UID.
+def _getStateKey(state:dict, entry:str, usedKeys, prevKeys:dict) -> str:
+    key = state.get("stateUID") or state.get("toolUID")
+    if key and key not in usedKeys:
+        return key
+
+    key = prevKeys.pop(entry, None)
+    while not key or key in usedKeys:
+        key = f"state_{Helper.createUUID()}"
+
+    return key
+
+
+def _getLegacyHash(legacyData:str) -> str:
+    if not legacyData:
+        return None
+    return hashlib.sha1(legacyData.encode("utf-8")).hexdigest()
+
+
+#   Writes the legacy "prismStates" blob from the State store if it changed
+def writeLegacyStates(comp) -> None:
+    if not WRITE_LEGACY_STATES:
+        return
+
+    try:
+        if not _loadStateStore(comp):
+            return
+
+        stateData = json.loads(_stateStore["extra"])
+        stateData["states"] = [json.loads(_stateStore["entries"][key]) for key in _stateStore["order"]]
+        legacyData = f"{json.dumps(stateData, indent=4)}_..._{_stateStore['importPaths']}"
+
+        legacyHash = _getLegacyHash(legacyData)
+        if legacyHash == _stateStore["legacyHash"]:
+            return
+
+        comp.SetData("prismStates", legacyData)
+        _stateStore["legacyHash"] = legacyHash
+        _writeStateStoreIndex(comp)
+
+    except Exception as e:
+        logger.warning(f"ERROR: Unable to write the legacy State data:\n{e}")
+
+
+#   Writes the index of the State store to the Comp with a new revision
+def _writeStateStoreIndex(comp) -> None:
+    _stateStore["revision"] += 1
+    storeIndex = {"version": STATESTORE_VERSION,
+                  "revision": _stateStore["revision"],
+                  "order": _stateStore["order"],
+                  "extra": _stateStore["extra"],
+                  "legacyHash": _stateStore["legacyHash"]}
+
+    storeData = json.dumps(storeIndex)
+    comp.SetData("prismStateStore", storeData)
+    _stateStore["storeData"] = storeData
+
+
+#   Converts the legacy "prismStates" blob to the State store
+def _migrateLegacyStates(comp, legacyData:str) -> bool:
+    try:
+        parts = legacyData.split("_..._")
+        stateStr = parts[0]
+        importPaths = parts[1] if len(parts) > 1 else ""
+
+        _stateStore["importPaths"] = importPaths
+        comp.SetData("prismImportPaths", importPaths)
+
+        #   The blob is kept for older plugin versions
+        _stateStore["legacyHash"] = _getLegacyHash(legacyData)
+        _writeStates(comp, stateStr, force=True)
+
+        logger.debug(f"Migrated {len(_stateStore['order'])} States from the legacy State data")
+        return True
+
+    except Exception as e:
+        logger.warning(f"ERROR: Unable to migrate the legacy State data:\n{e}")
+        return False
+
+
+#   Loads the State store from the Comp if the cache is not current
+def _loadStateStore(comp) -> bool:
+    compName = _getCompName(comp)
+    storeData = comp.GetData("prismStateStore")
+
+    if (_stateStore["compName"] is not None
+        and _stateStore["compName"] == compName
+        and _stateStore["storeData"] == storeData):
+        return True
+
+    invalidateStateStore()
+    _stateStore["compName"] = compName
+
+    storeIndex = None
+    if storeData:
+        try:
+            storeIndex = json.loads(storeData)
+        except ValueError as e:
+            logger.warning(f"ERROR: The State store of the Comp is corrupt, using the legacy State data:\n{e}")
+
+    legacyData = comp.GetData("prismStates")
+
+    #   New Comp, corrupt store, or States changed by an older plugin version
+    if not storeIndex or (legacyData and _getLegacyHash(legacyData) != storeIndex.get("legacyHash")):
+        if legacyData:
+            return _migrateLegacyStates(comp, legacyData)
+        return False
+
+    _stateStore["storeData"] = storeData
+    _stateStore["revision"] = storeIndex.get("revision", 0)
+    _stateStore["order"] = list(storeIndex.get("order", []))
+    _stateStore["extra"] = storeIndex.get("extra", "{}")
+    _stateStore["legacyHash"] = storeIndex.get("legacyHash")
+
+    for key in _stateStore["order"]:
+        _stateStore["entries"][key] = comp.GetData(f"prismState_{key}") or "{}"
+
+    _stateStore["importPaths"] = comp.GetData("prismImportPaths") or ""
+    _stateStore["stats"]["reads"] += 1
+
+    return True
+
+
+#   Writes only the changed States of the serialized State data
+def _writeStates(comp, buf:str, force:bool=False) -> None:
+    stateData = json.loads(buf)
+    states = stateData.get("states", [])
+    extra = json.dumps({k: v for k, v in stateData.items() if k != "states"})
+
+    newOrder = []
+    newEntries = {}
+    prevKeys = {entry: key for key, entry in _stateStore["entries"].items()}
+
+    for state in states:
+        entry = json.dumps(state)
+        key = _getStateKey(state, entry, newEntries, prevKeys)
+        newOrder.append(key)
+        newEntries[key] = entry
+
+    changed = force
+
+    #   Write the changed States
+    for key in newOrder:
+        if force or _stateStore["entries"].get(key) != newEntries[key]:
+            comp.SetData(f"prismState_{key}", newEntries[key])
+            _stateStore["stats"]["writes"] += 1
+            changed = True
+        else:
+            _stateStore["stats"]["skipped"] += 1
+
+    #   Remove deleted States
+    for key in _stateStore["entries"]:
+        if key not in newEntries:
+            comp.SetData(f"prismState_{key}", None)
+            changed = True
+
+    if newOrder != _stateStore["order"] or extra != _stateStore["extra"]:
+        changed = True
+
+    _stateStore["order"] = newOrder
+    _stateStore["extra"] = extra
+    _stateStore["entries"] = newEntries
+    _stateStore["parsed"] = None
+    _stateStore["uidMap"] = None
+    _stateStore["compName"] = _getCompName(comp)
+
+    if changed:
+        _writeStateStoreIndex(comp)
+
+
+#   Returns the cached parsed State data, which must not be changed
+def _getParsedStates(comp) -> dict:
+    if not _loadStateStore(comp):
+        return None
+
+    if _stateStore["parsed"] is None:
+        if not _stateStore["order"] and _stateStore["extra"] == "{}":
+            return None
+
+        stateData = json.loads(_stateStore["extra"])
+        stateData["states"] = [json.loads(_stateStore["entries"][key]) for key in _stateStore["order"]]
+        _stateStore["parsed"] = stateData
+
+    return _stateStore["parsed"]
+
+
+#   Returns a copy of the parsed State data dict
+def getStatesData(comp) -> dict:
+    try:
+        stateData = _getParsedStates(comp)
+        return copy.deepcopy(stateData) if stateData else None
+
+    except Exception as e:
+        logger.warning(f"ERROR:  Unable to read State Data from comp:\n{e}")
+        return None
+
+
+#   Returns a copy of a State's data by its toolUID or stateUID
+def getStateDataByUID(comp, UID:str) -> dict:
+    try:
+        stateData = _getParsedStates(comp)
+    except Exception as e:
+        logger.warning(f"ERROR:  Unable to read State Data from comp:\n{e}")
+        return None
+
+    if not stateData:
+        return None
+
+    if _stateStore["uidMap"] is None:
+        uidMap = {}
+        for state in stateData.get("states", []):
+            for uidKey in ["toolUID", "stateUID"]:
+                if state.get(uidKey):
+                    uidMap.setdefault(state[uidKey], state)
+        _stateStore["uidMap"] = uidMap
+
+    state = _stateStore["uidMap"].get(UID)
+    return copy.deepcopy(state) if state else None
+
+
 def setDefaultState(comp):
     defaultState = """{
     "states": [
@@ -1378,10 +2161,10 @@ def setDefaultState(comp):
             "description": ""
         }
     ]
-}_..._
-"""
+}"""
     try:
-        comp.SetData("prismStates", defaultState)
+        _loadStateStore(comp)
+        _writeStates(comp, defaultState)
         logger.debug("Saved the empty state data to the comp")
     except:
         logger.warning(f"ERROR: Unable to save default State Data to comp: {comp}")
@@ -1390,40 +2173,45 @@ def setDefaultState(comp):
 
 def sm_saveStates(comp, buf:str):
     try:
-        comp.SetData("prismStates", buf + "_..._")
+        _loadStateStore(comp)
+        _writeStates(comp, buf)
         logger.debug(f"Saved the state data to the comp.")
-    except:
-        logger.warning(f"ERROR: Unable to save State Data to comp: {comp}")
+    except Exception as e:
+        logger.warning(f"ERROR: Unable to save State Data to comp: {comp}\n{e}")
 
 
 
 def sm_saveImports(comp, importPaths:str):
-    prismdata = comp.GetData("prismStates")
-    prismdata += importPaths.replace("\\\\", "\\")
-    comp.SetData("prismStates", prismdata)
+    _loadStateStore(comp)
+    importPaths = importPaths.replace("\\\\", "\\")
+
+    if importPaths != _stateStore["importPaths"]:
+        comp.SetData("prismImportPaths", importPaths)
+        _stateStore["importPaths"] = importPaths
+        _writeStateStoreIndex(comp)
 
 
 
 def sm_readStates(comp) -> str:
     try:
-        prismdata = comp.GetData("prismStates")
-        if not prismdata:
+        stateData = getStatesData(comp)
+        if not stateData:
             logger.debug("Prism State Data does not exist.")
         else:
-            return prismdata.split("_..._")[0]
+            return json.dumps(stateData)
     except:
         logger.warning(f"ERROR:  Unable to read State Data from comp: {comp}")
         logger.warning(f"ERROR:  Resetting Prism State Data")
-        setDefaultState()
+        setDefaultState(comp)
 
 
 #	Gets called from SM to remove all States
 
 def sm_deleteStates(comp):
     #	Sets the states datablock to empty default state
-    setDefaultState()
+    setDefaultState(comp)
 
 
 def getImportPaths(comp) -> str:
-    prismdata = comp.GetData("prismStates")
-    return prismdata.split("_..._")[1]
\ No newline at end of file
+    _loadStateStore(comp)
+    return _stateStore["importPaths"]
@@ -58,7 +58,9 @@ from datetime import datetime
 import uuid
 import hashlib
 
-from PrismUtils.Decorators import err_catcher as err_catcher
+from Libs.Prism_Fusion_lib_Profiler import err_catcher
+
+import Libs.Prism_Fusion_lib_Image as Image
 
 #   For Python Type Hints
 FusionComp = Dict
@@ -113,6 +115,71 @@ def getAovNamesFromAovDict(aovDict:list) -> list:
 		
 
 
+#   Analyzes the frames of an image sequence:
+#       {
+#           "pattern":  filename with the frame number replaced by #'s,
+#           "frames":   sorted list of frame numbers,
+#           "gaps":     list of missing (first, last) frame ranges,
+#           "padding":  number of frame digits
+#       }
+#   Returns None if the files are not numbered.
+
+SEQ_FRAME_REGEX = re.compile(r"^(.*?)(-?\d+)(\.[^.]+)$")
+
+def getSequenceInfo(seqFiles:list) -> dict:
+    frames = set()
+    pattern = None
+    padding = None
+
+    for filePath in seqFiles:
+        match = SEQ_FRAME_REGEX.match(os.path.basename(filePath))
+        if not match:
+            continue
+
+        prefix, frameStr, ext = match.groups()
+        digits = len(frameStr.lstrip("-"))
+        if padding is None or digits < padding:
+            padding = digits
+            pattern = prefix + "#" * digits + ext
+
+        frames.add(int(frameStr))
+
+    if not frames:
+        return None
+
+    frames = sorted(frames)
+
+    gaps = []
+    for prevFrame, frame in zip(frames, frames[1:]):
+        if frame - prevFrame > 1:
+            gaps.append((prevFrame + 1, frame - 1))
+
+    return {"pattern": pattern,
+            "frames": frames,
+            "gaps": gaps,
+            "padding": padding}
+
+
+
+#   Returns [versionDir, productDir] of a media or product filepath, where
+#   versionDir is the first parent folder named as the version.
+#   Returns an empty list if the version folder is not in the path.
+
+def getVersionDirs(filePath:str, version:str) -> list:
+    if not filePath or not version:
+        return []
+
+    curDir = os.path.dirname(os.path.normpath(filePath))
+    while os.path.basename(curDir) != version:
+        parentDir = os.path.dirname(curDir)
+        if parentDir == curDir:
+            return []
+        curDir = parentDir
+
+    return [curDir, os.path.dirname(curDir)]
+
+
+
 #	Configures name to conform with Fusion Restrictions
 
 def getFusLegalName(origName:str, check:bool=False) -> str:			#	TODO  Restructure and logging
@@ -295,7 +362,9 @@ def makeImportData(plugin, context:dict, aovDict:dict, sourceData:dict) -> dict:
     importData["extension"] = extension
 
     try:
-        channels = plugin.core.media.getLayersFromFile(basefile)
+        channels = Image.getExrLayers(basefile)
+        if channels is None:
+            channels = plugin.core.media.getLayersFromFile(basefile)
         importData["channels"] = channels
 
     except Exception as e:
@@ -418,4 +487,77 @@ def calculateLuminance(color:dict) -> float:
 
 def isBgBright(color:dict, threshold=0.5) -> bool:
     luminance = calculateLuminance(color)
-    return luminance > threshold
\ No newline at end of file
+    return luminance > threshold
+
+#   Calculates the sorted Loader layout without touching the Comp.
+#   Each item is a dict of plain data read from the Comp:
+#       {
+#           "id":       tool name,
+#           "stateUID": State UID of the Loader,
+#           "mediaId":  Media ID of the Loader,
+#           "pos":      [x, y] of the Loader,
+#           "nextId":   tool name connected to the Loader output or None,
+#           "inId":     Wireless_IN tool name or None,
+#           "inPos":    [x, y] of the Wireless_IN or None,
+#           "outId":    Wireless_OUT tool name or None,
+#           "outPos":   [x, y] of the Wireless_OUT or None
+#       }
+#   Returns a dict of {id: (x, y)} with the new position of each tool to move.
+def calcLoaderLayout(items:list,
+                     stateOrder:list,
+                     refPos:Tuple[float, float],
+                     refInNodes:bool,
+                     offset:float=1.5,
+                     toolThresh:float=3,
+                     horzGap:float=1.1,
+                     vertGap:float=1
+                     ) -> dict:
+    
+    positions = {}
+
+    if not items:
+        return positions
+
+    #   Sort first by State order, then by name
+    stateIndex = {uid: index for index, uid in enumerate(stateOrder)}
+    sortedItems = sorted(items, key=lambda item: (stateIndex.get(item["stateUID"], len(stateOrder)),
+                                                  item["id"].lower()))
+
+    #   Start at the topmost Loader, or under the reference tool if it is not sorted
+    new_X = refPos[0]
+    if refInNodes:
+        new_Y = min(item["pos"][1] for item in items)
+    else:
+        new_Y = refPos[1] + offset
+
+    lastMediaId = sortedItems[0]["mediaId"]
+
+    for item in sortedItems:
+        #   Add a gap between Media IDs
+        if item["mediaId"] != lastMediaId:
+            new_Y += vertGap
+
+        positions[item["id"]] = (new_X, new_Y)
+
+        inId = item.get("inId")
+        nextId = item.get("nextId")
+        inPos = item.get("inPos")
+
+        #   Place the next tool and Wireless_IN to the right of the Loader
+        if inId and nextId:
+            if nextId != inId:
+                positions[nextId] = (new_X + horzGap, new_Y)
+            positions[inId] = (new_X + horzGap * 2, new_Y)
+
+        #   Keep Wireless_OUT next to Wireless_IN if it was near it
+        outId = item.get("outId")
+        outPos = item.get("outPos")
+        if inId and outId and inPos and outPos:
+            if abs(outPos[0] - inPos[0]) <= toolThresh and abs(outPos[1] - inPos[1]) <= toolThresh:
+                inX, inY = positions.get(inId, inPos)
+                positions[outId] = (inX + horzGap, inY)
+
+        new_Y += vertGap
+        lastMediaId = item["mediaId"]
+
+    return positions
@@ -0,0 +1,703 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2023 Richard Frangenberg
+# Copyright (C) 2023 Prism Software GmbH
+#
+# Licensed under GNU LGPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+###########################################################################
+#
+#                BMD Fusion Studio Integration for Prism2
+#
+#             https://github.com/Animatect/Prism2_PluginFusion
+#
+#                           Esteban Covo
+#                     e.covo@magichammer.com.mx
+#                     https://magichammer.com.mx
+#
+#                           Joshua Breckeen
+#                              Alta Arts
+#                          josh@alta-arts.com
+#
+###########################################################################
+
+
+
+##  THIS IS A LIBRARY FOR IMAGE FILE FUNCTIONS FOR THE FUSION PRISM PLUGIN  ##
+
+
+import os
+import re
+import mmap
+import struct
+import threading
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+#   Channel names for the simple formats
+CHANNELS_GRAY = ["Y"]
+CHANNELS_GRAY_ALPHA = ["Y", "A"]
+CHANNELS_RGB = ["R", "G", "B"]
+CHANNELS_RGBA = ["R", "G", "B", "A"]
+
+
+#   Returns the image info read from the file header without decoding pixels:
+#       {
+#           "width":     int,
+#           "height":    int,
+#           "channels":  list of channel names,
+#           "parts":     list of part names (multi-part EXR only)
+#       }
+#   Returns None if the format is not supported or the header cannot be read.
+def getImageInfo(filePath:str) -> dict:
+    ext = os.path.splitext(filePath)[1].lower()
+
+    #   EXR headers are read through the header cache
+    if ext == ".exr":
+        return _readExrInfo(filePath)
+
+    readers = {".dpx": _readDpxInfo,
+               ".png": _readPngInfo,
+               ".tif": _readTiffInfo,
+               ".tiff": _readTiffInfo,
+               ".jpg": _readJpegInfo,
+               ".jpeg": _readJpegInfo}
+
+    reader = readers.get(ext)
+    if not reader:
+        return None
+
+    try:
+        with open(filePath, "rb") as f:
+            return reader(f)
+
+    except Exception as e:
+        logger.debug(f"Unable to read image header of {filePath}: {e}")
+        return None
+
+
+#   Returns (width, height) from the file header or None
+def getImageSize(filePath:str) -> tuple:
+    info = getImageInfo(filePath)
+    if info and info["width"] and info["height"]:
+        return info["width"], info["height"]
+    return None
+
+
+#   Groups channel names into layers the same way as Prism.
+#   Channels without a layer prefix are grouped as "Color".
+def getLayersFromChannels(channels:list) -> list:
+    layers = []
+    for channel in channels:
+        if "." in channel:
+            layer = channel.rsplit(".", 1)[0]
+        else:
+            layer = "Color"
+
+        if layer not in layers:
+            layers.append(layer)
+
+    return layers
+
+
+#   Returns the layers of an EXR from the file header.  The layers of a
+#   multi-part file are its part names, since the Loader selects the part
+#   by the layer name and the parts often use unprefixed channels.
+#   Returns None for other formats or if the header cannot be read.
+def getExrLayers(filePath:str) -> list:
+    if os.path.splitext(filePath)[1].lower() != ".exr":
+        return None
+
+    header = getExrHeader(filePath)
+    if not header:
+        return None
+
+    if header["multiPart"]:
+        partNames = []
+        for part in header["parts"]:
+            if part["name"] and part["name"] not in partNames:
+                partNames.append(part["name"])
+        if partNames:
+            return partNames
+
+    return getLayersFromChannels(getExrChannels(filePath))
+
+
+def _makeInfo(width:int, height:int, channels:list, parts:list=None) -> dict:
+    return {"width": width,
+            "height": height,
+            "channels": channels,
+            "parts": parts or []}
+
+
+####    PNG     ####
+
+def _readPngInfo(f) -> dict:
+    data = f.read(33)
+    if data[:8] != b"\x89PNG\r\n\x1a\n" or data[12:16] != b"IHDR":
+        return None
+
+    width, height, _bitDepth, colorType = struct.unpack(">IIBB", data[16:26])
+
+    channels = {0: CHANNELS_GRAY,
+                2: CHANNELS_RGB,
+                3: CHANNELS_RGB,
+                4: CHANNELS_GRAY_ALPHA,
+                6: CHANNELS_RGBA}.get(colorType, CHANNELS_RGB)
+
+    return _makeInfo(width, height, list(channels))
+
+
+####    JPEG    ####
+
+#   Start Of Frame markers that hold the image size
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def _readJpegInfo(f) -> dict:
+    if f.read(2) != b"\xff\xd8":
+        return None
+
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b"\xff":
+            continue
+
+        marker = f.read(1)
+        #   Skip fill bytes
+        while marker == b"\xff":
+            marker = f.read(1)
+        if not marker:
+            return None
+
+        markerId = marker[0]
+
+        #   Markers without a length
+        if markerId in (0x01, 0xD8) or 0xD0 <= markerId <= 0xD7:
+            continue
+        if markerId == 0xD9:
+            return None
+
+        segLength = struct.unpack(">H", f.read(2))[0]
+
+        if markerId in JPEG_SOF_MARKERS:
+            _precision, height, width, components = struct.unpack(">BHHB", f.read(6))
+            channels = CHANNELS_GRAY if components == 1 else CHANNELS_RGB
+            return _makeInfo(width, height, list(channels))
+
+        f.seek(segLength - 2, 1)
+
+
+####    TIFF    ####
+
+TIFF_TAG_WIDTH = 256
+TIFF_TAG_HEIGHT = 257
+TIFF_TAG_SAMPLES = 277
+TIFF_TAG_PHOTOMETRIC = 262
+
+def _readTiffInfo(f) -> dict:
+    header = f.read(8)
+    if header[:4] == b"II*\x00":
+        endian = "<"
+    elif header[:4] == b"MM\x00*":
+        endian = ">"
+    else:
+        #   BigTIFF and unknown variants
+        return None
+
+    ifdOffset = struct.unpack(endian + "I", header[4:8])[0]
+    f.seek(ifdOffset)
+    entryCount = struct.unpack(endian + "H", f.read(2))[0]
+    entries = f.read(entryCount * 12)
+
+    tags = {}
+    for idx in range(entryCount):
+        tag, fieldType, _count, value = struct.unpack(endian + "HHI4s", entries[idx * 12: idx * 12 + 12])
+        #   SHORT values are stored in the first two bytes
+        if fieldType == 3:
+            tags[tag] = struct.unpack(endian + "H", value[:2])[0]
+        elif fieldType == 4:
+            tags[tag] = struct.unpack(endian + "I", value)[0]
+
+    width = tags.get(TIFF_TAG_WIDTH)
+    height = tags.get(TIFF_TAG_HEIGHT)
+    if not width or not height:
+        return None
+
+    samples = tags.get(TIFF_TAG_SAMPLES, 1)
+    channels = {1: CHANNELS_GRAY,
+                2: CHANNELS_GRAY_ALPHA,
+                3: CHANNELS_RGB,
+                4: CHANNELS_RGBA}.get(samples, CHANNELS_RGBA)
+
+    return _makeInfo(width, height, list(channels))
+
+
+####    DPX     ####
+
+#   Image element descriptors
+DPX_DESCRIPTORS = {1: ["R"],
+                   2: ["G"],
+                   3: ["B"],
+                   4: ["A"],
+                   6: ["Y"],
+                   50: CHANNELS_RGB,
+                   51: CHANNELS_RGBA,
+                   52: ["A", "B", "G", "R"]}
+
+def _readDpxInfo(f) -> dict:
+    header = f.read(804)
+    if header[:4] == b"SDPX":
+        endian = ">"
+    elif header[:4] == b"XPDS":
+        endian = "<"
+    else:
+        return None
+
+    width, height = struct.unpack(endian + "II", header[772:780])
+    descriptor = header[800]
+    channels = DPX_DESCRIPTORS.get(descriptor, CHANNELS_RGB)
+
+    return _makeInfo(width, height, list(channels))
+
+
+####    EXR     ####
+
+EXR_MAGIC = 20000630
+
+#   Version field flags
+EXR_FLAG_TILED = 0x200
+EXR_FLAG_NON_IMAGE = 0x800
+EXR_FLAG_MULTIPART = 0x1000
+
+#   Max number of parsed headers kept in memory
+EXR_CACHE_MAX_ENTRIES = 512
+
+#   Parsed headers by path:  {path: (signature, header)}
+_exrHeaderCache = {}
+_exrCacheLock = threading.Lock()
+
+
+#   Returns the parsed header of an EXR file:
+#       {
+#           "multiPart":    bool,
+#           "deep":         bool,
+#           "tiled":        bool,
+#           "parts":        [{"name":           part name or None,
+#                             "type":           "scanlineimage", "tiledimage", "deepscanline" or "deeptile",
+#                             "channels":       list of channel names,
+#                             "dataWindow":     (xMin, yMin, xMax, yMax),
+#                             "displayWindow":  (xMin, yMin, xMax, yMax),
+#                             "compression":    compression id,
+#                             "chunkCount":     number of chunks or None,
+#                             "tiles":          (xSize, ySize, levelMode) or None}],
+#           "headerSize":   bytes before the offset tables
+#       }
+#   Headers are cached per path and file modification time.
+#   The returned dict is shared and should not be modified.
+def getExrHeader(filePath:str) -> dict:
+    try:
+        stat = os.stat(filePath)
+    except OSError:
+        return None
+
+    signature = (stat.st_size, stat.st_mtime_ns)
+
+    with _exrCacheLock:
+        cached = _exrHeaderCache.get(filePath)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    try:
+        with open(filePath, "rb") as f:
+            #   Only the pages holding the header are read from disk
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                header = _parseExrHeader(data)
+
+    except Exception as e:
+        logger.debug(f"Unable to read EXR header of {filePath}: {e}")
+        header = None
+
+    with _exrCacheLock:
+        _exrHeaderCache.pop(filePath, None)
+        if len(_exrHeaderCache) >= EXR_CACHE_MAX_ENTRIES:
+            _exrHeaderCache.pop(next(iter(_exrHeaderCache)))
+        _exrHeaderCache[filePath] = (signature, header)
+
+    return header
+
+
+def clearExrHeaderCache():
+    with _exrCacheLock:
+        _exrHeaderCache.clear()
+
+
+#   Returns the part names of a multi-part EXR.  Single-part files return an empty list.
+def getExrPartNames(filePath:str) -> list:
+    header = getExrHeader(filePath)
+    if not header:
+        return []
+
+    return [part["name"] for part in header["parts"] if part["name"]]
+
+
+#   Returns the channel names of an EXR.  If partName is passed only the
+#   channels of that part are returned, otherwise the channels of all parts.
+def getExrChannels(filePath:str, partName:str=None) -> list:
+    header = getExrHeader(filePath)
+    if not header:
+        return None
+
+    channels = []
+    for part in header["parts"]:
+        if partName and part["name"] != partName:
+            continue
+        for channel in part["channels"]:
+            if channel not in channels:
+                channels.append(channel)
+
+    return channels
+
+
+def _readExrInfo(filePath:str) -> dict:
+    header = getExrHeader(filePath)
+    if not header:
+        return None
+
+    xMin, yMin, xMax, yMax = header["parts"][0]["dataWindow"]
+
+    return _makeInfo(xMax - xMin + 1,
+                     yMax - yMin + 1,
+                     getExrChannels(filePath),
+                     getExrPartNames(filePath))
+
+
+#   Parses the header attributes from the start of the file data
+def _parseExrHeader(data) -> dict:
+    magic, version = struct.unpack("<II", data[:8])
+    if magic != EXR_MAGIC:
+        return None
+
+    isMultiPart = bool(version & EXR_FLAG_MULTIPART)
+    isTiled = bool(version & EXR_FLAG_TILED)
+    isNonImage = bool(version & EXR_FLAG_NON_IMAGE)
+
+    #   Single-part files may not have a type attribute
+    if isNonImage:
+        defaultType = "deeptile" if isTiled else "deepscanline"
+    else:
+        defaultType = "tiledimage" if isTiled else "scanlineimage"
+
+    pos = 8
+    parts = []
+    while True:
+        part = {"name": None,
+                "type": defaultType,
+                "channels": [],
+                "dataWindow": (0, 0, -1, -1),
+                "displayWindow": (0, 0, -1, -1),
+                "compression": 0,
+                "chunkCount": None,
+                "tiles": None}
+
+        while True:
+            #   End of header
+            if data[pos] == 0:
+                pos += 1
+                break
+
+            attrName, pos = _readExrString(data, pos)
+            attrType, pos = _readExrString(data, pos)
+            attrSize = struct.unpack("<i", data[pos:pos + 4])[0]
+            pos += 4
+            value = data[pos:pos + attrSize]
+            if len(value) != attrSize:
+                raise ValueError("Truncated EXR header")
+            pos += attrSize
+
+            if attrType == "chlist":
+                part["channels"] = _parseExrChlist(value)
+            elif attrType == "box2i" and attrName in ("dataWindow", "displayWindow"):
+                part[attrName] = struct.unpack("<iiii", value)
+            elif attrType == "string" and attrName in ("name", "type"):
+                part[attrName] = value.decode("utf-8", "replace")
+            elif attrType == "compression":
+                part["compression"] = value[0]
+            elif attrType == "int" and attrName == "chunkCount":
+                part["chunkCount"] = struct.unpack("<i", value)[0]
+            elif attrType == "tiledesc":
+                #   (xSize, ySize, levelMode)
+                xSize, ySize, mode = struct.unpack("<IIB", value[:9])
+                part["tiles"] = (xSize, ySize, mode & 0x0F)
+
+        parts.append(part)
+
+        #   Multi-part headers end with an empty header
+        if not isMultiPart:
+            break
+        if data[pos] == 0:
+            pos += 1
+            break
+
+    return {"multiPart": isMultiPart,
+            "deep": any(part["type"].startswith("deep") for part in parts),
+            "tiled": isTiled or any(part["type"].endswith("tile") for part in parts),
+            "parts": parts,
+            "headerSize": pos}
+
+
+def _readExrString(data, pos:int) -> tuple:
+    end = data.find(b"\x00", pos)
+    if end == -1:
+        raise ValueError("Truncated EXR header")
+
+    return data[pos:end].decode("utf-8", "replace"), end + 1
+
+
+#   Returns the channel names of an EXR chlist attribute
+def _parseExrChlist(value:bytes) -> list:
+    channels = []
+    pos = 0
+    while pos < len(value) and value[pos] != 0:
+        end = value.index(b"\x00", pos)
+        channels.append(value[pos:end].decode("utf-8", "replace"))
+        #   Skip pixel type, pLinear, reserved, xSampling and ySampling
+        pos = end + 1 + 16
+
+    return channels
+
+
+
+#   Scanlines per chunk for each compression
+EXR_LINES_PER_CHUNK = {0: 1,    # NONE
+                       1: 1,    # RLE
+                       2: 1,    # ZIPS
+                       3: 16,   # ZIP
+                       4: 32,   # PIZ
+                       5: 16,   # PXR24
+                       6: 32,   # B44
+                       7: 32,   # B44A
+                       8: 32,   # DWAA
+                       9: 256}  # DWAB
+
+
+#   Returns the number of chunks of a part or None if it cannot be derived
+def _getExrChunkCount(part:dict) -> int:
+    if part["chunkCount"]:
+        return part["chunkCount"]
+
+    xMin, yMin, xMax, yMax = part["dataWindow"]
+    width = xMax - xMin + 1
+    height = yMax - yMin + 1
+
+    if part["tiles"]:
+        xSize, ySize, levelMode = part["tiles"]
+        #   Only single level tiles can be counted without the level sizes
+        if levelMode != 0 or not xSize or not ySize:
+            return None
+        return -(-width // xSize) * -(-height // ySize)
+
+    linesPerChunk = EXR_LINES_PER_CHUNK.get(part["compression"])
+    if not linesPerChunk:
+        return None
+
+    return -(-height // linesPerChunk)
+
+
+#   Checks that an EXR is complete:  the header parses, the offset tables are
+#   filled in and the last chunk ends inside the file.
+#   Returns False for truncated or partially written files.
+def isExrComplete(filePath:str) -> bool:
+    header = getExrHeader(filePath)
+    if not header:
+        return False
+
+    chunkCounts = [_getExrChunkCount(part) for part in header["parts"]]
+    if None in chunkCounts:
+        #   Unable to locate the offset tables, the header is all that can be checked
+        return True
+
+    try:
+        with open(filePath, "rb") as f:
+            fileSize = os.fstat(f.fileno()).st_size
+            f.seek(header["headerSize"])
+
+            tableSize = sum(chunkCounts) * 8
+            table = f.read(tableSize)
+            if len(table) != tableSize:
+                return False
+
+            offsets = struct.unpack(f"<{sum(chunkCounts)}Q", table)
+            if not offsets:
+                return True
+
+            #   Unwritten chunks are left as zero
+            if min(offsets) < header["headerSize"] + tableSize or max(offsets) >= fileSize:
+                return False
+
+            #   Find the part of the last chunk
+            lastOffset = max(offsets)
+            lastIdx = offsets.index(lastOffset)
+            partIdx = 0
+            while lastIdx >= chunkCounts[partIdx]:
+                lastIdx -= chunkCounts[partIdx]
+                partIdx += 1
+            part = header["parts"][partIdx]
+
+            #   Deep chunks have a different layout
+            if part["type"].startswith("deep"):
+                return True
+
+            #   Chunk:  [part number], y or tile coords, data size, data
+            chunkHeader = (4 if header["multiPart"] else 0) + (16 if part["tiles"] else 4)
+            f.seek(lastOffset + chunkHeader)
+            sizeData = f.read(4)
+            if len(sizeData) != 4:
+                return False
+
+            dataSize = struct.unpack("<i", sizeData)[0]
+            return 0 <= dataSize and lastOffset + chunkHeader + 4 + dataSize <= fileSize
+
+    except OSError:
+        return False
+
+
+
+#########################
+####    SEQUENCES    ####
+
+#   Frames smaller than this ratio of the median frame size are reported
+SEQ_OUTLIER_RATIO = 0.5
+
+#   Max number of frame checks kept in memory
+SEQ_FRAME_CACHE_MAX_ENTRIES = 16384
+
+#   EXR completeness by path:  {path: (signature, complete)}
+_frameCompleteCache = {}
+_frameCacheLock = threading.Lock()
+
+
+#   Returns isExrComplete() for a frame, reading it again only if the frame
+#   size or modification time changed (frames overwritten in place do not
+#   change the directory mtime)
+def _isFrameComplete(filePath:str, signature:tuple) -> bool:
+    with _frameCacheLock:
+        cached = _frameCompleteCache.get(filePath)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    complete = isExrComplete(filePath)
+
+    with _frameCacheLock:
+        _frameCompleteCache.pop(filePath, None)
+        if len(_frameCompleteCache) >= SEQ_FRAME_CACHE_MAX_ENTRIES:
+            _frameCompleteCache.pop(next(iter(_frameCompleteCache)))
+        _frameCompleteCache[filePath] = (signature, complete)
+
+    return complete
+
+
+#   Checks the frames of an image sequence on disk.  fileName is the sequence
+#   filename with the frame number as #'s (like render.####.exr), and fileNames
+#   can be passed from a cached directory listing.
+#   Returns None if fileName is not a sequence, else:
+#       {
+#           "first":        first frame,
+#           "last":         last frame,
+#           "count":        number of frames found,
+#           "missing":      list of missing (first, last) frame ranges,
+#           "missingCount": number of missing frames,
+#           "empty":        zero-byte frames,
+#           "truncated":    incomplete EXR frames,
+#           "outliers":     frames much smaller than the median size
+#       }
+def analyzeSequence(dirPath:str, fileName:str, fileNames:list=None) -> dict:
+    match = re.match(r"^(.*?)(#+)(.*)$", fileName)
+    if not match:
+        return None
+
+    prefix, _hashes, suffix = match.groups()
+    frameRegex = re.compile(re.escape(prefix) + r"(-?\d+)" + re.escape(suffix) + "$")
+
+    if fileNames is None:
+        fileNames = os.listdir(dirPath)
+
+    frameFiles = {}
+    for name in fileNames:
+        frameMatch = frameRegex.match(name)
+        if frameMatch:
+            frameFiles[int(frameMatch.group(1))] = os.path.join(dirPath, name)
+
+    result = {"first": None,
+              "last": None,
+              "count": len(frameFiles),
+              "missing": [],
+              "missingCount": 0,
+              "empty": [],
+              "truncated": [],
+              "outliers": []}
+
+    if not frameFiles:
+        return result
+
+    frames = sorted(frameFiles)
+    result["first"] = frames[0]
+    result["last"] = frames[-1]
+
+    for prevFrame, frame in zip(frames, frames[1:]):
+        if frame - prevFrame > 1:
+            result["missing"].append((prevFrame + 1, frame - 1))
+            result["missingCount"] += frame - prevFrame - 1
+
+    sizes = {}
+    signatures = {}
+    for frame in frames:
+        try:
+            stat = os.stat(frameFiles[frame])
+            sizes[frame] = stat.st_size
+            signatures[frame] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            sizes[frame] = 0
+
+    result["empty"] = [frame for frame in frames if sizes[frame] == 0]
+
+    validSizes = sorted(size for size in sizes.values() if size > 0)
+    if validSizes:
+        median = validSizes[len(validSizes) // 2]
+        result["outliers"] = [frame for frame in frames
+                              if 0 < sizes[frame] < median * SEQ_OUTLIER_RATIO]
+
+    if suffix.lower().endswith(".exr"):
+        result["truncated"] = [frame for frame in frames
+                               if sizes[frame] > 0 and not _isFrameComplete(frameFiles[frame], signatures[frame])]
+
+    return result
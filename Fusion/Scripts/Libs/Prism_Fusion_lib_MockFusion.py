@@ -0,0 +1,965 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2023 Richard Frangenberg
+# Copyright (C) 2023 Prism Software GmbH
+#
+# Licensed under GNU LGPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+###########################################################################
+#
+#                BMD Fusion Studio Integration for Prism2
+#
+#             https://github.com/Animatect/Prism2_PluginFusion
+#
+#                           Esteban Covo
+#                     e.covo@magichammer.com.mx
+#                     https://magichammer.com.mx
+#
+#                           Joshua Breckeen
+#                              Alta Arts
+#                          josh@alta-arts.com
+#
+###########################################################################
+
+
+
+##  THIS IS A LIBRARY FOR A MOCK FUSION FOR THE FUSION PRISM PLUGIN  ##
+
+
+import os
+import sys
+import copy
+import json
+import time
+import logging
+
+import Libs.Prism_Fusion_lib_Render as Render
+
+
+logger = logging.getLogger(__name__)
+
+
+#   In-process stand-in for the FusionScript objects, so the Comp functions
+#   of the plugin and their benchmarks can run without Fusion.  Only the
+#   methods used by the plugin are implemented.
+#
+#       fusion = MockFusion(latency=0.0002)
+#       comp = fusion.NewComp("Shot_010")
+#       loader = comp.AddTool("Loader", 0, 0)
+#       ...
+#       fusion.getCallCount("Tool.GetData")
+#
+#   Each method call, and each read or write of a Tool input, is counted as
+#   "Type.Name" like Libs.Prism_Fusion_lib_ApiCalls does for the real bridge,
+#   and waits for the latency of the method to simulate the bridge round trip.
+#
+#   Edits of the graph (adding tools, setting inputs, data, attrs and
+#   positions) redraw the Flow unless the Comp is locked, waiting for the
+#   redraw latency, and are an undo entry each unless an undo block is open.
+#   They are counted on the Comp as redraws and undoEntries.
+
+#   Value of the position args of AddTool() for the default position
+DEFAULT_POS = -32768
+
+#   Main input and output names by tool type.  Other types use "Input".
+MAIN_INPUTS = {
+    "Merge": ["Background", "Foreground"],
+    "Dissolve": ["Background", "Foreground"],
+    "Loader": [],
+    "Background": [],
+    }
+
+#   Content of the frames written by the mock renders
+PLACEHOLDER_DATA = b"MOCKFRAME"
+
+
+#   Base of the mock objects.  Calls are counted on the MockFusion object.
+class _MockObject(object):
+    _typeName = "Object"
+    _deleted = False
+
+    def __init__(self, fusion):
+        self._fusion = fusion
+
+
+    def _call(self, name:str) -> None:
+        self._fusion._record(f"{self._typeName}.{name}")
+
+
+#   Shared implementation of GetData()/SetData().  Keys can be dotted paths
+#   into nested dicts like "Prism_ToolData.toolName".
+class _DataMixin(object):
+    def GetData(self, key:str=None):
+        self._call("GetData")
+
+        #   Deleted tools no longer return their data
+        if self._deleted:
+            return None
+
+        if key is None:
+            return copy.deepcopy(self._data)
+
+        value = self._data
+        for part in key.split("."):
+            if not isinstance(value, dict) or part not in value:
+                return None
+            value = value[part]
+
+        return copy.deepcopy(value)
+
+
+    def SetData(self, key:str, value=None) -> None:
+        self._call("SetData")
+
+        parts = key.split(".")
+        data = self._data
+        for part in parts[:-1]:
+            data = data.setdefault(part, {})
+
+        if value is None:
+            data.pop(parts[-1], None)
+        else:
+            #   Fusion stores a copy of the table
+            data[parts[-1]] = copy.deepcopy(value)
+
+
+#   Shared implementation of GetAttrs()/SetAttrs()
+class _AttrsMixin(object):
+    def GetAttrs(self, name=None):
+        self._call("GetAttrs")
+
+        if self._deleted:
+            return None
+
+        if isinstance(name, str):
+            return self._attrs.get(name)
+
+        return dict(self._attrs)
+
+
+    def SetAttrs(self, attrs:dict) -> None:
+        self._call("SetAttrs")
+        self._attrs.update(attrs)
+
+
+#################################################
+####    FUSION
+
+class MockFusion(_MockObject):
+    _typeName = "Fusion"
+
+    #   latency is the seconds each call takes, and methodLatency overrides
+    #   it per "Type.Name".  redrawLatency is the seconds of a Flow redraw.
+    def __init__(self, latency:float=0.0, methodLatency:dict=None, redrawLatency:float=0.0):
+        self._fusion = self
+        self.latency = latency
+        self.methodLatency = dict(methodLatency or {})
+        self.redrawLatency = redrawLatency
+        self.calls = {}
+        self.comps = []
+        self._currentComp = None
+        self._prefs = {"Global": {}}
+
+
+    def _record(self, name:str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self._wait(self.methodLatency.get(name, self.latency))
+
+
+    def _wait(self, latency:float) -> None:
+        if latency > 0:
+            #   Busy wait, since sleep() is too coarse for bridge latencies
+            endTime = time.perf_counter() + latency
+            while time.perf_counter() < endTime:
+                pass
+
+
+    #   Returns the number of calls of a method, or of all methods
+    def getCallCount(self, name:str=None) -> int:
+        if name is None:
+            return sum(self.calls.values())
+        return self.calls.get(name, 0)
+
+
+    def resetCalls(self) -> None:
+        self.calls = {}
+
+
+    #   Creates a Comp and makes it the current Comp.  Not counted since it
+    #   only sets up the test.
+    def NewComp(self, name:str="Composition1", filePath:str="") -> "MockComp":
+        comp = MockComp(self, name, filePath)
+        self.comps.append(comp)
+        self._currentComp = comp
+        return comp
+
+
+    def GetCurrentComp(self) -> "MockComp":
+        self._call("GetCurrentComp")
+        return self._currentComp
+
+
+    @property
+    def CurrentComp(self) -> "MockComp":
+        self._call("CurrentComp")
+        return self._currentComp
+
+
+    def GetAttrs(self, name=None):
+        self._call("GetAttrs")
+        attrs = {"FUSIONS_Version": "19.0", "FUSIONS_FileName": "MockFusion"}
+        if isinstance(name, str):
+            return attrs.get(name)
+        return attrs
+
+
+    def GetPrefs(self, name:str=None):
+        self._call("GetPrefs")
+        return _getPref(self._prefs, name)
+
+
+    def SetPrefs(self, name, value=None) -> None:
+        self._call("SetPrefs")
+        _setPrefs(self._prefs, name, value)
+
+
+def _getPref(prefs:dict, name:str=None):
+    value = prefs
+    for part in (name.split(".") if name else []):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+
+    return copy.deepcopy(value)
+
+
+def _setPrefs(prefs:dict, name, value=None) -> None:
+    if isinstance(name, dict):
+        for key, val in name.items():
+            _setPrefs(prefs, key, val)
+        return
+
+    parts = name.split(".")
+    for part in parts[:-1]:
+        prefs = prefs.setdefault(part, {})
+    prefs[parts[-1]] = value
+
+
+#################################################
+####    COMP
+
+class MockComp(_DataMixin, _AttrsMixin, _MockObject):
+    _typeName = "Composition"
+
+    def __init__(self, fusion:MockFusion, name:str, filePath:str=""):
+        super().__init__(fusion)
+        self._data = {}
+        self._attrs = {
+            "COMPS_Name": name,
+            "COMPS_FileName": filePath,
+            "COMPN_GlobalStart": 1.0,
+            "COMPN_GlobalEnd": 100.0,
+            "COMPN_RenderStart": 1.0,
+            "COMPN_RenderEnd": 100.0,
+            "COMPB_Locked": False,
+            "COMPB_HiQ": False,
+            "COMPB_MotionBlur": True,
+            "COMPB_Proxy": False,
+            "COMPI_ProxyScale": 1,
+            }
+        self._prefs = {"Comp": {"FrameFormat": {"Rate": 24.0, "Width": 1920, "Height": 1080}}}
+        self._tools = {}
+        self._typeCounts = {}
+        self._activeTool = None
+        self._frame = MockFrame(fusion, self)
+
+        self.lockCount = 0
+        self.undoStack = []
+        self.undoSteps = []
+        self.redraws = 0
+        self.undoEntries = 0
+        self.renders = []
+
+
+    #   Adds tools without counting the calls, to set up a test Comp.
+    #   Returns the list of tools.
+    def populate(self, count:int, toolType:str="Loader", dataFunc=None, columns:int=20) -> list:
+        tools = []
+        calls = dict(self._fusion.calls)
+        edits = (self.redraws, self.undoEntries)
+        latency, methodLatency, redrawLatency = self._fusion.latency, self._fusion.methodLatency, self._fusion.redrawLatency
+        self._fusion.latency, self._fusion.methodLatency, self._fusion.redrawLatency = 0.0, {}, 0.0
+
+        try:
+            for idx in range(count):
+                tool = self.AddTool(toolType, idx % columns, idx // columns, 0)
+                if dataFunc:
+                    for key, value in (dataFunc(idx, tool) or {}).items():
+                        tool.SetData(key, value)
+                tools.append(tool)
+        finally:
+            self._fusion.calls = calls
+            self.redraws, self.undoEntries = edits
+            self._fusion.latency, self._fusion.methodLatency, self._fusion.redrawLatency = latency, methodLatency, redrawLatency
+
+        return tools
+
+
+    @property
+    def CurrentFrame(self) -> "MockFrame":
+        self._call("CurrentFrame")
+        return self._frame
+
+
+    def GetToolList(self, selected:bool=False, toolType:str=None) -> dict:
+        self._call("GetToolList")
+
+        tools = [tool for tool in self._tools.values()
+                 if (not selected or tool._selected)
+                 and (toolType is None or tool._attrs["TOOLS_RegID"] == toolType)]
+
+        #   Fusion returns tables indexed from 1
+        return {idx: tool for idx, tool in enumerate(tools, 1)}
+
+
+    def FindTool(self, name:str) -> "MockTool":
+        self._call("FindTool")
+        return self._tools.get(name)
+
+
+    def AddTool(self, toolType:str, xPos:float=DEFAULT_POS, yPos:float=DEFAULT_POS, autoConnect=1) -> "MockTool":
+        self._call("AddTool")
+
+        tool = self._createTool(toolType)
+
+        if xPos == DEFAULT_POS and yPos == DEFAULT_POS:
+            if self._activeTool:
+                xPos, yPos = self._activeTool._pos[0] + 1, self._activeTool._pos[1]
+            else:
+                xPos, yPos = 0, 0
+        tool._pos = [float(xPos), float(yPos)]
+
+        if autoConnect and self._activeTool and tool._mainInputs:
+            tool._getInput(tool._mainInputs[0])._connect(self._activeTool._output)
+
+        self._activeTool = tool
+        self._edited()
+        return tool
+
+
+    #   Redraws the Flow unless the Comp is locked, and records an undo entry
+    #   unless an undo block is open
+    def _edited(self) -> None:
+        if not self.lockCount:
+            self.redraws += 1
+            self._fusion._wait(self._fusion.redrawLatency)
+        if not self.undoStack:
+            self.undoEntries += 1
+
+
+    def _createTool(self, toolType:str, name:str=None) -> "MockTool":
+        if not name or name in self._tools:
+            count = self._typeCounts.get(toolType, 0)
+            while True:
+                count += 1
+                name = f"{toolType}{count}"
+                if name not in self._tools:
+                    break
+            self._typeCounts[toolType] = count
+
+        tool = MockTool(self._fusion, self, toolType, name)
+        self._tools[name] = tool
+        return tool
+
+
+    def _renameTool(self, tool:"MockTool", name:str) -> None:
+        if self._tools.get(name) not in (None, tool):
+            raise ValueError(f"Tool name {name} already exists")
+
+        self._tools.pop(tool._attrs["TOOLS_Name"], None)
+        self._tools[name] = tool
+
+
+    def _removeTool(self, tool:"MockTool") -> None:
+        self._tools.pop(tool._attrs["TOOLS_Name"], None)
+        if self._activeTool is tool:
+            self._activeTool = None
+
+
+    def ActiveTool(self) -> "MockTool":
+        self._call("ActiveTool")
+        return self._activeTool
+
+
+    def SetActiveTool(self, tool:"MockTool"=None) -> None:
+        self._call("SetActiveTool")
+        self._activeTool = tool
+
+
+    def Lock(self) -> None:
+        self._call("Lock")
+        self.lockCount += 1
+        self._attrs["COMPB_Locked"] = True
+
+
+    def Unlock(self) -> None:
+        self._call("Unlock")
+        self.lockCount = max(0, self.lockCount - 1)
+        self._attrs["COMPB_Locked"] = self.lockCount > 0
+
+
+    def StartUndo(self, name:str) -> None:
+        self._call("StartUndo")
+        self.undoStack.append(name)
+
+
+    def EndUndo(self, keep:bool=True) -> None:
+        self._call("EndUndo")
+        if self.undoStack:
+            name = self.undoStack.pop()
+            if keep:
+                self.undoSteps.append(name)
+
+
+    def GetPrefs(self, name:str=None):
+        self._call("GetPrefs")
+        return _getPref(self._prefs, name)
+
+
+    def SetPrefs(self, name, value=None) -> None:
+        self._call("SetPrefs")
+        _setPrefs(self._prefs, name, value)
+
+
+    #   Returns the settings table of the tools, or of the selected tools
+    def Copy(self, tools=None) -> dict:
+        self._call("Copy")
+
+        if tools is None:
+            tools = [tool for tool in self._tools.values() if tool._selected]
+        elif isinstance(tools, MockTool):
+            tools = [tools]
+        elif isinstance(tools, dict):
+            tools = list(tools.values())
+
+        return {"Tools": {tool._attrs["TOOLS_Name"]: tool._getSettings() for tool in tools}}
+
+
+    def CopySettings(self, tools=None) -> dict:
+        self._call("CopySettings")
+        calls = dict(self._fusion.calls)
+        settings = self.Copy(tools)
+        self._fusion.calls = calls
+        return settings
+
+
+    #   Adds the tools of a settings table.  Pasted tools keep their names
+    #   unless the name is used, and are connected by their SourceOp.  The
+    #   tools of a group are added to the Comp as well.
+    def Paste(self, settings:dict) -> bool:
+        self._call("Paste")
+
+        if isinstance(settings, str):
+            try:
+                settings = json.loads(settings)
+            except ValueError:
+                return False
+
+        toolSettings = {}
+        def _addSettings(tools:dict) -> None:
+            for name, toolSetting in tools.items():
+                toolSettings[name] = toolSetting
+                _addSettings(toolSetting.get("Tools", {}))
+
+        _addSettings((settings or {}).get("Tools") or {})
+        if not toolSettings:
+            return False
+
+        pasted = {}
+        for name, toolSetting in toolSettings.items():
+            toolType = toolSetting.get("__ctor", "Tool")
+            tool = self._createTool(toolType, name)
+            tool._setSettings(toolSetting)
+            pasted[name] = tool
+
+        for name, toolSetting in toolSettings.items():
+            for inputName, inputSetting in toolSetting.get("Inputs", {}).items():
+                sourceOp = isinstance(inputSetting, dict) and inputSetting.get("SourceOp")
+                sourceTool = pasted.get(sourceOp) or self._tools.get(sourceOp)
+                if sourceTool:
+                    pasted[name]._getInput(inputName)._connect(sourceTool._output)
+
+        for tool in self._tools.values():
+            tool._selected = tool in pasted.values()
+
+        self._edited()
+        return True
+
+
+    #   Writes a json file with the tool settings, which is enough for the
+    #   render fingerprint and the mock render processes
+    def Save(self, filePath:str) -> bool:
+        self._call("Save")
+        try:
+            with open(filePath, "w") as f:
+                json.dump({"Data": self._data,
+                           "Tools": {name: tool._getSettings() for name, tool in self._tools.items()}},
+                          f, indent=1, sort_keys=True, default=str)
+        except OSError as e:
+            logger.warning(f"ERROR: Unable to save mock comp:\n{e}")
+            return False
+
+        self._attrs["COMPS_FileName"] = filePath
+        return True
+
+
+    #   Writes placeholder frames for the Savers that are not passed through.
+    #   Uses the frames of the render command like Render.getFramesFromRenderCmd(),
+    #   or the render range of the Comp.
+    def Render(self, renderCmd:dict=None) -> bool:
+        self._call("Render")
+
+        renderCmd = dict(renderCmd or {})
+        if "FrameRange" not in renderCmd:
+            renderCmd.setdefault("Start", self._attrs["COMPN_RenderStart"])
+            renderCmd.setdefault("End", self._attrs["COMPN_RenderEnd"])
+        frames = Render.getFramesFromRenderCmd(renderCmd)
+
+        savers = [renderCmd["Tool"]] if renderCmd.get("Tool") else self._tools.values()
+        savers = [tool for tool in savers
+                  if tool._attrs["TOOLS_RegID"] == "Saver" and not tool._attrs["TOOLB_PassThrough"]]
+
+        for saver in savers:
+            outputPath = saver._getInput("Clip")._values.get(0)
+            if outputPath:
+                writePlaceholderFrames(outputPath, frames)
+
+        self.renders.append({"frames": frames, "savers": [saver.Name for saver in savers]})
+        return True
+
+
+class MockFrame(_MockObject):
+    _typeName = "Frame"
+
+    def __init__(self, fusion:MockFusion, comp:MockComp):
+        super().__init__(fusion)
+        self._flow = MockFlow(fusion, comp)
+
+
+    @property
+    def FlowView(self) -> "MockFlow":
+        self._call("FlowView")
+        return self._flow
+
+
+class MockFlow(_MockObject):
+    _typeName = "FlowView"
+
+    def __init__(self, fusion:MockFusion, comp:MockComp):
+        super().__init__(fusion)
+        self._comp = comp
+        self._bookmarks = {}
+
+
+    def GetPosTable(self, tool:"MockTool") -> dict:
+        self._call("GetPosTable")
+        if tool is None or tool._comp is not self._comp:
+            return None
+        return {1: tool._pos[0], 2: tool._pos[1]}
+
+
+    def SetPos(self, tool:"MockTool", xPos:float, yPos:float) -> None:
+        self._call("SetPos")
+        tool._pos = [float(xPos), float(yPos)]
+        self._comp._edited()
+
+
+    def Select(self, tool:"MockTool"=None, state:bool=True) -> None:
+        self._call("Select")
+        if tool is None:
+            for compTool in self._comp._tools.values():
+                compTool._selected = False
+        else:
+            tool._selected = bool(state)
+
+
+    def GetBookmarkList(self) -> dict:
+        self._call("GetBookmarkList")
+        return copy.deepcopy(self._bookmarks)
+
+
+    def SetBookmarkList(self, bookmarks:dict) -> None:
+        self._call("SetBookmarkList")
+        self._bookmarks = copy.deepcopy(bookmarks or {})
+
+
+#################################################
+####    TOOLS
+
+class MockTool(_DataMixin, _AttrsMixin, _MockObject):
+    _typeName = "Tool"
+
+    _uniqueID = 0
+
+    def __init__(self, fusion:MockFusion, comp:MockComp, toolType:str, name:str):
+        object.__setattr__(self, "_fusion", fusion)
+        object.__setattr__(self, "_comp", comp)
+        object.__setattr__(self, "_data", {})
+        object.__setattr__(self, "_inputs", {})
+        object.__setattr__(self, "_pos", [0.0, 0.0])
+        object.__setattr__(self, "_selected", False)
+        object.__setattr__(self, "_mainInputs", MAIN_INPUTS.get(toolType, ["Input"]))
+        object.__setattr__(self, "_output", MockOutput(fusion, self))
+
+        MockTool._uniqueID += 1
+        object.__setattr__(self, "_attrs", {
+            "TOOLS_Name": name,
+            "TOOLS_RegID": toolType,
+            "TOOLB_PassThrough": False,
+            "TOOLB_NameSet": False,
+            "TOOLS_UniqueID": str(MockTool._uniqueID),
+            })
+
+
+    def __repr__(self) -> str:
+        return f"MockTool({self._attrs['TOOLS_Name']})"
+
+
+    #   Attribute reads that are not methods are Tool inputs
+    def __getattr__(self, name:str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        if name == "Name":
+            self._call("Name")
+            return self._attrs["TOOLS_Name"]
+        if name == "ID":
+            self._call("ID")
+            return self._attrs["TOOLS_RegID"]
+
+        self._call(name)
+        return self._getInput(name)
+
+
+    #   Attribute writes set the value of a Tool input
+    def __setattr__(self, name:str, value) -> None:
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+            return
+
+        self._call(name)
+        self._getInput(name)._setValue(value)
+
+
+    def __getitem__(self, name:str):
+        self._call(name)
+        return self._getInput(name)[0]
+
+
+    def __setitem__(self, name:str, value) -> None:
+        self._call(name)
+        self._getInput(name)._setValue(value)
+
+
+    def _getInput(self, name:str) -> "MockInput":
+        toolInput = self._inputs.get(name)
+        if toolInput is None:
+            toolInput = self._inputs[name] = MockInput(self._fusion, self, name)
+        return toolInput
+
+
+    def SetAttrs(self, attrs:dict) -> None:
+        if "TOOLS_Name" in attrs and attrs["TOOLS_Name"] != self._attrs["TOOLS_Name"]:
+            self._comp._renameTool(self, attrs["TOOLS_Name"])
+        super().SetAttrs(attrs)
+        self._comp._edited()
+
+
+    def SetData(self, key:str, value=None) -> None:
+        super().SetData(key, value)
+        self._comp._edited()
+
+
+    def GetInput(self, name:str, time=None):
+        self._call("GetInput")
+        return self._getInput(name)._values.get(0 if time is None else time)
+
+
+    def SetInput(self, name:str, value, time=None) -> None:
+        self._call("SetInput")
+        self._getInput(name)._setValue(value, 0 if time is None else time)
+
+
+    #   Connects an input to the main output of a tool, or disconnects it with None
+    def ConnectInput(self, inputName:str, tool) -> bool:
+        self._call("ConnectInput")
+        source = tool._output if isinstance(tool, MockTool) else tool
+        self._getInput(inputName)._connect(source)
+        self._comp._edited()
+        return True
+
+
+    def FindMainInput(self, index:int) -> "MockInput":
+        self._call("FindMainInput")
+        if 1 <= index <= len(self._mainInputs):
+            return self._getInput(self._mainInputs[index - 1])
+        return None
+
+
+    def FindMainOutput(self, index:int) -> "MockOutput":
+        self._call("FindMainOutput")
+        return self._output if index == 1 else None
+
+
+    def GetInputList(self) -> dict:
+        self._call("GetInputList")
+        for name in self._mainInputs:
+            self._getInput(name)
+        return {idx: toolInput for idx, toolInput in enumerate(self._inputs.values(), 1)}
+
+
+    def GetOutputList(self) -> dict:
+        self._call("GetOutputList")
+        return {1: self._output}
+
+
+    def SaveSettings(self, filePath:str=None):
+        self._call("SaveSettings")
+        settings = {"Tools": {self._attrs["TOOLS_Name"]: self._getSettings()}}
+        if not filePath:
+            return settings
+
+        try:
+            with open(filePath, "w") as f:
+                json.dump(settings, f, indent=1, default=str)
+            return True
+        except OSError:
+            return False
+
+
+    def LoadSettings(self, settings) -> bool:
+        self._call("LoadSettings")
+        if isinstance(settings, str):
+            try:
+                with open(settings, "r") as f:
+                    settings = json.load(f)
+            except (OSError, ValueError):
+                return False
+
+        toolSettings = list((settings or {}).get("Tools", {}).values())
+        if not toolSettings:
+            return False
+
+        self._setSettings(toolSettings[0], connect=False)
+        self._comp._edited()
+        return True
+
+
+    def Delete(self) -> None:
+        self._call("Delete")
+        for toolInput in self._inputs.values():
+            toolInput._connect(None)
+        for toolInput in list(self._output._inputs):
+            toolInput._connect(None)
+        self._comp._removeTool(self)
+        self._deleted = True
+        self._comp._edited()
+
+
+    #   Returns the settings table of the Tool like Fusion's Copy()
+    def _getSettings(self) -> dict:
+        inputs = {}
+        for name, toolInput in self._inputs.items():
+            if toolInput._source:
+                inputs[name] = {"__ctor": "Input",
+                                "SourceOp": toolInput._source._tool._attrs["TOOLS_Name"],
+                                "Source": "Output"}
+            elif toolInput._values:
+                inputs[name] = {"__ctor": "Input", "Value": copy.deepcopy(toolInput._values.get(0))}
+
+        return {"__ctor": self._attrs["TOOLS_RegID"],
+                "PassThrough": self._attrs["TOOLB_PassThrough"],
+                "NameSet": self._attrs["TOOLB_NameSet"],
+                "Inputs": inputs,
+                "ViewInfo": {"__ctor": "OperatorInfo", "Pos": list(self._pos)},
+                "CustomData": copy.deepcopy(self._data)}
+
+
+    def _setSettings(self, settings:dict, connect:bool=True) -> None:
+        self._attrs["TOOLB_PassThrough"] = bool(settings.get("PassThrough", False))
+        self._attrs["TOOLB_NameSet"] = bool(settings.get("NameSet", False))
+        self._data.clear()
+        self._data.update(copy.deepcopy(settings.get("CustomData", {})))
+
+        pos = settings.get("ViewInfo", {}).get("Pos")
+        if pos:
+            self._pos = [float(pos[0]), float(pos[1])]
+
+        for name, inputSetting in settings.get("Inputs", {}).items():
+            if isinstance(inputSetting, dict) and "Value" in inputSetting:
+                self._getInput(name)._values[0] = copy.deepcopy(inputSetting["Value"])
+
+
+class MockInput(_MockObject):
+    _typeName = "Input"
+
+    def __init__(self, fusion:MockFusion, tool:MockTool, name:str):
+        super().__init__(fusion)
+        self._tool = tool
+        self._source = None
+        self._values = {}
+        self.Name = name
+
+
+    def __getitem__(self, time):
+        self._call("Value")
+        return self._values.get(time, self._values.get(0))
+
+
+    def __setitem__(self, time, value) -> None:
+        self._call("Value")
+        self._setValue(value, time)
+
+
+    def _setValue(self, value, time=0) -> None:
+        if isinstance(value, (MockTool, MockOutput)):
+            self._connect(value._output if isinstance(value, MockTool) else value)
+        else:
+            self._values[time] = value
+        self._tool._comp._edited()
+
+
+    def _connect(self, output:"MockOutput") -> None:
+        if self._source:
+            self._source._inputs.remove(self)
+        self._source = output
+        if output:
+            output._inputs.append(self)
+
+
+    #   Connects to an output or to the main output of a tool
+    def ConnectTo(self, source=None) -> bool:
+        self._call("ConnectTo")
+        if isinstance(source, MockTool):
+            source = source._output
+        self._connect(source)
+        self._tool._comp._edited()
+        return True
+
+
+    def GetConnectedOutput(self) -> "MockOutput":
+        self._call("GetConnectedOutput")
+        return self._source
+
+
+    def GetTool(self) -> MockTool:
+        self._call("GetTool")
+        return self._tool
+
+
+    def GetAttrs(self, name=None):
+        self._call("GetAttrs")
+        attrs = {"INPS_Name": self.Name, "INPS_ID": self.Name}
+        if isinstance(name, str):
+            return attrs.get(name)
+        return attrs
+
+
+class MockOutput(_MockObject):
+    _typeName = "Output"
+
+    def __init__(self, fusion:MockFusion, tool:MockTool):
+        super().__init__(fusion)
+        self._tool = tool
+        self._inputs = []
+        self.Name = "Output"
+
+
+    def GetConnectedInputs(self) -> dict:
+        self._call("GetConnectedInputs")
+        return {idx: toolInput for idx, toolInput in enumerate(self._inputs, 1)}
+
+
+    def GetTool(self) -> MockTool:
+        self._call("GetTool")
+        return self._tool
+
+
+#################################################
+####    RENDERING
+
+#   Writes a placeholder file for each frame of a Saver output.  These are
+#   only valid outputs for formats other than EXR, which are checked for
+#   their offset tables.
+def writePlaceholderFrames(outputPath:str, frames:list) -> None:
+    outputDir = os.path.dirname(outputPath)
+    if outputDir:
+        os.makedirs(outputDir, exist_ok=True)
+
+    for frame in frames:
+        with open(Render.getFramePath(outputPath, frame), "wb") as f:
+            f.write(PLACEHOLDER_DATA)
+
+
+#   Script run by the mock render processes:
+#       argv[1]:  json list of [filepath, frame] to write
+#       argv[2]:  seconds per frame
+#       argv[3]:  exit code
+MOCK_RENDER_SCRIPT = """
+import sys, json, time
+for path, frame in json.loads(sys.argv[1]):
+    time.sleep(float(sys.argv[2]))
+    with open(path, "wb") as f:
+        f.write(b"MOCKFRAME")
+sys.exit(int(sys.argv[3]))
+"""
+
+
+#   Returns a buildArgs() for Render.LocalRenderQueue that starts a Python
+#   process writing placeholder frames instead of a Fusion render.  The
+#   frames in skipFrames are not written and the process exits with
+#   exitCode, to simulate a render that died.
+def makeMockRenderArgs(frameTime:float=0.0, skipFrames=None, exitCode:int=0):
+    skipFrames = set(skipFrames or [])
+
+    def buildArgs(executable:str, job:dict) -> list:
+        frameFiles = []
+        for frame in range(job["start"], job["end"] + 1):
+            if frame in skipFrames:
+                continue
+            for outputPath in job["outputs"]:
+                frameFiles.append([Render.getFramePath(outputPath, frame), frame])
+
+        for outputPath in job["outputs"]:
+            if os.path.dirname(outputPath):
+                os.makedirs(os.path.dirname(outputPath), exist_ok=True)
+
+        return [sys.executable, "-c", MOCK_RENDER_SCRIPT,
+                json.dumps(frameFiles), str(frameTime), str(exitCode)]
+
+    return buildArgs
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2023 Richard Frangenberg
+# Copyright (C) 2023 Prism Software GmbH
+#
+# Licensed under GNU LGPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+###########################################################################
+#
+#                BMD Fusion Studio Integration for Prism2
+#
+#             https://github.com/Animatect/Prism2_PluginFusion
+#
+#                           Esteban Covo
+#                     e.covo@magichammer.com.mx
+#                     https://magichammer.com.mx
+#
+#                           Joshua Breckeen
+#                              Alta Arts
+#                          josh@alta-arts.com
+#
+###########################################################################
+
+
+
+##  THIS IS A LIBRARY FOR PROFILING FUNCTIONS FOR THE FUSION PRISM PLUGIN  ##
+
+
+import os
+import json
+import time
+import logging
+import threading
+from functools import wraps
+from collections import deque
+
+from PrismUtils.Decorators import err_catcher as _err_catcher
+
+import Libs.Prism_Fusion_lib_Cache as Cache
+
+
+logger = logging.getLogger(__name__)
+
+
+#   The plugin modules import err_catcher from here.  Unless the environment
+#   variable is set when Fusion starts, it returns Prism's err_catcher
+#   unchanged, so there is no overhead.  If set, each decorated function also
+#   records its call count, cumulative and self time, and its call stack.
+#   The stacks are kept in a ring buffer and saved in the collapsed stack
+#   format used by flamegraph.pl and speedscope:
+#
+#       Prism_Fusion_Functions.imageImport;Prism_Fusion_Functions.wrapped_ImageImport 15230
+#
+#   with the self time in microseconds.
+
+PROFILER_ENV = "PRISM_FUSION_PROFILE"
+PROFILER_ARMED = bool(os.environ.get(PROFILER_ENV))
+
+#   Max recorded calls in the ring buffer
+PROFILE_BUFFER_SIZE = 200000
+
+_profileLock = threading.Lock()
+_profileLocal = threading.local()
+_profile = {
+    "enabled": PROFILER_ARMED,
+    "stats": {},
+    "buffer": deque(maxlen=PROFILE_BUFFER_SIZE),
+    "startTime": time.time(),
+}
+
+
+#   Drop-in replacement of PrismUtils.Decorators.err_catcher
+def err_catcher(name):
+    catcher = _err_catcher(name=name)
+    if not PROFILER_ARMED:
+        return catcher
+
+    def decorator(func):
+        wrapped = catcher(func)
+        label = f"{func.__module__.split('.')[-1]}.{func.__qualname__}"
+
+        @wraps(func)
+        def profiled(*args, **kwargs):
+            if not _profile["enabled"]:
+                return wrapped(*args, **kwargs)
+
+            return _callProfiled(label, wrapped, args, kwargs)
+
+        return profiled
+
+    return decorator
+
+
+def _callProfiled(label:str, func, args, kwargs):
+    stack = getattr(_profileLocal, "stack", None)
+    if stack is None:
+        stack = _profileLocal.stack = []
+
+    #   [label, child time]
+    frame = [label, 0.0]
+    stack.append(frame)
+    startTime = time.perf_counter()
+
+    try:
+        return func(*args, **kwargs)
+
+    finally:
+        elapsed = time.perf_counter() - startTime
+        selfTime = elapsed - frame[1]
+        path = tuple(f[0] for f in stack)
+        stack.pop()
+        if stack:
+            stack[-1][1] += elapsed
+
+        with _profileLock:
+            stats = _profile["stats"].get(label)
+            if stats is None:
+                stats = _profile["stats"][label] = {"calls": 0, "cumulative": 0.0, "self": 0.0}
+            stats["calls"] += 1
+            #   Recursive calls are only counted once in the cumulative time
+            if label not in path[:-1]:
+                stats["cumulative"] += elapsed
+            stats["self"] += selfTime
+            _profile["buffer"].append((path, selfTime))
+
+
+def isProfilerArmed() -> bool:
+    return PROFILER_ARMED
+
+
+def isProfiling() -> bool:
+    return PROFILER_ARMED and _profile["enabled"]
+
+
+def setProfiling(enabled:bool) -> None:
+    _profile["enabled"] = bool(enabled)
+
+
+def resetProfile() -> None:
+    with _profileLock:
+        _profile["stats"] = {}
+        _profile["buffer"].clear()
+        _profile["startTime"] = time.time()
+
+
+#   Returns {label: {"calls", "cumulative", "self"}} sorted by self time
+def getProfileStats() -> dict:
+    with _profileLock:
+        items = [(label, dict(stats)) for label, stats in _profile["stats"].items()]
+
+    items.sort(key=lambda item: item[1]["self"], reverse=True)
+    return dict(items)
+
+
+#   Returns the recorded calls as collapsed stack lines
+def getCollapsedStacks() -> list:
+    with _profileLock:
+        buffer = list(_profile["buffer"])
+
+    totals = {}
+    for path, selfTime in buffer:
+        totals[path] = totals.get(path, 0.0) + selfTime
+
+    return [f"{';'.join(path)} {max(1, int(selfTime * 1000000))}"
+            for path, selfTime in sorted(totals.items())]
+
+
+#   Saves the collapsed stacks and the per function stats, and returns the
+#   path of the collapsed stack file
+def dumpProfile(outputDir:str=None, reset:bool=True) -> str:
+    outputDir = outputDir or Cache.getCacheDir("profiles")
+    baseName = f"fusionProfile_{time.strftime('%Y%m%d_%H%M%S')}"
+    stackFile = os.path.join(outputDir, f"{baseName}.folded")
+    statsFile = os.path.join(outputDir, f"{baseName}.json")
+
+    try:
+        with open(stackFile, "w") as f:
+            f.write("\n".join(getCollapsedStacks()))
+            f.write("\n")
+
+        with open(statsFile, "w") as f:
+            json.dump({"startTime": _profile["startTime"],
+                       "endTime": time.time(),
+                       "functions": getProfileStats()},
+                      f, indent=1)
+
+    except OSError as e:
+        logger.warning(f"ERROR: Unable to save profile:\n{e}")
+        return None
+
+    logger.debug(f"Saved profile to {stackFile}")
+
+    if reset:
+        resetProfile()
+
+    return stackFile
@@ -0,0 +1,598 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2023 Richard Frangenberg
+# Copyright (C) 2023 Prism Software GmbH
+#
+# Licensed under GNU LGPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+###########################################################################
+#
+#                BMD Fusion Studio Integration for Prism2
+#
+#             https://github.com/Animatect/Prism2_PluginFusion
+#
+#                           Esteban Covo
+#                     e.covo@magichammer.com.mx
+#                     https://magichammer.com.mx
+#
+#                           Joshua Breckeen
+#                              Alta Arts
+#                          josh@alta-arts.com
+#
+###########################################################################
+
+
+
+##  THIS IS A LIBRARY FOR LOCAL RENDER FUNCTIONS FOR THE FUSION PRISM PLUGIN  ##
+
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import hashlib
+import logging
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import Libs.Prism_Fusion_lib_Image as Image
+import Libs.Prism_Fusion_lib_Cache as Cache
+
+
+logger = logging.getLogger(__name__)
+
+
+#   A local render is split into jobs that each run one headless Fusion
+#   render process on a saved comp:
+#
+#   Job:
+#       {
+#           "name":     display name,
+#           "comp":     comp filepath,
+#           "start":    first frame,
+#           "end":      last frame,
+#           "outputs":  [Saver filepaths rendered by the comp],
+#           "sequence": False if the outputs are movie files,
+#           "attempt":  number of times the job has been started,
+#           "done":     set of frames found on disk,
+#           "manifests": render manifests of the outputs or None
+#       }
+
+#   Seconds between the checks of the running processes
+POLL_INTERVAL = 0.5
+
+#   Number of times a job with missing frames is started again
+MAX_RETRIES = 1
+
+#   Smallest frame chunk, since each process has to load the comp first
+MIN_CHUNK_FRAMES = 10
+
+#   Padding used by Fusion if the Saver filename does not end with a number
+DEFAULT_PADDING = 4
+
+RENDER_NODE_NAMES = ["FusionRenderNode.exe", "FusionRenderNode"]
+
+#   Max output folders created at the same time, since each one is a round
+#   trip on a network share
+OUTPUT_DIR_THREADS = 8
+
+
+#################################################
+####    COMMANDS
+
+#   Returns the Render Node installed next to the Fusion executable,
+#   or the Fusion executable itself
+def getRenderExecutable(fusionExe:str) -> str:
+    fusionDir = os.path.dirname(fusionExe)
+    nodeDirs = [fusionDir]
+
+    #   Render Node installs beside Fusion with the same version, like:
+    #       Fusion 18  ->  Fusion Render Node 18
+    dirName = os.path.basename(fusionDir)
+    if dirName.startswith("Fusion"):
+        nodeDirName = dirName.replace("Fusion", "Fusion Render Node", 1)
+        nodeDirs.append(os.path.join(os.path.dirname(fusionDir), nodeDirName))
+
+    for nodeDir in nodeDirs:
+        for exeName in RENDER_NODE_NAMES:
+            exePath = os.path.join(nodeDir, exeName)
+            if os.path.isfile(exePath):
+                return exePath
+
+    return fusionExe
+
+
+#   Returns the command line to render a job
+def getRenderArgs(executable:str, job:dict) -> list:
+    return [
+        executable,
+        job["comp"],
+        "-render",
+        "-start", str(job["start"]),
+        "-end", str(job["end"]),
+        "-quit"
+        ]
+
+
+#   Returns the comp attributes for the global overrides of a render command,
+#   since the render processes do not get the render command
+def getCompAttrsFromRenderCmd(renderCmd:dict) -> dict:
+    compAttrs = {}
+
+    if "HiQ" in renderCmd:
+        compAttrs["COMPB_HiQ"] = renderCmd["HiQ"]
+    if "MotionBlur" in renderCmd:
+        compAttrs["COMPB_MotionBlur"] = renderCmd["MotionBlur"]
+    if "SizeType" in renderCmd:
+        compAttrs["COMPB_Proxy"] = renderCmd["SizeType"] > 1
+        compAttrs["COMPI_ProxyScale"] = renderCmd["SizeType"]
+
+    return compAttrs
+
+
+#   Returns the current values of the Comp attributes in compAttrs, to
+#   restore them with comp.SetAttrs() after they were changed
+def getOrigCompAttrs(comp, compAttrs:dict) -> dict:
+    origAttrs = comp.GetAttrs()
+    return {key: origAttrs[key] for key in compAttrs if key in origAttrs}
+
+
+#################################################
+####    FRAMES
+
+#   Returns the list of frames of a render command from makeRenderCmd()
+def getFramesFromRenderCmd(renderCmd:dict) -> list:
+    if "FrameRange" in renderCmd:
+        frames = set()
+        for part in str(renderCmd["FrameRange"]).split(","):
+            part = part.strip()
+            if not part:
+                continue
+            #   Ranges like "10..20" or "10-20"
+            match = re.match(r"^(-?\d+)\s*(?:\.\.|-)\s*(-?\d+)$", part)
+            if match:
+                start, end = sorted((int(match.group(1)), int(match.group(2))))
+                frames.update(range(start, end + 1))
+            else:
+                frames.add(int(float(part)))
+        return sorted(frames)
+
+    return list(range(int(renderCmd["Start"]), int(renderCmd["End"]) + 1))
+
+
+#   Returns the contiguous (start, end) runs of a list of frames
+def getFrameRuns(frames:list) -> list:
+    runs = []
+    for frame in sorted(set(frames)):
+        if runs and frame == runs[-1][1] + 1:
+            runs[-1][1] = frame
+        else:
+            runs.append([frame, frame])
+
+    return [tuple(run) for run in runs]
+
+
+#   Splits the frames into contiguous chunks for the number of processes
+def splitFrames(frames:list, processes:int, minChunk:int=MIN_CHUNK_FRAMES) -> list:
+    if not frames:
+        return []
+
+    chunkSize = max(minChunk, math.ceil(len(frames) / max(1, processes)))
+
+    chunks = []
+    for start, end in getFrameRuns(frames):
+        for chunkStart in range(start, end + 1, chunkSize):
+            chunks.append((chunkStart, min(chunkStart + chunkSize - 1, end)))
+
+    return chunks
+
+
+#   Returns the filepath of a frame of a Saver output.  Fusion replaces the
+#   number at the end of the filename with the frame number.
+def getFramePath(outputPath:str, frame:int) -> str:
+    base, ext = os.path.splitext(outputPath)
+
+    match = re.search(r"(\d+)$", base)
+    if match:
+        padding = len(match.group(1))
+        base = base[:match.start()]
+    else:
+        padding = DEFAULT_PADDING
+
+    return f"{base}{frame:0{padding}d}{ext}"
+
+
+#################################################
+####    OUTPUT FOLDERS
+
+#   Creates the output folders of the renders in a thread pool.  Only touches
+#   the filesystem, so it does not call Fusion or the Prism core.  Returns
+#   {dirPath: error} of the folders that could not be created.
+def createOutputDirs(dirPaths, maxThreads:int=OUTPUT_DIR_THREADS) -> dict:
+    dirPaths = sorted(set(dirPath for dirPath in dirPaths if dirPath))
+    if not dirPaths:
+        return {}
+
+    def _createDir(dirPath:str):
+        try:
+            os.makedirs(dirPath, exist_ok=True)
+            return None
+        except OSError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, min(maxThreads, len(dirPaths)))) as pool:
+        errors = list(pool.map(_createDir, dirPaths))
+
+    return {dirPath: error for dirPath, error in zip(dirPaths, errors) if error}
+
+
+#################################################
+####    VALIDATION
+
+#   Checks that a rendered file has been completely written
+def isOutputValid(filePath:str) -> bool:
+    try:
+        if os.path.getsize(filePath) == 0:
+            return False
+    except OSError:
+        return False
+
+    if filePath.lower().endswith(".exr"):
+        return Image.isExrComplete(filePath)
+
+    return True
+
+
+#   Returns the frames of a job that are missing or incomplete on disk
+def getMissingFrames(job:dict) -> list:
+    frames = range(job["start"], job["end"] + 1)
+
+    #   Movies are checked as a whole
+    if not job["sequence"]:
+        if all(isOutputValid(path) for path in job["outputs"]):
+            return []
+        return list(frames)
+
+    return [frame for frame in frames
+            if not all(isOutputValid(getFramePath(path, frame)) for path in job["outputs"])]
+
+
+#################################################
+####    MANIFEST
+
+#   The verified frames of an image sequence output are kept in a manifest
+#   in the plugin cache, so an interrupted render only renders the missing
+#   or corrupt frames when it is started again:
+#
+#   Manifest:
+#       {
+#           "output":       Saver filepath,
+#           "fingerprint":  hash of the rendered comp and render command,
+#           "frames":       {frame: [size, mtime_ns]}
+#       }
+#
+#   The frames are only reused while the fingerprint matches, and while the
+#   size and mtime of the file are unchanged.  Changes to media read by the
+#   comp do not change the fingerprint.
+
+def getManifestFile(outputPath:str) -> str:
+    key = hashlib.sha1(os.path.normcase(os.path.normpath(outputPath)).encode("utf-8")).hexdigest()
+    return os.path.join(Cache.getCacheDir("renders"), f"{key}.json")
+
+
+#   Returns the fingerprint of a saved comp and its render command
+def getCompFingerprint(compPath:str, renderCmd:dict) -> str:
+    fingerprint = hashlib.sha1()
+    try:
+        with open(compPath, "rb") as f:
+            fingerprint.update(f.read())
+    except OSError as e:
+        logger.warning(f"ERROR: Unable to read comp for render fingerprint:\n{e}")
+        return None
+
+    fingerprint.update(json.dumps(renderCmd, sort_keys=True, default=str).encode("utf-8"))
+    return fingerprint.hexdigest()
+
+
+#   Returns the manifest of an output, or a new one if the fingerprint changed
+def loadManifest(outputPath:str, fingerprint:str) -> dict:
+    manifest = {"output": outputPath, "fingerprint": fingerprint, "frames": {}}
+    if not fingerprint:
+        return manifest
+
+    try:
+        with open(getManifestFile(outputPath), "r") as f:
+            data = json.load(f)
+        if data.get("fingerprint") == fingerprint and isinstance(data.get("frames"), dict):
+            manifest["frames"] = data["frames"]
+    except (OSError, ValueError):
+        pass
+
+    return manifest
+
+
+def saveManifest(manifest:dict) -> None:
+    if not manifest["fingerprint"]:
+        return
+
+    manifestFile = getManifestFile(manifest["output"])
+    tempFile = f"{manifestFile}.tmp"
+    try:
+        with open(tempFile, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tempFile, manifestFile)
+    except OSError as e:
+        logger.warning(f"ERROR: Unable to write render manifest:\n{e}")
+
+
+#   Returns the frames of the manifest that are still on disk unchanged
+def getVerifiedFrames(manifest:dict, frames:list) -> set:
+    verified = set()
+    for frame in frames:
+        signature = manifest["frames"].get(str(frame))
+        if not signature:
+            continue
+        if Cache.getFileSignature(getFramePath(manifest["output"], frame)) == tuple(signature):
+            verified.add(frame)
+
+    return verified
+
+
+#   Adds validated frames to the manifest
+def addVerifiedFrames(manifest:dict, frames) -> None:
+    for frame in frames:
+        signature = Cache.getFileSignature(getFramePath(manifest["output"], frame))
+        if signature:
+            manifest["frames"][str(frame)] = list(signature)
+
+
+#   Adds the chunk jobs of an image sequence render to the queue, skipping
+#   the frames verified by a previous render of the same comp.  Returns the
+#   number of frames skipped.
+def addChunkedJobs(queue, name:str, comp:str, frames:list, outputs:list, fingerprint:str) -> int:
+    manifests = [loadManifest(path, fingerprint) for path in outputs]
+
+    verified = set(frames)
+    for manifest in manifests:
+        verified &= getVerifiedFrames(manifest, frames)
+
+    #   Forget the frames that changed on disk
+    for manifest in manifests:
+        manifest["frames"] = {str(frame): manifest["frames"][str(frame)]
+                              for frame in verified if str(frame) in manifest["frames"]}
+        saveManifest(manifest)
+
+    missing = [frame for frame in frames if frame not in verified]
+    for start, end in splitFrames(missing, queue.maxProcesses):
+        job = queue.addJob(f"{name} ({start}-{end})", comp, start, end, outputs)
+        job["manifests"] = manifests
+
+    queue.resumedFrames += len(verified)
+    queue.totalFrames += len(verified)
+
+    if verified:
+        logger.debug(f"Resuming render of {name}: {len(verified)} of {len(frames)} frames already rendered")
+
+    return len(verified)
+
+
+#################################################
+####    QUEUE
+
+#   Runs the render jobs with up to maxProcesses render processes at the
+#   same time.  buildArgs(executable, job) can be replaced to run the jobs
+#   with another renderer.
+class LocalRenderQueue(object):
+    def __init__(self, executable:str, maxProcesses:int=2, buildArgs=None):
+        self.executable = executable
+        self.maxProcesses = max(1, maxProcesses)
+        self.buildArgs = buildArgs or getRenderArgs
+
+        self.jobs = []
+        self.pending = deque()
+        self.running = []
+        self.failed = []
+        self.totalFrames = 0
+        self.resumedFrames = 0
+        self.cancelled = False
+
+
+    def addJob(self, name:str, comp:str, start:int, end:int, outputs:list, sequence:bool=True) -> dict:
+        job = {
+            "name": name,
+            "comp": comp,
+            "start": int(start),
+            "end": int(end),
+            "outputs": list(outputs),
+            "sequence": sequence,
+            "attempt": 0,
+            "done": set(),
+            "manifests": None
+            }
+
+        self.jobs.append(job)
+        self.pending.append(job)
+        self.totalFrames += job["end"] - job["start"] + 1
+
+        return job
+
+
+    def getDoneFrames(self) -> int:
+        return self.resumedFrames + sum(len(job["done"]) for job in self.jobs)
+
+
+    #   Runs all jobs and returns True if all frames were rendered.
+    #   onProgress(doneFrames, totalFrames, runningJobs) is called after
+    #   every poll, and the queue is cancelled if isCancelled() returns True.
+    def run(self, onProgress=None, isCancelled=None) -> bool:
+        startTime = time.perf_counter()
+
+        while self.pending or self.running:
+            if isCancelled and isCancelled():
+                self.cancel()
+                return False
+
+            while self.pending and len(self.running) < self.maxProcesses:
+                self._startJob(self.pending.popleft())
+
+            time.sleep(POLL_INTERVAL)
+
+            for job in list(self.running):
+                returnCode = job["process"].poll()
+                if returnCode is None:
+                    self._updateDone(job)
+                else:
+                    self.running.remove(job)
+                    self._finishJob(job, returnCode)
+
+            if onProgress:
+                onProgress(self.getDoneFrames(), self.totalFrames, len(self.running))
+
+        logger.debug(f"Local render queue finished {len(self.jobs)} jobs in "
+                     f"{time.perf_counter() - startTime:.1f} seconds")
+
+        return not self.failed
+
+
+    #   Stops the running processes
+    def cancel(self) -> None:
+        self.cancelled = True
+        self.pending.clear()
+
+        for job in self.running:
+            try:
+                job["process"].terminate()
+                job["process"].wait(timeout=10)
+            except Exception as e:
+                logger.warning(f"ERROR: Unable to stop render process of {job['name']}:\n{e}")
+            self._closeLog(job)
+
+        self.running = []
+
+
+    def _startJob(self, job:dict) -> None:
+        job["attempt"] += 1
+        job["done"] = set()
+        job["log"] = f"{os.path.splitext(job['comp'])[0]}_{job['start']}-{job['end']}.log"
+
+        kwargs = {"stderr": subprocess.STDOUT}
+        if sys.platform == "win32":
+            kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+
+        try:
+            job["logFile"] = open(job["log"], "w")
+            kwargs["stdout"] = job["logFile"]
+        except OSError:
+            job["logFile"] = None
+            kwargs["stdout"] = subprocess.DEVNULL
+
+        args = self.buildArgs(self.executable, job)
+        logger.debug(f"Starting render of {job['name']}: {args}")
+
+        try:
+            job["process"] = subprocess.Popen(args, **kwargs)
+        except OSError as e:
+            logger.warning(f"ERROR: Unable to start render process for {job['name']}:\n{e}")
+            self._closeLog(job)
+            self.failed.append(job)
+            return
+
+        self.running.append(job)
+
+
+    #   Counts the frames written so far
+    def _updateDone(self, job:dict) -> None:
+        if not job["sequence"]:
+            return
+
+        for frame in range(job["start"], job["end"] + 1):
+            if frame in job["done"]:
+                continue
+            if all(os.path.exists(getFramePath(path, frame)) for path in job["outputs"]):
+                job["done"].add(frame)
+
+
+    def _finishJob(self, job:dict, returnCode:int) -> None:
+        self._closeLog(job)
+
+        missing = getMissingFrames(job)
+        job["done"] = set(range(job["start"], job["end"] + 1)) - set(missing)
+
+        if returnCode != 0:
+            logger.warning(f"Render process of {job['name']} exited with code {returnCode}")
+
+        #   Record the validated frames so they are not rendered again
+        for manifest in job["manifests"] or []:
+            addVerifiedFrames(manifest, job["done"])
+            saveManifest(manifest)
+
+        if not missing:
+            return
+
+        if job["attempt"] > MAX_RETRIES:
+            logger.warning(f"ERROR: {len(missing)} frames of {job['name']} were not rendered. "
+                           f"Render log:\n{self._readLog(job)}")
+            self.failed.append(job)
+            return
+
+        #   Movies are rendered again as a whole, since several processes
+        #   cannot write to the same file
+        if not job["sequence"]:
+            logger.debug(f"Restarting {job['name']}")
+            retryJob = dict(job, done=set())
+            self.jobs.append(retryJob)
+            self.pending.append(retryJob)
+            return
+
+        #   Render only the missing frames again
+        logger.debug(f"Restarting {len(missing)} missing frames of {job['name']}")
+        for start, end in getFrameRuns(missing):
+            retryJob = dict(job,
+                            start=start,
+                            end=end,
+                            done=set())
+            self.jobs.append(retryJob)
+            self.pending.append(retryJob)
+
+
+    def _closeLog(self, job:dict) -> None:
+        logFile = job.pop("logFile", None)
+        if logFile:
+            logFile.close()
+
+
+    #   Returns the end of the render log of a job
+    def _readLog(self, job:dict, maxLines:int=20) -> str:
+        try:
+            with open(job["log"], "r", errors="replace") as f:
+                return "".join(f.readlines()[-maxLines:])
+        except OSError:
+            return ""
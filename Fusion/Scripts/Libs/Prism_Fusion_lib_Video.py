@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# PRISM - Pipeline for animation and VFX projects
+#
+# www.prism-pipeline.com
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2023 Richard Frangenberg
+# Copyright (C) 2023 Prism Software GmbH
+#
+# Licensed under GNU LGPL-3.0-or-later
+#
+# This file is part of Prism.
+#
+# Prism is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Prism is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public License
+# along with Prism.  If not, see <https://www.gnu.org/licenses/>.
+###########################################################################
+#
+#                BMD Fusion Studio Integration for Prism2
+#
+#             https://github.com/Animatect/Prism2_PluginFusion
+#
+#                           Esteban Covo
+#                     e.covo@magichammer.com.mx
+#                     https://magichammer.com.mx
+#
+#                           Joshua Breckeen
+#                              Alta Arts
+#                          josh@alta-arts.com
+#
+###########################################################################
+
+
+
+##  THIS IS A LIBRARY FOR VIDEO FILE FUNCTIONS FOR THE FUSION PRISM PLUGIN  ##
+
+
+import os
+import sys
+import struct
+import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import Libs.Prism_Fusion_lib_Cache as Cache
+
+
+logger = logging.getLogger(__name__)
+
+
+#   Containers that can be read without FFprobe
+QUICKTIME_FORMATS = [".mov", ".mp4", ".m4v", ".qt"]
+
+#   Max parallel probes in a batch
+PROBE_MAX_THREADS = 4
+
+
+#   Returns the number of frames for a video file or None
+def getVideoDuration(filePath:str, ffprobePath:str=None) -> int:
+    return getVideoDurations([filePath], ffprobePath).get(filePath)
+
+
+#   Returns ({filePath: frames}, [filePath]) of the cached durations of the
+#   files that have not changed, and the files that need to be probed
+def getCachedDurations(filePaths:list) -> tuple:
+    durations = {}
+    missing = []
+
+    for filePath in filePaths:
+        if filePath in durations or filePath in missing:
+            continue
+
+        frames = Cache.getCachedDuration(filePath)
+        if frames:
+            durations[filePath] = frames
+        else:
+            missing.append(filePath)
+
+    return durations, missing
+
+
+#   Returns the number of frames for a list of video files:  {filePath: frames}
+#   Cached results are used if the file has not changed.  The rest are read from
+#   the container metadata where possible, else probed with FFprobe in parallel.
+#   This blocks until all files are probed, so the UI uses VideoProbeJobs.
+def getVideoDurations(filePaths:list, ffprobePath:str=None, maxThreads:int=PROBE_MAX_THREADS) -> dict:
+    durations, missing = getCachedDurations(filePaths)
+
+    if not missing:
+        return durations
+
+    def _probe(filePath):
+        try:
+            frames = _readContainerFrames(filePath)
+            if not frames and ffprobePath:
+                frames = _probeFrames(filePath, ffprobePath)
+            return frames
+        except Exception as e:
+            logger.warning(f"ERROR: Unable to get video duration of {filePath}:\n{e}")
+            return None
+
+    if len(missing) == 1:
+        results = [_probe(missing[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, min(maxThreads, len(missing)))) as pool:
+            results = list(pool.map(_probe, missing))
+
+    probed = {}
+    for filePath, frames in zip(missing, results):
+        durations[filePath] = frames
+        if frames:
+            probed[filePath] = frames
+
+    Cache.saveCachedDurations(probed)
+
+    return durations
+
+
+####    CONTAINER METADATA    ####
+
+#   Returns the video frame count from the QuickTime/MP4 sample tables or None
+def _readContainerFrames(filePath:str) -> int:
+    if os.path.splitext(filePath)[1].lower() not in QUICKTIME_FORMATS:
+        return None
+
+    with open(filePath, "rb") as f:
+        fileSize = os.fstat(f.fileno()).st_size
+
+        moov = _findAtom(f, 0, fileSize, b"moov")
+        if not moov:
+            return None
+
+        for trak in _iterAtoms(f, moov[0], moov[1]):
+            if trak[2] != b"trak":
+                continue
+
+            mdia = _findAtom(f, trak[0], trak[1], b"mdia")
+            if not mdia:
+                continue
+
+            #   Only use the video track
+            hdlr = _findAtom(f, mdia[0], mdia[1], b"hdlr")
+            if not hdlr:
+                continue
+            f.seek(hdlr[0] + 8)
+            if f.read(4) != b"vide":
+                continue
+
+            minf = _findAtom(f, mdia[0], mdia[1], b"minf")
+            stbl = minf and _findAtom(f, minf[0], minf[1], b"stbl")
+            stts = stbl and _findAtom(f, stbl[0], stbl[1], b"stts")
+            if not stts:
+                return None
+
+            #   Time-to-sample table:  sum of the sample counts
+            f.seek(stts[0] + 4)
+            entryCount = struct.unpack(">I", f.read(4))[0]
+            entries = f.read(entryCount * 8)
+            if len(entries) != entryCount * 8:
+                return None
+
+            frames = sum(count for count, _delta in struct.iter_unpack(">II", entries))
+
+            #   Fragmented files have empty sample tables
+            return frames or None
+
+    return None
+
+
+#   Yields (dataStart, atomEnd, type) for the atoms between start and end
+def _iterAtoms(f, start:int, end:int):
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+
+        size, atomType = struct.unpack(">I4s", header)
+        headerSize = 8
+
+        #   64-bit size
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            headerSize = 16
+        #   Atom extends to the end
+        elif size == 0:
+            size = end - pos
+
+        if size < headerSize:
+            return
+
+        yield pos + headerSize, min(pos + size, end), atomType
+        pos += size
+
+
+def _findAtom(f, start:int, end:int, atomType:bytes) -> tuple:
+    for atom in _iterAtoms(f, start, end):
+        if atom[2] == atomType:
+            return atom
+    return None
+
+
+####    FFPROBE    ####
+
+#   Returns the video frame count using FFprobe
+def _probeFrames(filePath:str, ffprobePath:str) -> int:
+    kwargs = {
+        "stdout": subprocess.PIPE,
+        "stderr": subprocess.PIPE,
+        "text":   True,
+    }
+
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+
+    #   Execute Quick Method
+    result = subprocess.run(
+        [
+            ffprobePath,
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=nb_frames",
+            "-of", "default=nokey=1:noprint_wrappers=1",
+            filePath
+        ],
+        **kwargs
+    )
+
+    #   Get Frames from Output
+    frames = result.stdout.strip()
+
+    #   If Quick Method didnt work, try Slower Fallback Method
+    if frames == 'N/A' or not frames.isdigit():
+        result = subprocess.run(
+            [
+                ffprobePath,
+                "-v", "error",
+                "-select_streams", "v:0",
+                "-count_frames",
+                "-show_entries", "stream=nb_read_frames",
+                "-of", "default=nokey=1:noprint_wrappers=1",
+                filePath
+            ],
+            **kwargs
+        )
+
+        frames = result.stdout.strip()
+
+    return int(frames) if frames.isdigit() else None
@@ -57,6 +57,8 @@ import glob
 import shutil
 import logging
 import time
+import contextlib
+import weakref
 from collections import defaultdict
 
 
@@ -72,7 +74,7 @@ from qtpy.QtWidgets import *
 
 import pyperclip
 
-from PrismUtils.Decorators import err_catcher as err_catcher
+from Libs.Prism_Fusion_lib_Profiler import err_catcher
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -85,6 +87,12 @@ from StateManagerNodes.fus_Legacy3D_Import import Legacy3D_ImportClass
 import Libs.Prism_Fusion_lib_Helper as Helper
 import Libs.Prism_Fusion_lib_Fus as Fus
 import Libs.Prism_Fusion_lib_3d as Fus3d
+import Libs.Prism_Fusion_lib_Image as Image
+import Libs.Prism_Fusion_lib_Cache as Cache
+import Libs.Prism_Fusion_lib_Benchmark as Benchmark
+import Libs.Prism_Fusion_lib_Profiler as Profiler
+import Libs.Prism_Fusion_lib_ApiCalls as ApiCalls
+import Libs.Prism_Fusion_lib_Render as Render
 
 logger = logging.getLogger(__name__)
 
@@ -94,7 +102,8 @@ class Prism_Fusion_Functions(object):
 	def __init__(self, core, plugin):
 		self.core:PrismCore = core
 		self.plugin = plugin
-		self.fusion:Fusion_ = bmd.scriptapp("Fusion")
+		#	Wrapped in a call counting proxy if enabled with PRISM_FUSION_CALLSTATS
+		self.fusion:Fusion_ = ApiCalls.wrapFusion(bmd.scriptapp("Fusion"))
 		self.comp:Composition_ = None # This comp is used by the stateManager to avoid overriding the state data on wrong comps
 		
 		self.MP_stateManager:StateManager = None # Reference to the stateManager to be used on the monkeypatched functions.
@@ -271,6 +280,24 @@ class Prism_Fusion_Functions(object):
 			case _:
 				self.aovThumbWidth = 500
 
+		#	Sets the number of concurrent thumbnail jobs
+		thumbThreads = self.core.getConfig("Fusion", "thumbThreads")
+		try:
+			self.thumbThreads = max(1, int(thumbThreads))
+		except (TypeError, ValueError):
+			self.thumbThreads = max(2, QThread.idealThreadCount() // 2)
+
+		#	Sets the number of render processes used for local renders,
+		#	0 renders in this session
+		renderProcesses = self.core.getConfig("Fusion", "renderProcesses")
+		if renderProcesses == "Auto":
+			self.renderProcesses = max(2, QThread.idealThreadCount() // 16)
+		else:
+			try:
+				self.renderProcesses = max(1, int(renderProcesses))
+			except (TypeError, ValueError):
+				self.renderProcesses = 0
+
 		self.core.setActiveStyleSheet("Fusion")
 		appIcon = QIcon(
 			os.path.join(self.core.prismRoot, "Scripts", "UserInterfacesPrism", "p_tray.png")
@@ -310,6 +337,7 @@ class Prism_Fusion_Functions(object):
 
 	@err_catcher(name=__name__)
 	def saveScene(self, origin, filepath, details={}):
+		self.flushStateSaves()
 		curComp = self.getCurrentComp()
 		return Fus.saveScene(curComp, filepath, details)
 	
@@ -377,10 +405,22 @@ class Prism_Fusion_Functions(object):
 
 	@err_catcher(name=__name__)
 	def sm_readStates(self, origin):
+		self.flushStateSaves()
+		#	States are reloaded from the Comp
+		self.unwatchAllMedia()
 		comp = self.getCurrentComp()
 		if self.sm_checkCorrectComp(comp):
 			return Fus.sm_readStates(comp)
 
+
+	#	Returns the parsed State data without re-reading the Comp
+	@err_catcher(name=__name__)
+	def getStatesData(self):
+		self.flushStateSaves()
+		comp = self.getCurrentComp()
+		if self.sm_checkCorrectComp(comp):
+			return Fus.getStatesData(comp)
+
 	@err_catcher(name=__name__)
 	def sm_createStatePressed(self, origin, stateType):
 		comp = self.getCurrentComp()
@@ -398,6 +438,7 @@ class Prism_Fusion_Functions(object):
 		if self.sm_checkCorrectComp(comp):
 			#	Sets the states datablock to empty default state
 			Fus.setDefaultState(comp)
+			self.unwatchAllMedia()
 			self.core.popup("All States have been removed.\n"
 							"You may have to remove associated Loaders and Savers\n"
 							"from the comp manually.")
@@ -437,7 +478,10 @@ class Prism_Fusion_Functions(object):
 	def sceneOpen(self, origin):
 		# if self.core.shouldAutosaveTimerRun():
 		# 	origin.startAutosaveTimer()
-		pass
+
+		#	Tool Index and State data belong to the previous Comp
+		Fus.invalidateToolIndex()
+		Fus.invalidateStateStore()
 
 
 	#	Returns Current Comp
@@ -696,13 +740,15 @@ class Prism_Fusion_Functions(object):
 	@err_catcher(name=__name__)
 	def origSaverStates(self, mode, comp, origSaverList):
 		# saverList = self.getSaverList(comp)
-		saverList = Fus.getAllToolsByType(comp, "Saver")
-		for tool in saverList:
-			toolName = Fus.getToolName(tool)
+		#	Read the Savers names and pass-through states in a single sweep
+		saverRecords = Fus.getCompSnapshot(comp, toolType="Saver", prismOnly=True)
+		for rec in saverRecords:
+			tool = rec["tool"]
+			toolName = rec["name"]
 
 			if mode == "save":
 				# Save the current pass-through state
-				origSaverList[toolName] = Fus.isPassThrough(comp, tool=tool)
+				origSaverList[toolName] = rec["passThrough"]
 				Fus.setPassThrough(comp, tool=tool, passThrough=True)
 			elif mode == "load":
 				# Restore the original pass-through state
@@ -770,13 +816,8 @@ class Prism_Fusion_Functions(object):
 	@err_catcher(name=__name__)
 	def createRendernode(self, toolUID, toolData):
 		comp = self.getCurrentComp()
-		comp.Lock()
-		comp.StartUndo("Create Render Node")
-
-		self.wrapped_createRendernode(toolUID, toolData, comp=comp)
-
-		comp.EndUndo()
-		comp.Unlock()		
+		with Fus.compTransaction(comp, "Create Render Node"):
+			self.wrapped_createRendernode(toolUID, toolData, comp=comp)
 	
 
 	@err_catcher(name=__name__)
@@ -813,13 +854,8 @@ class Prism_Fusion_Functions(object):
 	@err_catcher(name=__name__)
 	def updateRendernode(self, toolUID, toolData):
 		comp = self.getCurrentComp()
-		comp.Lock()
-		comp.StartUndo("Update Render Node")
-
-		self.wrapped_updateRendernode(toolUID, toolData, comp)	
-
-		comp.EndUndo()
-		comp.Unlock()
+		with Fus.compTransaction(comp, "Update Render Node"):
+			self.wrapped_updateRendernode(toolUID, toolData, comp)
 
 
 	@err_catcher(name=__name__)
@@ -861,6 +897,50 @@ class Prism_Fusion_Functions(object):
 				logger.warning(f"ERROR: Render Node does not exist: {toolUID}")
 
 
+	#	Returns the shared watcher for media version folders
+	@err_catcher(name=__name__)
+	def getMediaWatcher(self):
+		if not getattr(self, "mediaWatcher", None):
+			self.mediaWatcher = MediaWatcher()
+
+		return self.mediaWatcher
+
+
+	#	Stops watching the media folders of all States when they are closed or reloaded
+	@err_catcher(name=__name__)
+	def unwatchAllMedia(self):
+		if getattr(self, "mediaWatcher", None):
+			self.mediaWatcher.unwatchAll()
+
+
+	#	Returns a context manager that holds the State saves until the
+	#	outermost block exits, for operations that change many States
+	def stateSaveBatch(self):
+		scheduler = getattr(self, "stateSaveScheduler", None)
+		if scheduler:
+			return scheduler.batch()
+
+		return contextlib.nullcontext()
+
+
+	#	Writes any pending State saves to the Comp now
+	@err_catcher(name=__name__)
+	def flushStateSaves(self):
+		scheduler = getattr(self, "stateSaveScheduler", None)
+		if scheduler:
+			scheduler.flush()
+
+
+	#	Returns the counts of requested, written and avoided State saves
+	@err_catcher(name=__name__)
+	def getStateSaveStats(self):
+		scheduler = getattr(self, "stateSaveScheduler", None)
+		if scheduler:
+			return dict(scheduler.stats)
+
+		return {"requests": 0, "saves": 0, "avoided": 0}
+
+
 	#	Removes Node from Comp
 	@err_catcher(name=__name__)
 	def deleteNode(self, toolUID, delAction):
@@ -872,7 +952,7 @@ class Prism_Fusion_Functions(object):
 					tool = Fus.getToolByUID(comp, toolUID)
 					toolName = Fus.getToolName(tool)
 
-					tool.Delete()
+					Fus.deleteTool(comp, tool)
 					logger.debug(f"Removed tool '{toolName}")
 
 				except:
@@ -1044,13 +1124,8 @@ class Prism_Fusion_Functions(object):
 	@err_catcher(name=__name__)
 	def imageImport(self, state, importData, sortMode):
 		comp = self.getCurrentComp()
-		comp.Lock()
-		comp.StartUndo("Import Media")
-
-		result = self.wrapped_ImageImport(comp, state, importData, sortMode)
-
-		comp.EndUndo()
-		comp.Unlock()
+		with Fus.compTransaction(comp, "Import Media"):
+			result = self.wrapped_ImageImport(comp, state, importData, sortMode)
 
 		return result
 
@@ -1237,11 +1312,24 @@ class Prism_Fusion_Functions(object):
 
 		if toolData["extension"] == ".exr":
 			#	Handle Multi-part .exrs
-			try:
-				channel = toolData["channel"]
+			channel = toolData["channel"]
+			filePath = toolData["filepath"]
+			partName = None
 
-				#	Check if the file has parts
-				if ldr.Clip1.OpenEXRFormat.Part:
+			#	Read the parts and channels from the file header
+			exrHeader = Image.getExrHeader(filePath)
+
+			try:
+				if exrHeader:
+					parts = Image.getExrPartNames(filePath)
+					if parts:
+						#	Loader uses the first part by default
+						partName = channel if channel in parts else parts[0]
+						if channel in parts:
+							ldr.Clip1.OpenEXRFormat.Part = channel
+
+				#	Fallback to the Loader if the header could not be read
+				elif ldr.Clip1.OpenEXRFormat.Part:
 					#	Get list of parts in file
 					parts = ldr.Clip1.OpenEXRFormat.Part.GetAttrs('INPIDT_ComboControl_ID')
 					#	Match and assign part
@@ -1250,14 +1338,21 @@ class Prism_Fusion_Functions(object):
 			except:
 				logger.warning(f"ERROR: Unable to assign multi-part .exr for ({channel})")
 
-			try:		
-				#	Get available channels from Loader
-				loaderChannels = Fus.getLoaderChannels(ldr)
+			try:
+				#	Get available channels from the file header or Loader
+				if exrHeader:
+					loaderChannels = Fus.getFileChannels(filePath, partName)
+				else:
+					loaderChannels = Fus.getLoaderChannels(ldr)
 				channelData = Fus.getChannelData(loaderChannels)
 
-				#	Get the channel list for the channel being processed
-				if len(channelData) > 0:
-					channelDict = channelData[toolData["channel"]]
+				#	Get the channel list for the channel being processed.  A
+				#	part with a single layer uses it for the part name.
+				channelDict = channelData.get(channel) if channelData else None
+				if channelDict is None and channelData and partName == channel and len(channelData) == 1:
+					channelDict = next(iter(channelData.values()))
+
+				if channelDict:
 
 					# Dictionary to map channel types to attribute names
 					channel_attributes = {
@@ -1491,13 +1586,107 @@ class Prism_Fusion_Functions(object):
 			flow.Select(tool)
 
 
+	#	Times the State Manager operations on the current Comp and compares
+	#	them to the last run with the same Comp sizes.  Only operations that
+	#	do not change the Comp are run.
+	@err_catcher(name=__name__)
+	def runBenchmark(self, repeat:int=3, showResult:bool=True) -> dict:
+		comp = self.getCurrentComp()
+		if not self.sm_checkCorrectComp(comp):
+			return None
+
+		self.flushStateSaves()
+		sm = self.MP_stateManager
+		imageStates = [item.ui for item in self.get_all_items(sm.tw_import)
+						if item.ui.className == "Image_Import"]
+
+		sizes = {
+			"tools": len(Fus.getCompSnapshot(comp, dataOnly=True)),
+			"states": len(self.get_all_items(sm.tw_import)) + len(self.get_all_items(sm.tw_export)),
+			"aovs": sum(len(state.importData.get("files", [])) for state in imageStates),
+			}
+
+		def _updateAovStatus():
+			for state in imageStates:
+				state.updateAovStatus()
+
+		cases = {
+			"getCompSnapshot": lambda: Fus.getCompSnapshot(comp),
+			"buildToolIndex": lambda: Fus.getToolIndex(comp, rebuild=True),
+			"getStatesData": lambda: Fus.getStatesData(comp),
+			"getImageStatesIDs": self.getImageStatesIDs,
+			"updateAovStatus": _updateAovStatus,
+			}
+
+		counter = ApiCalls.getCallCount if ApiCalls.isEnabled() else None
+		run = Benchmark.runBenchmark(cases, sizes, repeat=repeat, counter=counter)
+		prevRun = Benchmark.getPreviousRun(run)
+		result = Benchmark.formatRun(run, prevRun)
+
+		logger.debug(f"Benchmark:\n{result}")
+
+		if showResult:
+			if not prevRun:
+				result += "\n\nNo previous run with the same Comp sizes."
+			self.core.popup(result, title="Benchmark", severity="info")
+
+		return run
+
+
+	#	Runs the benchmark cases against generated MockFusion Comps of the
+	#	standard sizes, so runs can be compared between plugin versions
+	#	without a production Comp.
+	@err_catcher(name=__name__)
+	def runMockBenchmark(self, repeat:int=3, showResult:bool=True) -> list:
+		runs = Benchmark.runMockBenchmark(repeat=repeat)
+		result = "\n\n".join(Benchmark.formatRun(run, Benchmark.getPreviousRun(run)) for run in runs)
+
+		logger.debug(f"Mock Benchmark:\n{result}")
+
+		if showResult:
+			self.core.popup(result, title="Mock Benchmark", severity="info")
+
+		return runs
+
+
+	#	Saves the recorded profile as a collapsed stack file for flame graphs
+	@err_catcher(name=__name__)
+	def saveProfile(self):
+		#	Do not record the save itself
+		Profiler.setProfiling(False)
+		try:
+			stackFile = Profiler.dumpProfile()
+		finally:
+			Profiler.setProfiling(True)
+
+		if stackFile:
+			self.core.popup(f"Saved profile to:\n\n{stackFile}", title="Profiler", severity="info")
+		else:
+			self.core.popup("Unable to save the profile", title="Profiler")
+
+
+	#	Saves the Fusion API call counts and latencies of this session
+	@err_catcher(name=__name__)
+	def saveCallReport(self):
+		reportFile = ApiCalls.saveReport()
+		if not reportFile:
+			self.core.popup("Unable to save the Fusion call report", title="Fusion Calls")
+			return
+
+		summary = ApiCalls.formatReport(ApiCalls.getReport(), top=10)
+		self.core.popup(f"{summary}\n\nSaved report to:\n{reportFile}", title="Fusion Calls", severity="info")
+
+
 	#	Sort and arrange all Prism Loaders 
 	@err_catcher(name=__name__)
 	def sortLoaders(self, comp, currentStateID=None, getfeedback:bool=False, offset=1.5, flowThresh=100, toolThresh=3, horzGap=1.1, vertGap=1):
 		flow = comp.CurrentFrame.FlowView
 
-		posRefNode = Fus.findLeftmostUpperTool(comp, toolType="Loader")
-		if not posRefNode:
+		#	Read all the Loaders in a single sweep
+		ldrRecords = Fus.getCompSnapshot(comp, toolType="Loader")
+
+		posRefRecord = Fus.findLeftmostUpperRecord(ldrRecords)
+		if not posRefRecord:
 			return self.core.popup("Nothing to Sort", severity="info")
 		
 		stateuids:list = self.getImageStatesIDs()
@@ -1506,53 +1695,39 @@ class Prism_Fusion_Functions(object):
 			stateuids.append(currentStateID)
 
 		#   Get the left-most and bottom-most Loader within a threshold.
-		leftmostpos, bottommostpos = Fus.getToolPosition(comp, posRefNode)
+		leftmostpos, bottommostpos = posRefRecord["pos"]
 
 		#   We get only the loaders within a threshold from the leftmost and who were created by prism.
 		try:
-			start=time.time()
-			loaders = [l for l in comp.GetToolList(False, "Loader").values()
+			loaders = [rec for rec in ldrRecords
 					if (
-						abs(Fus.getToolPosition(comp, l)[0] - leftmostpos) <= flowThresh
-						and l.GetData("Prism_UUID")
-						and l.GetData('Prism_ToolData')
-						and l.GetData('Prism_ToolData').get("stateUID") in stateuids
+						rec["pos"]
+						and abs(rec["pos"][0] - leftmostpos) <= flowThresh
+						and rec["uid"]
+						and rec["toolData"]
+						and rec["toolData"].get("stateUID") in stateuids
 						)
 						]
-			# We sort top to bottom to get the topmost position among these
-			loaderstop2bot = sorted(loaders, key=lambda ld: Fus.getToolPosition(comp, ld)[1])
-			
 		except:
 			logger.warning("ERROR: Cannot sort loaders - unable to resolve threshold in the flow")
 			return
 
-		# Create a mapping for UID priority
-		uid_index = {uid: index for index, uid in enumerate(stateuids)}
+		if len(loaders) < 1:
+			return
 
-		# Sort first by UID block using the index on the sorted function, then by name
-		# Sort primarily by the UID order (using its numeric rank from uid_index) If multiple entries share the same UID, sort alphabetically by name
-		sortedloaders = sorted(loaders, key=lambda ld: (uid_index[ld.GetData("Prism_ToolData").get("stateUID")], ld.Name.lower()))
-					
 		# if refNode is not part of nodes to sort we move the nodes down so they don't overlap it.
-		refInNodes = any(ldr.Name == posRefNode.Name for ldr in sortedloaders)
-
-		if len(sortedloaders) < 1:
-			return
-		# To check if a node is in a layer or if we've switched layers, we first store a refernce layer
-		# update it and compare it in each iteration.
-		lastLoaderLyr = sortedloaders[0].GetData("Prism_ToolData").get("mediaId")
+		refInNodes = any(rec["name"] == posRefRecord["name"] for rec in loaders)
 
 		try:
-			new_X = leftmostpos
-			new_Y = Fus.getToolPosition(comp, loaderstop2bot[0])[1]
+			#	Read the connected tools and their positions once
+			layoutItems = []
+			toolsByName = {}
+			connections = []
 
-			if not refInNodes:
-				new_Y = bottommostpos + offset
-
-			for ldr in sortedloaders:
-				#   Get Loader data
-				ldrData = Fus.getToolData(ldr)
-				lyrNm = ldrData['mediaId']
+			for rec in loaders:
+				ldr = rec["tool"]
+				ldrData = rec["toolData"]
+				toolsByName[rec["name"]] = ldr
 
 				#	Gets the connected tools if any
 				connectedTools = ldrData.get("connectedNodes", None)
@@ -1567,43 +1742,58 @@ class Prism_Fusion_Functions(object):
 				# Get input object connected to Loader
 				nextToolInput = Fus.getInputsFromOutput(ldr)
 				nextTool = nextToolInput[0].GetTool() if nextToolInput else None
-				nextToolName = nextTool.Name if nextTool else None
-
-				# Get Wireless_IN position before moving (only if inNode exists)
-				inNodeOrigPos = Fus.getToolPosition(comp, inNode) if inNode else None
 
-				# Adjust vertical position for the Loader
-				if lyrNm != lastLoaderLyr:
-					new_Y += vertGap
-
-				# Set Loader position
-				Fus.setToolPosition(flow, ldr, new_X, new_Y)
-
-				# Only handle connections if there are connected tools
+				item = {"id": rec["name"],
+						"stateUID": ldrData.get("stateUID"),
+						"mediaId": ldrData.get("mediaId"),
+						"pos": rec["pos"],
+						"nextId": None,
+						"inId": None,
+						"inPos": None,
+						"outId": None,
+						"outPos": None}
+
+				if nextTool:
+					item["nextId"] = Fus.getToolName(nextTool)
+					toolsByName[item["nextId"]] = nextTool
+
+				if inNode:
+					item["inId"] = Fus.getToolName(inNode)
+					item["inPos"] = Fus.getToolPosition(comp, inNode)
+					toolsByName[item["inId"]] = inNode
+
+				if outNode:
+					item["outId"] = Fus.getToolName(outNode)
+					item["outPos"] = Fus.getToolPosition(comp, outNode)
+					toolsByName[item["outId"]] = outNode
+
+				#	Only handle connections if there are connected tools
 				if inNode and nextTool:
-					if nextToolName != inNode.Name:
-						# Connect Loader to nextTool
-						Fus.connectTools(ldr, nextTool)
-						# Position nextTool to the right of the Loader
-						Fus.setToolPosRelative(comp, nextTool, ldr, horzGap)
-						# Connect nextTool to _IN
-						Fus.connectTools(nextTool, inNode)
-						# Position Wireless_IN to the right of the Loader
-						Fus.setToolPosRelative(comp, inNode, ldr, horzGap * 2)
+					if item["nextId"] != item["inId"]:
+						connections.append((ldr, nextTool))
+						connections.append((nextTool, inNode))
 					else:
-						# Connect Loader to Wireless IN
-						Fus.connectTools(ldr, inNode)
-						# Position Wireless_IN to the right of the Loader
-						Fus.setToolPosRelative(comp, inNode, ldr, horzGap * 2)
-
-				if outNode and inNode:
-					# If _OUT and _IN are within toolThresh, position _OUT
-					if Fus.isToolNearTool(comp, outNode, refPos=inNodeOrigPos, thresh=toolThresh):
-						Fus.setToolPosRelative(comp, outNode, inNode, horzGap)
-
-				# Increment vertical position for next Loader
-				new_Y += vertGap
-				lastLoaderLyr = lyrNm
+						connections.append((ldr, inNode))
+
+				layoutItems.append(item)
+
+			#	Calculate the new layout
+			positions = Helper.calcLoaderLayout(layoutItems,
+												stateuids,
+												(leftmostpos, bottommostpos),
+												refInNodes,
+												offset=offset,
+												toolThresh=toolThresh,
+												horzGap=horzGap,
+												vertGap=vertGap)
+
+			#	Write the connections and positions once
+			with Fus.compTransaction(comp, "Sort Loaders"):
+				for toolFrom, toolTo in connections:
+					Fus.connectTools(toolFrom, toolTo)
+
+				for toolName, (new_X, new_Y) in positions.items():
+					Fus.setToolPosition(flow, toolsByName[toolName], new_X, new_Y)
 			
 			logger.debug("Sorted Nodes")
 			
@@ -1625,21 +1815,22 @@ class Prism_Fusion_Functions(object):
 			return
 
 		#	Read State Data from Comp
-		stateData_raw = Fus.sm_readStates(comp)
-		stateData_json = self.core.configs.readJson(data=stateData_raw)
+		self.flushStateSaves()
+		stateData_json = Fus.getStatesData(comp)
 		stateData = stateData_json.get("states", []) if stateData_json else []
 
 		#	Collect existing stateUIDs
 		stateUIDs = {state["stateUID"] for state in stateData if "stateUID" in state}
 
-		#	Get all Prism Loaders
-		prismLoaders = Fus.getAllPrismTools(comp, category="import2d", toolType="Loader")
+		#	Get all Prism Loaders in a single sweep
+		ldrRecords = Fus.getCompSnapshot(comp, toolType="Loader", prismOnly=True, dataOnly=True)
 
 		#	Group Missing Loaders by State UUID
 		groupedLoaders = defaultdict(list)
-		for tool in prismLoaders:
-			tData = Fus.getToolData(tool)
-			if not tData:
+		for rec in ldrRecords:
+			tool = rec["tool"]
+			tData = rec["toolData"]
+			if not tData or tData.get("listType") != "import2d":
 				continue
 
 			stateUID = tData.get("stateUID")
@@ -1707,19 +1898,13 @@ class Prism_Fusion_Functions(object):
 		flow:FlowView_ = comp.CurrentFrame.FlowView
 
 		if self.sm_checkCorrectComp(comp):
-			comp.Lock()
-			comp.StartUndo("Import USD")
+			with Fus.compTransaction(comp, "Import USD"):
+				flow.InsertBookmark("USD_Import")
+				result = self.wrapped_importUSD(origin, UUID, toolData, update)
 
-			flow.InsertBookmark("USD_Import")
-			result = self.wrapped_importUSD(origin, UUID, toolData, update)
-
-			
-			bookmarks = flow.GetBookmarkList()
-			last_item = bookmarks.popitem()
-			flow.SetBookmarkList(bookmarks)
-			
-			comp.EndUndo()
-			comp.Unlock()
+				bookmarks = flow.GetBookmarkList()
+				last_item = bookmarks.popitem()
+				flow.SetBookmarkList(bookmarks)
 		else:
 			logger.warning(f"ERROR: Unable to import USD")
 			return {"result": False, "doImport": False}
@@ -1773,13 +1958,8 @@ class Prism_Fusion_Functions(object):
 	def createUsdScene(self, origin, UUID):
 		comp = self.getCurrentComp()
 		if self.sm_checkCorrectComp(comp):
-			comp.Lock()
-			comp.StartUndo("Create USD Scene")
-
-			self.wrapped_createUsdScene(origin, UUID, comp)
-
-			comp.EndUndo()
-			comp.Unlock()
+			with Fus.compTransaction(comp, "Create USD Scene"):
+				self.wrapped_createUsdScene(origin, UUID, comp)
 		else:
 			logger.warning(f"ERROR: Unable to create USD scene")
 
@@ -1801,14 +1981,10 @@ class Prism_Fusion_Functions(object):
 		comp = self.getCurrentComp()
 		flow:FlowView_ = comp.CurrentFrame.FlowView
 
-		# comp.Lock()
-		comp.StartUndo("Create USD Material")
-
-		flow.InsertBookmark("USDmat_Import")
-		result = self.wrapped_createUsdMaterial(origin, UUID, texData, update)
-
-		comp.EndUndo()
-		# comp.Unlock()
+		#	Not locked since the group creation needs an unlocked Comp
+		with Fus.compTransaction(comp, "Create USD Material", lock=False):
+			flow.InsertBookmark("USDmat_Import")
+			result = self.wrapped_createUsdMaterial(origin, UUID, texData, update)
 
 		return result
 
@@ -2002,14 +2178,9 @@ class Prism_Fusion_Functions(object):
 		comp = self.getCurrentComp()
 		flow:FlowView_ = comp.CurrentFrame.FlowView
 
-		comp.Lock()
-		comp.StartUndo("Import USD MaterialX")	
-
-		flow.InsertBookmark("USDmatX_Import")
-		result = self.wrapped_createUsdMatX(origin, UUID, texData, update)
-
-		comp.EndUndo()
-		comp.Unlock()
+		with Fus.compTransaction(comp, "Import USD MaterialX"):
+			flow.InsertBookmark("USDmatX_Import")
+			result = self.wrapped_createUsdMatX(origin, UUID, texData, update)
 
 		return result
 
@@ -2052,14 +2223,9 @@ class Prism_Fusion_Functions(object):
 		flow:FlowView_ = comp.CurrentFrame.FlowView
 
 		if self.sm_checkCorrectComp(comp):
-			comp.Lock()
-			comp.StartUndo("Import 3D Object")
-
-			flow.InsertBookmark("3dObject_Import")
-			result = self.wrapped_import3dObject(origin, UUID, toolData, comp=comp, update=update)
-
-			comp.EndUndo()
-			comp.Unlock()
+			with Fus.compTransaction(comp, "Import 3D Object"):
+				flow.InsertBookmark("3dObject_Import")
+				result = self.wrapped_import3dObject(origin, UUID, toolData, comp=comp, update=update)
 		else:
 			logger.warning(f"ERROR: Unable to import 3d object")
 			return {"result": False, "doImport": False}
@@ -2123,13 +2289,8 @@ class Prism_Fusion_Functions(object):
 	def create3dScene(self, origin, UUID):
 		comp = self.getCurrentComp()
 		if self.sm_checkCorrectComp(comp):
-			comp.Lock()
-			comp.StartUndo("Create 3D Scene")	
-
-			self.wrapped_create3dScene(origin, UUID)
-
-			comp.EndUndo()
-			comp.Unlock()
+			with Fus.compTransaction(comp, "Create 3D Scene"):
+				self.wrapped_create3dScene(origin, UUID)
 		else:
 			logger.warning(f"ERROR: Unable to create 3d scene")
 
@@ -2153,14 +2314,9 @@ class Prism_Fusion_Functions(object):
 
 		# Check that we are not importing in a comp different than the one we started the stateManager from
 		if self.sm_checkCorrectComp(comp):
-			comp.Lock()
-			comp.StartUndo("Import Legacy3D")
-
-			flow.InsertBookmark("3dImportBM") # Save where the view is at the time of import.
-			result:dict[str, bool] = self.wrapped_importLegacy3D(origin, UUID, nodeData, update)
-
-			comp.EndUndo()
-			comp.Unlock()
+			with Fus.compTransaction(comp, "Import Legacy3D"):
+				flow.InsertBookmark("3dImportBM") # Save where the view is at the time of import.
+				result:dict[str, bool] = self.wrapped_importLegacy3D(origin, UUID, nodeData, update)
 		else:
 			logger.warning(f"ERROR: Unable to import 3D Scene")
 			return {"result": False, "doImport": False}
@@ -2267,7 +2423,7 @@ class Prism_Fusion_Functions(object):
 	
 	@err_catcher(name=__name__)
 	def sm_render_preSubmit(self, origin, rSettings):
-		pass
+		self.flushStateSaves()
 
 
 	###############################
@@ -2503,15 +2659,13 @@ class Prism_Fusion_Functions(object):
 	@err_catcher(name=__name__)
 	def getMatchingStateDataFromUID(self, toolUID):
 		comp = self.getCurrentComp()
-		stateDataRaw = json.loads(self.sm_readStates(self))
 
-		# Iterate through the states to find the matching state dictionary
-		stateDetails = None
-		for stateData in stateDataRaw["states"]:
-			if stateData.get("toolUID") == toolUID:
-				stateDetails = stateData
-				logger.debug(f"State data found for: {Fus.getToolNameByUID(comp, toolUID)}")
-				return stateDetails
+		#	Look up the State in the cached State data
+		self.flushStateSaves()
+		stateDetails = Fus.getStateDataByUID(comp, toolUID)
+		if stateDetails and stateDetails.get("toolUID") == toolUID:
+			logger.debug(f"State data found for: {Fus.getToolNameByUID(comp, toolUID)}")
+			return stateDetails
 
 		logging.warning(f"ERROR: No state details for:  {toolUID}")
 		return None
@@ -2789,13 +2943,17 @@ path = r\"%s\"
 				logger.warning(f"ERROR: Unable to delete temporary Scale tool {tool}")
 
 
-	#	Configures all the settings and paths for each state of the RenderGroup
+	#	Configures all the settings and paths for each state of the RenderGroup.
+	#	The render versions and paths of all states are resolved first in the
+	#	main thread, the output folders are then created in a thread pool, and
+	#	the Comp is changed in a single pass.
 	@err_catcher(name=__name__)
 	def configureRenderComp(self, origin, comp, rSettings):
 		self.origSaverList = {}
 		self.masterData = []
 		self.versionData = []
 		self.tempScaleTools = []
+		self.renderOutputs = {}
 
 		context = rSettings["context"]
 		
@@ -2811,27 +2969,25 @@ path = r\"%s\"
 		#	Configure Comp with overrides from RenderGroup
 		self.setCompOverrides(comp, rSettings)
 
+		scaleOvrType, scaleOvrCode = self.getScaleOverride(rSettings)
+		#	Gets list of ext types that are still image formats
+		imageExts = [formatDict["extension"] for formatDict in self.outputFormats if formatDict["type"] == "image"]
+		comment = origin.stateManager.publishComment
+
+		#	Read the State data of each Saver
+		renderJobs = []
 		for toolUID in renderStates:
 			#	Get State data from Comp
 			stateData = self.getMatchingStateDataFromUID(toolUID)
 			toolName = Fus.getToolNameByUID(comp, toolUID)
 
-			#	Exits if unable to get state data
+			#	Skips the state if unable to get state data
 			if not stateData:
 				logger.warning(f"ERROR: Unable to configure RenderComp for {toolName}")
-
-			sv = Fus.getToolByUID(comp, toolUID)
-			Fus.setPassThrough(comp, toolUID=toolUID, passThrough=False)
-
-			#	Add Scale tool if scale override is above 100%
-			scaleOvrType, scaleOvrCode = self.getScaleOverride(rSettings)
-			if scaleOvrType == "scale":
-				self.addScaletool(comp, sv, scaleOvrCode)
+				continue
 
 			#	Set frame padding format for Fusion
 			extension = stateData["outputFormat"]
-			#	Gets list of ext types that are still image formats
-			imageExts = [formatDict["extension"] for formatDict in self.outputFormats if formatDict["type"] == "image"]
 			if extension in imageExts:
 				#	Adds project padding to the name if it is a image sequence
 				framePadding = "0" * self.core.framePadding
@@ -2839,7 +2995,106 @@ path = r\"%s\"
 				#	Adds empty string if a movie format
 				framePadding = ""
 
-			context["frame"] = framePadding
+			stateContext = context.copy()
+			stateContext["frame"] = framePadding
+
+			renderJobs.append({"toolUID": toolUID,
+							   "toolName": toolName,
+							   "stateData": dict(stateData),
+							   "context": stateContext,
+							   "extension": extension,
+							   "framePadding": framePadding})
+
+		#	Resolve the versions and output paths before changing the Comp.  The
+		#	Prism core is not thread safe, so this runs in the main thread and
+		#	repeated lookups are served from the media path cache.
+		if renderJobs:
+			for job in renderJobs:
+				outputPathData, error = self.resolveRenderPath(job, rSettings, comment)
+				if error:
+					logger.warning(f"ERROR: Unable to get output filepath:\n{error}")
+					return
+				job["outputPathData"] = outputPathData
+
+			#	The context keeps the values of the last state as before
+			context.update(renderJobs[-1]["context"])
+
+			#	Create the output folders at the same time, since this only
+			#	touches the disk
+			outputDirs = [os.path.dirname(job["outputPathData"]["path"]) for job in renderJobs]
+			dirErrors = Render.createOutputDirs(outputDirs)
+			if dirErrors:
+				for dirPath, error in dirErrors.items():
+					logger.warning(f"ERROR: Unable to create output folder {dirPath}:\n{error}")
+				return
+
+		#	Apply the changes to the Comp
+		with Fus.compTransaction(comp, "Configure Render Comp", lock=False, undo=False):
+			for job in renderJobs:
+				toolUID = job["toolUID"]
+				stateData = job["stateData"]
+				extension = job["extension"]
+
+				sv = Fus.getToolByUID(comp, toolUID)
+				Fus.setPassThrough(comp, toolUID=toolUID, passThrough=False)
+
+				#	Add Scale tool if scale override is above 100%
+				if scaleOvrType == "scale":
+					self.addScaletool(comp, sv, scaleOvrCode)
+
+				#	Get version filepath for Saver
+				outputPathData = job["outputPathData"]
+				self.outputPath = outputPathData["path"]
+
+				#	Configure Saver with new filepath						#	TODO
+				toolData = {"toolName": job["toolName"],
+							"filepath": self.outputPath,
+							"format": extension,
+							"fuseFormat": self.getFuseFormat(extension)}
+
+				self.configureRenderNode(toolUID, toolData)
+				self.renderOutputs[toolUID] = {"path": self.outputPath,
+											   "sequence": extension in imageExts}
+
+				stateData["comment"] = self.MP_stateManager.publishComment
+				renderDir = os.path.dirname(self.outputPath)
+				self.saveVersionList(renderDir, outputPathData)
+
+				#	Setup master version execution
+				self.saveMasterData(rSettings, stateData, self.outputPath)
+
+				#	The render creates a new version of the product
+				Cache.invalidateMediaVersions(self.outputPath)
+
+		logger.debug(f"Configured Render settings for comp: {comp.GetAttrs()['COMPS_Name']}")
+
+
+	#	Returns core.mediaProducts.generateMediaProductPath() from the version
+	#	registry if the product folder has not changed since the last call with
+	#	the same arguments.  Not wrapped in err_catcher so resolveRenderPath()
+	#	can report the error.
+	def generateMediaProductPath(self, **kwargs):
+		key = Cache.getMediaPathKey(kwargs)
+		outputPathData = Cache.getCachedMediaPath(key)
+		if outputPathData:
+			return outputPathData
+
+		outputPathData = self.core.mediaProducts.generateMediaProductPath(**kwargs)
+		if kwargs.get("returnDetails"):
+			Cache.saveCachedMediaPath(key, outputPathData)
+
+		return outputPathData
+
+
+	#	Returns (outputPathData, error) for a render job.  Errors are returned
+	#	instead of being shown by err_catcher so configureRenderComp() can stop
+	#	before the Comp is changed.
+	def resolveRenderPath(self, job, rSettings, comment):
+		stateData = job["stateData"]
+		context = job["context"]
+
+		try:
+			useVersion = None
 
 			#	If Render as Previous Version enabled
 			if rSettings["renderAsPrevVer"]:
@@ -2853,13 +3108,9 @@ path = r\"%s\"
 					stateData["identifier"] = stateData["taskname"]
 					context["mediaType"] = "2drenders"
 					#	Get highest existing render version to use for render
-					self.useVersion = self.core.mediaProducts.getHighestMediaVersion(context, getExisting=True)
+					useVersion = self.core.mediaProducts.getHighestMediaVersion(context, getExisting=True)
 				except:
-					self.useVersion = None
-
-			#	If Render as Previous Version not enabled
-			else:
-				self.useVersion = None
+					useVersion = None
 
 			#	 Handle Location override
 			if rSettings["locationOvr"]:
@@ -2867,44 +3118,24 @@ path = r\"%s\"
 			else:
 				renderLoc = stateData["curoutputpath"]
 
-			try:
-				#	Get new render path from Core for each Saver
-				outputPathData = self.core.mediaProducts.generateMediaProductPath(
-					entity=context,
-					task=stateData["taskname"],
-					extension=stateData["outputFormat"],
-					framePadding=framePadding,
-					comment=origin.stateManager.publishComment,
-					version=self.useVersion if self.useVersion != "next" else None,
-					location=renderLoc,
-					singleFrame=False,
-					returnDetails=True,
-					mediaType="2drenders"
-					)
-				
-			except Exception as e:
-				logger.warning(f"ERROR: Unable to get output filepath:\n{e}")
-				return
-
-			#	Get version filepath for Saver
-			self.outputPath = outputPathData["path"]
-
-			#	Configure Saver with new filepath						#	TODO
-			toolData = {"toolName": toolName,
-						"filepath": self.outputPath,
-			   			"format": extension,
-						"fuseFormat": self.getFuseFormat(extension)}
-
-			self.configureRenderNode(toolUID, toolData)
-
-			stateData["comment"] = self.MP_stateManager.publishComment
-			renderDir = os.path.dirname(self.outputPath)
-			self.saveVersionList(renderDir, outputPathData)
-
-			#	Setup master version execution
-			self.saveMasterData(rSettings, stateData, self.outputPath)
+			#	Get new render path from Core for each Saver
+			outputPathData = self.generateMediaProductPath(
+				entity=context,
+				task=stateData["taskname"],
+				extension=job["extension"],
+				framePadding=job["framePadding"],
+				comment=comment,
+				version=useVersion if useVersion != "next" else None,
+				location=renderLoc,
+				singleFrame=False,
+				returnDetails=True,
+				mediaType="2drenders"
+				)
+			
+			return outputPathData, None
 
-		logger.debug(f"Configured Render settings for comp: {comp.GetAttrs()['COMPS_Name']}")
+		except Exception as e:
+			return None, e
 
 
 	@err_catcher(name=__name__)
@@ -3048,8 +3279,19 @@ path = r\"%s\"
 				#	Gets render args from override settings
 				renderCmd = self.makeRenderCmd(comp, rSettings)
 
-				#	Renders with override args (and suppress Fusion Render Finished Popup)
-				comp.Render({**renderCmd, 'RenderFlags': 524288, 'Tool': sv, "Wait": True})
+				#	Renders in separate render processes if enabled
+				currFile = self.core.getCurrentFileName()
+				useRenderQueue = self.renderProcesses > 0 and bool(currFile)
+				renderResult = True
+
+				if useRenderQueue:
+					imageExts = [fmt["extension"] for fmt in self.outputFormats if fmt["type"] == "image"]
+					outputs = {toolUID: {"path": outputName,
+										 "sequence": rSettings["format"] in imageExts}}
+					renderResult = self.renderLocalQueue(origin, comp, renderCmd, outputs)
+				else:
+					#	Renders with override args (and suppress Fusion Render Finished Popup)
+					comp.Render({**renderCmd, 'RenderFlags': 524288, 'Tool': sv, "Wait": True})
 				
 				#	Remove any temp Scale tools
 				self.deleteTempScaleTools()
@@ -3057,6 +3299,13 @@ path = r\"%s\"
 				#	Reset Comp settings to Original
 				self.loadOrigCompSettings(comp, origCompSettings)
 
+				#	Saving the temp comps changed the Comp filepath
+				if useRenderQueue:
+					comp.Save(currFile)
+
+				if not renderResult:
+					return "Error (Local render did not complete)"
+
 				if len(os.listdir(os.path.dirname(outputName))) > 0:
 					return "Result=Success"
 				else:
@@ -3090,8 +3339,16 @@ path = r\"%s\"
 			#	Gets render args from override settings
 			renderCmd = self.makeRenderCmd(comp, rSettings, group=True)
 
-			#	Renders with override args (and suppress Fusion Render Finished Popup)
-			comp.Render({**renderCmd, 'RenderFlags': 524288, "Wait": True})
+			#	Renders in separate render processes if enabled
+			currFile = self.core.getCurrentFileName()
+			useRenderQueue = self.renderProcesses > 0 and bool(currFile)
+
+			if useRenderQueue:
+				renderResult = self.renderLocalQueue(origin, comp, renderCmd, self.renderOutputs)
+			else:
+				#	Renders with override args (and suppress Fusion Render Finished Popup)
+				comp.Render({**renderCmd, 'RenderFlags': 524288, "Wait": True})
+				renderResult = True
 
 			#	Remove any temp Scale tools
 			self.deleteTempScaleTools()
@@ -3102,7 +3359,9 @@ path = r\"%s\"
 			#	Reconfigure pass-through of Savers
 			self.origSaverStates("load", comp, self.origSaverList)
 
-			renderResult = True
+			#	Saving the temp comps changed the Comp filepath
+			if useRenderQueue:
+				comp.Save(currFile)
 
 		except:
 			renderResult = False
@@ -3132,6 +3391,128 @@ path = r\"%s\"
 				return "Error (Failed to update Master)", False
 
 
+	#	Renders the Savers in outputs {toolUID: {"path", "sequence"}} with
+	#	several render processes.  Image sequences are split into frame chunks
+	#	of one temp comp, and each movie gets its own temp comp and a single
+	#	job since movies cannot be split.  Movies with gaps in the frame range
+	#	cannot be rendered by a single process, so they are rendered in this
+	#	session.  Frames verified by an earlier render of the same comp are
+	#	skipped.  Returns True if all frames were rendered.
+	#
+	#	Each temp comp only renders the Savers of its group, as a render in
+	#	this session with 'Tool' or after configureRenderComp() does.  All
+	#	other Savers, including Savers not made by Prism, are set to
+	#	pass-through in the temp comps only.  The pass-through and the Comp
+	#	attributes changed for the temp comps are restored once they are
+	#	saved.  Saving the temp comps changes the Comp filepath, which the
+	#	callers restore by saving the Comp after they reset the render settings.
+	@err_catcher(name=__name__)
+	def renderLocalQueue(self, origin, comp, renderCmd, outputs):
+		currFile = self.core.getCurrentFileName()
+		dirPath, fileName = os.path.split(currFile)
+		baseName, ext = os.path.splitext(fileName)
+
+		tempDir = os.path.join(dirPath, "TEMP_LOCAL")
+		if not os.path.exists(tempDir):
+			os.mkdir(tempDir)
+
+		frames = Render.getFramesFromRenderCmd(renderCmd)
+
+		frameRuns = Render.getFrameRuns(frames)
+
+		seqUIDs = [uid for uid, output in outputs.items() if output["sequence"]]
+		movieUIDs = [uid for uid, output in outputs.items() if not output["sequence"]]
+
+		if len(frameRuns) == 1:
+			compGroups = [[uid] for uid in movieUIDs]
+			sessionUIDs = []
+		else:
+			compGroups = []
+			sessionUIDs = movieUIDs
+
+		if seqUIDs:
+			compGroups.insert(0, seqUIDs)
+
+		fusionExe = self.fusion.GetAttrs()["FUSIONS_FileName"]
+		queue = Render.LocalRenderQueue(Render.getRenderExecutable(fusionExe), self.renderProcesses)
+
+		#	Save a temp comp for each group with only its Savers enabled
+		saverRecords = Fus.getCompSnapshot(comp, toolType="Saver")
+		origPassThrough = {rec["name"]: rec["passThrough"] for rec in saverRecords}
+		compAttrs = Render.getCompAttrsFromRenderCmd(renderCmd)
+		origCompAttrs = Render.getOrigCompAttrs(comp, compAttrs)
+
+		try:
+			with Fus.compTransaction(comp, "Local Render Queue", lock=False, undo=False):
+				comp.SetAttrs(compAttrs)
+
+				for idx, uids in enumerate(compGroups):
+					for rec in saverRecords:
+						Fus.setPassThrough(comp, tool=rec["tool"], passThrough=rec["uid"] not in uids)
+
+					tempFilePath = os.path.join(tempDir, f"{baseName}--TEMP_LOCAL_{idx}{ext}")
+					if not comp.Save(tempFilePath):
+						raise Exception(f"Unable to save temp Comp: {tempFilePath}")
+
+					paths = [outputs[uid]["path"] for uid in uids]
+					name = Fus.getToolNameByUID(comp, uids[0])
+
+					if uids is seqUIDs:
+						fingerprint = Render.getCompFingerprint(tempFilePath, renderCmd)
+						Render.addChunkedJobs(queue, name, tempFilePath, frames, paths, fingerprint)
+					else:
+						start, end = frameRuns[0]
+						queue.addJob(f"{name} ({start}-{end})", tempFilePath, start, end, paths, sequence=False)
+
+		except Exception as e:
+			logger.warning(f"ERROR: Unable to prepare local render queue:\n{e}")
+			shutil.rmtree(tempDir, ignore_errors=True)
+			return False
+
+		finally:
+			#	Restore everything changed for the temp comps
+			for rec in saverRecords:
+				Fus.setPassThrough(comp, tool=rec["tool"], passThrough=origPassThrough[rec["name"]])
+			if origCompAttrs:
+				comp.SetAttrs(origCompAttrs)
+
+		#	Show the progress of all render processes in the State Manager
+		progress = QProgressDialog("Starting render processes...", "Cancel", 0, queue.totalFrames, origin.stateManager)
+		progress.setWindowTitle("Local Render")
+		progress.setWindowModality(Qt.WindowModal)
+		progress.setMinimumDuration(0)
+
+		def onProgress(done, total, running):
+			progress.setMaximum(total)
+			progress.setValue(done)
+			progress.setLabelText(f"Rendered {done} of {total} frames with {running} render processes")
+			QApplication.processEvents()
+
+		try:
+			result = queue.run(onProgress=onProgress, isCancelled=progress.wasCanceled)
+		finally:
+			progress.close()
+			shutil.rmtree(tempDir, ignore_errors=True)
+
+		if queue.cancelled:
+			logger.warning("Local render was cancelled")
+			return False
+
+		#	Renders the movies with frame range gaps in this session
+		for uid in sessionUIDs:
+			sv = Fus.getToolByUID(comp, uid)
+			comp.Render({**renderCmd, 'RenderFlags': 524288, 'Tool': sv, "Wait": True})
+			if not Render.isOutputValid(outputs[uid]["path"]):
+				logger.warning(f"ERROR: Movie was not rendered: {outputs[uid]['path']}")
+				result = False
+
+		if result:
+			logger.debug(f"Rendered {queue.totalFrames - queue.resumedFrames} frames with {len(queue.jobs)} render jobs, "
+						 f"{queue.resumedFrames} frames resumed")
+
+		return result
+
+
 	#	Generates a temp file and dir for farm submission
 	@err_catcher(name=__name__)
 	def getFarmTempFilepath(self, origFilepath):
@@ -3176,6 +3557,7 @@ path = r\"%s\"
 	#	Submits the temp comp file to the Farm plugin for rendering
 	@err_catcher(name=__name__)
 	def sm_render_startFarmGroupRender(self, origin, farmPlugin, rSettings):
+		self.flushStateSaves()
 		comp = self.getCurrentComp()
 		comp.Lock()
 
@@ -3415,9 +3797,8 @@ path = r\"%s\"
 	@err_catcher(name=__name__)
 	def deleteNodes(self, stateUID):
 		comp:Composition_ = self.getCurrentComp()
-		comp.StartUndo("delete Legacy3D Nodes")
-		Fus3d.deleteTools(comp, stateUID)
-		comp.EndUndo()
+		with Fus.compTransaction(comp, "delete Legacy3D Nodes", lock=False):
+			Fus3d.deleteTools(comp, stateUID)
 
 
 
@@ -3613,6 +3994,9 @@ path = r\"%s\"
 		self.sm_checkCorrectComp(comp, displaypopup=False)
 		#Set the comp used when sm was opened for reference when saving states.
 		self.comp = comp	
+		#	Rebuild the Tool Index and State data for this Comp on the next lookup
+		Fus.invalidateToolIndex()
+		Fus.invalidateStateStore()
 		try:
 			self.popup.close()
 		except:
@@ -3695,6 +4079,9 @@ path = r\"%s\"
 
 		self.MP_stateManager = origin
 
+		#	Coalesces the State saves into one write per event loop tick
+		self.stateSaveScheduler = StateSaveScheduler(origin.saveStatesToScene, origin.saveImports)
+
 		
 		# Add MenuItems
 		origin.actionSortImageLoaders = QAction(origin)
@@ -3710,6 +4097,33 @@ path = r\"%s\"
 		origin.menuAbout.addSeparator()
 		origin.menuAbout.addAction(origin.actionSortImageLoaders)
 		origin.menuAbout.addAction(origin.actionSelectImageLoaders)
+		#	Benchmark is only shown in debug mode
+		if getattr(self.core, "debugMode", False):
+			origin.actionRunBenchmark = QAction(origin)
+			origin.actionRunBenchmark.setObjectName(u"actionRunBenchmark")
+			origin.actionRunBenchmark.setText(QCoreApplication.translate("mw_StateManager", u"Run Benchmark", None))
+			origin.actionRunBenchmark.triggered.connect(lambda: self.runBenchmark())
+			origin.menuAbout.addAction(origin.actionRunBenchmark)
+			origin.actionRunMockBenchmark = QAction(origin)
+			origin.actionRunMockBenchmark.setObjectName(u"actionRunMockBenchmark")
+			origin.actionRunMockBenchmark.setText(QCoreApplication.translate("mw_StateManager", u"Run Mock Benchmark", None))
+			origin.actionRunMockBenchmark.triggered.connect(lambda: self.runMockBenchmark())
+			origin.menuAbout.addAction(origin.actionRunMockBenchmark)
+		#	Profiler actions are only shown if profiling was enabled at startup
+		if Profiler.isProfilerArmed():
+			origin.actionSaveProfile = QAction(origin)
+			origin.actionSaveProfile.setObjectName(u"actionSaveProfile")
+			origin.actionSaveProfile.setText(QCoreApplication.translate("mw_StateManager", u"Save Profile", None))
+			origin.actionSaveProfile.setShortcut(QKeySequence("Ctrl+Shift+P"))
+			origin.actionSaveProfile.triggered.connect(self.saveProfile)
+			origin.menuAbout.addAction(origin.actionSaveProfile)
+		#	Fusion call report is only shown if call counting was enabled at startup
+		if ApiCalls.isEnabled():
+			origin.actionSaveCallReport = QAction(origin)
+			origin.actionSaveCallReport.setObjectName(u"actionSaveCallReport")
+			origin.actionSaveCallReport.setText(QCoreApplication.translate("mw_StateManager", u"Save Fusion Call Report", None))
+			origin.actionSaveCallReport.triggered.connect(self.saveCallReport)
+			origin.menuAbout.addAction(origin.actionSaveCallReport)
 		origin.menuAbout.addSeparator()
 		##
 
@@ -3722,6 +4136,8 @@ path = r\"%s\"
 			self.core.plugins.monkeyPatch(origin.shotCam, self.shotCam, self, force=True)
 			self.core.plugins.monkeyPatch(origin.showStateMenu, self.showStateMenu, self, force=True)
 			self.core.plugins.monkeyPatch(origin.pasteStates, self.pasteStates, self, force=True)
+			self.core.plugins.monkeyPatch(origin.saveStatesToScene, self.saveStatesToScene, self, force=True)
+			self.core.plugins.monkeyPatch(origin.saveImports, self.saveImports, self, force=True)
 		except Exception as e:
 			logger.warning(f"ERROR: Failed to load patched functions:\n{e}")
 
@@ -3767,6 +4183,8 @@ path = r\"%s\"
 
 	@err_catcher(name=__name__)
 	def onStateManagerClose(self, origin):
+		self.flushStateSaves()
+		self.unwatchAllMedia()
 		self.smUI = None
 
 
@@ -4188,17 +4606,19 @@ path = r\"%s\"
 
 		passes = [
 			x
-			for x in os.listdir(sourceFolder)
+			for x in Cache.listDir(sourceFolder, dirsOnly=True)	#	changed to use the cached directory index
 			if x[-5:] not in ["(mp4)", "(jpg)", "(png)"]
 			and not x.startswith("_")  				#	added exclude folders starting with "_" like _thumbs
-			and os.path.isdir(os.path.join(sourceFolder, x))
 		]
 		sourceData = []
 
+		#	Scan the pass directories in parallel
+		Cache.prefetchDirs([os.path.join(sourceFolder, x) for x in passes])
+
 		for curPass in passes:
 			curPassPath = os.path.join(sourceFolder, curPass)
 
-			imgs = os.listdir(curPassPath)
+			imgs = Cache.listDir(curPassPath)
 			if len(imgs) == 0:
 				continue
 
@@ -4242,6 +4662,18 @@ path = r\"%s\"
 	# 	self.onMediaBrowserTaskUpdate(mediabrowser)
 
 
+	#	Marks the States as dirty.  They are written once at the end of the event loop tick
+	@err_catcher(name=__name__)
+	def saveStatesToScene(self, *args, **kwargs):
+		self.stateSaveScheduler.requestSaveStates(*args, **kwargs)
+
+
+	#	Marks the Imports as dirty.  They are written once at the end of the event loop tick
+	@err_catcher(name=__name__)
+	def saveImports(self, *args, **kwargs):
+		self.stateSaveScheduler.requestSaveImports(*args, **kwargs)
+
+
 	#	This imports shotcams as a legacy
 	@err_catcher(name=__name__)
 	def shotCam(self):
@@ -4354,6 +4786,240 @@ class ImageImportDialogue(QDialog):
 		self.accept()  # Close the dialog
 
 
+#	Watches the media version folders of import states and calls the
+#	registered callbacks when they change.  QFileSystemWatcher uses the native
+#	notifications (inotify on Linux), and the folders are also polled for
+#	network shares that do not send notifications.
+class MediaWatcher(QObject):
+	POLL_INTERVAL = 10000
+	DEBOUNCE_INTERVAL = 1000
+
+	def __init__(self, parent=None):
+		super().__init__(parent)
+
+		#	{owner: {"dirs": set, "callback": WeakMethod}}.  Owners are held weakly
+		#	so States deleted without unwatching are dropped.
+		self.owners = weakref.WeakKeyDictionary()
+		#	{dirPath: mtime}
+		self.dirMtimes = {}
+		self.changedDirs = set()
+
+		self.fsWatcher = QFileSystemWatcher(self)
+		self.fsWatcher.directoryChanged.connect(self._onDirChanged)
+
+		self.debounceTimer = QTimer(self)
+		self.debounceTimer.setSingleShot(True)
+		self.debounceTimer.setInterval(self.DEBOUNCE_INTERVAL)
+		self.debounceTimer.timeout.connect(self._emitChanges)
+
+		self.pollTimer = QTimer(self)
+		self.pollTimer.setInterval(self.POLL_INTERVAL)
+		self.pollTimer.timeout.connect(self._poll)
+
+
+	#	Watches the dirs for the owner and calls callback(changedDirs) on changes.
+	#	The callback has to be a method of the owner.
+	def watch(self, owner, dirPaths, callback):
+		dirs = set(os.path.normpath(d) for d in dirPaths if d and os.path.isdir(d))
+		self.owners[owner] = {"dirs": dirs, "callback": weakref.WeakMethod(callback)}
+		self._updateWatchedDirs()
+
+		return bool(dirs)
+
+
+	def isWatching(self, owner):
+		return owner in self.owners
+
+
+	def unwatch(self, owner):
+		if self.owners.pop(owner, None):
+			self._updateWatchedDirs()
+
+
+	def unwatchAll(self):
+		self.owners.clear()
+		self._updateWatchedDirs()
+
+
+	def _updateWatchedDirs(self):
+		allDirs = set()
+		for ownerData in self.owners.values():
+			allDirs.update(ownerData["dirs"])
+
+		removed = [d for d in self.dirMtimes if d not in allDirs]
+		added = [d for d in allDirs if d not in self.dirMtimes]
+
+		if removed:
+			self.fsWatcher.removePaths(removed)
+			for dirPath in removed:
+				del self.dirMtimes[dirPath]
+
+		if added:
+			for dirPath in added:
+				self.dirMtimes[dirPath] = self._getMtime(dirPath)
+			self.fsWatcher.addPaths(added)
+
+		if self.dirMtimes and not self.pollTimer.isActive():
+			self.pollTimer.start()
+		elif not self.dirMtimes:
+			self.pollTimer.stop()
+
+
+	def _getMtime(self, dirPath):
+		try:
+			return os.stat(dirPath).st_mtime_ns
+		except OSError:
+			return None
+
+
+	def _onDirChanged(self, dirPath):
+		self.changedDirs.add(os.path.normpath(dirPath))
+		self.debounceTimer.start()
+
+
+	def _poll(self):
+		#	Stop watching the dirs of collected owners
+		self._updateWatchedDirs()
+
+		for dirPath, mtime in list(self.dirMtimes.items()):
+			if self._getMtime(dirPath) != mtime:
+				self.changedDirs.add(dirPath)
+
+		if self.changedDirs and not self.debounceTimer.isActive():
+			self.debounceTimer.start()
+
+
+	def _emitChanges(self):
+		changedDirs = self.changedDirs
+		self.changedDirs = set()
+
+		for dirPath in changedDirs:
+			if dirPath in self.dirMtimes:
+				self.dirMtimes[dirPath] = self._getMtime(dirPath)
+
+		dropped = False
+
+		for owner, ownerData in list(self.owners.items()):
+			ownerChanged = ownerData["dirs"] & changedDirs
+			if not ownerChanged:
+				continue
+
+			callback = ownerData["callback"]()
+			if callback is None:
+				self.owners.pop(owner, None)
+				dropped = True
+				continue
+
+			try:
+				callback(ownerChanged)
+			except RuntimeError:
+				#	State UI was deleted without unwatching
+				self.owners.pop(owner, None)
+				dropped = True
+			except Exception as e:
+				logger.warning(f"ERROR: Media watcher callback failed:\n{e}")
+
+		if dropped:
+			self._updateWatchedDirs()
+
+
+#	Coalesces the State Manager saves.  saveStatesToScene() and saveImports()
+#	only mark the data as dirty, and the original functions are called once when
+#	control returns to the event loop, or when the outermost batch() exits.
+class StateSaveScheduler(QObject):
+	def __init__(self, saveStatesFunc, saveImportsFunc, parent=None):
+		super().__init__(parent)
+
+		self.saveStatesFunc = saveStatesFunc
+		self.saveImportsFunc = saveImportsFunc
+
+		#	(args, kwargs) of the last pending request
+		self.dirtyStates = None
+		self.dirtyImports = None
+		self.batchDepth = 0
+		self.flushing = False
+
+		self.stats = {"requests": 0, "saves": 0, "avoided": 0}
+
+		self.flushTimer = QTimer(self)
+		self.flushTimer.setSingleShot(True)
+		self.flushTimer.setInterval(0)
+		self.flushTimer.timeout.connect(self.flush)
+
+
+	def requestSaveStates(self, *args, **kwargs):
+		self._countRequest(self.dirtyStates)
+		self.dirtyStates = (args, kwargs)
+		self._schedule()
+
+
+	def requestSaveImports(self, *args, **kwargs):
+		self._countRequest(self.dirtyImports)
+		self.dirtyImports = (args, kwargs)
+		self._schedule()
+
+
+	#	A request is avoided if the same save is already pending
+	def _countRequest(self, pending):
+		self.stats["requests"] += 1
+		if pending:
+			self.stats["avoided"] += 1
+
+
+	def _schedule(self):
+		if self.batchDepth == 0 and not self.flushTimer.isActive():
+			self.flushTimer.start()
+
+
+	def flush(self):
+		#	Saves requested while writing are handled by the next flush
+		if self.flushing:
+			return
+
+		self.flushTimer.stop()
+
+		dirtyImports = self.dirtyImports
+		dirtyStates = self.dirtyStates
+		self.dirtyImports = None
+		self.dirtyStates = None
+
+		if not dirtyImports and not dirtyStates:
+			return
+
+		self.flushing = True
+		try:
+			if dirtyImports:
+				self.stats["saves"] += 1
+				self.saveImportsFunc(*dirtyImports[0], **dirtyImports[1])
+
+			if dirtyStates:
+				self.stats["saves"] += 1
+				self.saveStatesFunc(*dirtyStates[0], **dirtyStates[1])
+
+		except RuntimeError:
+			#	State Manager was deleted
+			pass
+		except Exception as e:
+			logger.warning(f"ERROR: Unable to save the States to the Comp:\n{e}")
+		finally:
+			self.flushing = False
+
+		logger.debug(f"State saves:  {self.stats['requests']} requested, "
+					 f"{self.stats['saves']} written, {self.stats['avoided']} avoided")
+
+
+	#	Holds the saves until the outermost batch exits
+	@contextlib.contextmanager
+	def batch(self):
+		self.batchDepth += 1
+		try:
+			yield self
+		finally:
+			self.batchDepth -= 1
+			if self.batchDepth == 0:
+				self.flush()
+
+
 # #	Popup for update message
 # class UpdateDialog(QDialog):
 #     def __init__(self, updateMsgList, parent=None):
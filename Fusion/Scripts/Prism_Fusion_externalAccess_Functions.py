@@ -144,6 +144,12 @@ class Prism_Fusion_externalAccess_Functions(object):
 		origin.cb_thumbSize.addItems(["Small (300 px)", "Medium (600 px)", "Large (900 px)"])
 		origin.cb_thumbSize.setCurrentIndex(1)  # Default to Medium
 
+		##	Thumbnail Threads
+		origin.l_thumbThreads = QLabel("Thumbnail Threads:       ")
+		origin.cb_thumbThreads = QComboBox()
+		origin.cb_thumbThreads.addItems(["Auto", "1", "2", "4", "8"])
+		origin.cb_thumbThreads.setCurrentIndex(0)  # Default to Auto
+
 		#	Add Items to Options 2
 		lo_options2.addWidget(origin.l_taskColoring)
 		lo_options2.addWidget(origin.cb_taskColoring)
@@ -151,6 +157,8 @@ class Prism_Fusion_externalAccess_Functions(object):
 		lo_options2.addItem(spacer3)
 		lo_options2.addWidget(origin.l_thumbSize)
 		lo_options2.addWidget(origin.cb_thumbSize)
+		lo_options2.addWidget(origin.l_thumbThreads)
+		lo_options2.addWidget(origin.cb_thumbThreads)
 		spacer4 = QSpacerItem(40, 20, QSizePolicy.Fixed, QSizePolicy.Minimum)
 		lo_options2.addItem(spacer4)
 
@@ -207,11 +215,28 @@ class Prism_Fusion_externalAccess_Functions(object):
 		lo_options4.addItem(spacer8)
 
 
+		####	OPTIONS 5 LAYOUT
+		lo_options5 = QHBoxLayout()
+
+		#	Local Render Processes
+		origin.l_renderProcesses = QLabel("Local Render Processes:   ")
+		origin.cb_renderProcesses = QComboBox()
+		origin.cb_renderProcesses.addItems(["Disabled", "Auto", "1", "2", "4", "8"])
+		origin.cb_renderProcesses.setCurrentIndex(0)  # Default to Disabled
+
+		#	Add Items to Options 5
+		lo_options5.addWidget(origin.l_renderProcesses)
+		lo_options5.addWidget(origin.cb_renderProcesses)
+		spacer9 = QSpacerItem(40, 20, QSizePolicy.Expanding, QSizePolicy.Minimum)
+		lo_options5.addItem(spacer9)
+
+
 		####	Add All the Option Layouts to the Main Options Layout
 		lo_prismFusionOptions.addLayout(lo_options1)
 		lo_prismFusionOptions.addLayout(lo_options2)
 		lo_prismFusionOptions.addLayout(lo_options3)
 		lo_prismFusionOptions.addLayout(lo_options4)
+		lo_prismFusionOptions.addLayout(lo_options5)
 
 
 		#	Install Dev menu
@@ -256,6 +281,11 @@ class Prism_Fusion_externalAccess_Functions(object):
 		origin.l_thumbSize.setToolTip(tip)
 		origin.cb_thumbSize.setToolTip(tip)
 
+		tip = ("Maximum number of thumbnails generated at the same time.\n\n"
+		 	   "Auto:      uses half of the available CPU threads.")
+		origin.l_thumbThreads.setToolTip(tip)
+		origin.cb_thumbThreads.setToolTip(tip)
+
 		tip = ("Sets the Loader Sorting mode:\n\n"
 		 	   "Sorting & Wireless:   Will add a set of Wireless tools to the Loader and sort all Loaders.\n"
 			   "Sorting Only:             Will only add the Loader and sort all Loaders\n"
@@ -287,6 +317,17 @@ class Prism_Fusion_externalAccess_Functions(object):
 		origin.cb_combineCrypto.setToolTip(tip)
 
 
+		tip = ("Number of render processes used for Local renders.\n\n"
+		 	   "Image sequences are split into frame chunks and rendered at the same time\n"
+			   "by separate Fusion Render Node processes.  Movies are rendered whole.\n"
+			   "Completed frames are recorded, so a render that was interrupted only\n"
+			   "renders the missing frames when started again with the same comp.\n\n"
+			   "Disabled:    renders in this Fusion session\n"
+			   "Auto:          uses one process for every 16 CPU threads (minimum 2)")
+		origin.l_renderProcesses.setToolTip(tip)
+		origin.cb_renderProcesses.setToolTip(tip)
+
+
 		# tip = "Install Prism Development menu to Fusion when adding the integration."
 		# origin.l_installDevTools.setToolTip(tip)
 		# origin.chk_installDevTools.setToolTip(tip)
@@ -319,10 +360,12 @@ class Prism_Fusion_externalAccess_Functions(object):
 			settings["Fusion"]["taskColorMode"] = origin.cb_taskColoring.currentText()
 			settings["Fusion"]["useAovThumbs"] = origin.cb_useAovThumbs.currentText()
 			settings["Fusion"]["thumbsSize"] = origin.cb_thumbSize.currentText()
+			settings["Fusion"]["thumbThreads"] = origin.cb_thumbThreads.currentText()
 			settings["Fusion"]["sorting"] = origin.cb_sorting.currentText()
 			settings["Fusion"]["updatePopup"] = origin.cb_updatePopup.currentText()
 			settings["Fusion"]["scanComp"] = origin.cb_scanComp.currentText()
 			settings["Fusion"]["combineCrypto"] = origin.cb_combineCrypto.currentText()
+			settings["Fusion"]["renderProcesses"] = origin.cb_renderProcesses.currentText()
 
 
 		except Exception as e:
@@ -384,6 +427,14 @@ class Prism_Fusion_externalAccess_Functions(object):
 				else:
 					origin.cb_thumbSize.setCurrentIndex(1)		#	Defaults to Medium
 
+				#	Sets Thumbnail Threads
+				if "thumbThreads" in settings["Fusion"]:
+					idx = origin.cb_thumbThreads.findText(settings["Fusion"]["thumbThreads"])
+					if idx != -1:
+						origin.cb_thumbThreads.setCurrentIndex(idx)
+				else:
+					origin.cb_thumbThreads.setCurrentIndex(0)		#	Defaults to Auto
+
 				#	Sets Sorting Mode
 				if "sorting" in settings["Fusion"]:
 					idx = origin.cb_sorting.findText(settings["Fusion"]["sorting"])
@@ -416,6 +467,14 @@ class Prism_Fusion_externalAccess_Functions(object):
 				else:
 					origin.cb_combineCrypto.setCurrentIndex(1)		#	Defaults to Prompt
 
+				#	Sets Local Render Processes
+				if "renderProcesses" in settings["Fusion"]:
+					idx = origin.cb_renderProcesses.findText(settings["Fusion"]["renderProcesses"])
+					if idx != -1:
+						origin.cb_renderProcesses.setCurrentIndex(idx)
+				else:
+					origin.cb_renderProcesses.setCurrentIndex(0)		#	Defaults to Disabled
+
 				self.configAovThumbUi(origin)
 
 		except Exception as e:
@@ -432,6 +491,8 @@ class Prism_Fusion_externalAccess_Functions(object):
 		
 		origin.l_thumbSize.setEnabled(isEnabled)
 		origin.cb_thumbSize.setEnabled(isEnabled)
+		origin.l_thumbThreads.setEnabled(isEnabled)
+		origin.cb_thumbThreads.setEnabled(isEnabled)
 
 
 	@err_catcher(name=__name__)
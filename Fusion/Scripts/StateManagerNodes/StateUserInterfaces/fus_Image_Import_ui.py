@@ -18,7 +18,7 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
 from PySide6.QtWidgets import (QAbstractItemView, QApplication, QCheckBox, QComboBox,
     QGroupBox, QHBoxLayout, QHeaderView, QLabel,
     QLineEdit, QPushButton, QSizePolicy, QSpacerItem,
-    QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget)
+    QTreeView, QVBoxLayout, QWidget)
 
 class Ui_wg_Image_Import(object):
     def setupUi(self, wg_Image_Import):
@@ -232,14 +232,12 @@ class Ui_wg_Image_Import(object):
         self.verticalLayout_4 = QVBoxLayout(self.gb_channels)
         self.verticalLayout_4.setObjectName(u"verticalLayout_4")
         self.verticalLayout_4.setContentsMargins(9, 9, 9, 9)
-        self.lw_objects = QTreeWidget(self.gb_channels)
-        __qtreewidgetitem = QTreeWidgetItem()
-        __qtreewidgetitem.setText(0, u"1");
-        self.lw_objects.setHeaderItem(__qtreewidgetitem)
+        self.lw_objects = QTreeView(self.gb_channels)
         self.lw_objects.setObjectName(u"lw_objects")
         self.lw_objects.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
         self.lw_objects.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerItem)
         self.lw_objects.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerItem)
+        self.lw_objects.setUniformRowHeights(True)
 
         self.verticalLayout_4.addWidget(self.lw_objects)
 
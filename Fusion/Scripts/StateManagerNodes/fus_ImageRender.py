@@ -57,10 +57,11 @@ from qtpy.QtCore import *
 from qtpy.QtGui import *
 from qtpy.QtWidgets import *
 
-from PrismUtils.Decorators import err_catcher
+from Libs.Prism_Fusion_lib_Profiler import err_catcher
 
 import Libs.Prism_Fusion_lib_Fus as Fus
 import Libs.Prism_Fusion_lib_Helper as Helper
+import Libs.Prism_Fusion_lib_Cache as Cache
 
 from typing import TYPE_CHECKING, Union, Dict, Any, Tuple
 if TYPE_CHECKING:
@@ -1326,7 +1327,7 @@ class ImageRenderClass(object):
 		location = stateUI.cb_outPath.currentText()
 
 		try:
-			outputPathData = stateUI.core.mediaProducts.generateMediaProductPath(
+			outputPathData = self.fuseFuncs.generateMediaProductPath(
 				entity=context,
 				task=task,
 				extension=extension,
@@ -1396,6 +1397,8 @@ class ImageRenderClass(object):
 
 			if not os.path.exists(os.path.dirname(outputPath)):
 				os.makedirs(os.path.dirname(outputPath))
+			#	A new version was created for the product
+			Cache.invalidateMediaVersions(outputPath)
 
 			details = context.copy()
 			if "filename" in details:
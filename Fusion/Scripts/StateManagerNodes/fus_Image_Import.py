@@ -48,20 +48,22 @@
 
 
 import os
-import sys
 import logging
 import re
-import subprocess
 import inspect
+from collections import OrderedDict
 
 from qtpy.QtCore import *
 from qtpy.QtGui import *
 from qtpy.QtWidgets import *
 
-from PrismUtils.Decorators import err_catcher
+from Libs.Prism_Fusion_lib_Profiler import err_catcher
 
 import Libs.Prism_Fusion_lib_Fus as Fus
 import Libs.Prism_Fusion_lib_Helper as Helper
+import Libs.Prism_Fusion_lib_Cache as Cache
+import Libs.Prism_Fusion_lib_Image as Image
+import Libs.Prism_Fusion_lib_Video as Video
 
 from typing import TYPE_CHECKING, Union, Dict, Any, Tuple
 if TYPE_CHECKING:
@@ -110,6 +112,8 @@ STATE_ICON = os.path.join(scriptDir, "Icons", "Image.png")
 ITEM_ROLE_DATA = Qt.UserRole + 1
 ITEM_ROLE_COLOR = Qt.UserRole + 2
 ITEM_ROLE_CHECKBOX = Qt.UserRole + 3
+ITEM_ROLE_THUMB = Qt.UserRole + 4
+ITEM_ROLE_STATUS = Qt.UserRole + 5
 
 
 class Image_ImportClass(object):
@@ -143,6 +147,21 @@ class Image_ImportClass(object):
         self.setName = ""
         self.stateStaus = None
         self.aovStatus = None
+        #   Version folders watched for changes and the cached latest version
+        self.watchedDirs = None
+        self.latestVersionCache = None
+        #   Item of the showing AOV tooltip and its thumbnail bytes
+        self.toolTipItem = None
+        self.toolTipThumb = None
+        #   File signatures read since the last AOV tree refresh:  {filePath: signature}
+        self.fileSignatures = {}
+        #   Running sequence checks
+        self.seqCheckJobs = []
+        self.seqCheckGeneration = 0
+        #   Running and finished video duration probes
+        self.videoProbeJobs = []
+        self.videoProbeResults = []
+        self.videoProbeGeneration = 0
 
         #   Gets color mode from DCC settings
         self.taskColorMode = self.fuseFuncts.taskColorMode
@@ -186,6 +205,8 @@ class Image_ImportClass(object):
         font.setBold(True)
         self.l_latestVersion.setFont(font)
 
+        self.setupAovTree()
+
 
     ####   Do one of the following:     ####
 
@@ -291,9 +312,14 @@ class Image_ImportClass(object):
         self.cb_taskColor.currentIndexChanged.connect(lambda: self.setToolColor(self.cb_taskColor.currentText()))
         self.b_focusView.clicked.connect(self.focusView)
         self.b_selectTools.clicked.connect(self.selectTools)
-        self.lw_objects.itemPressed.connect(self.onAovItemClicked)                              #   When AOV item clicked
-        self.lw_objects.itemCollapsed.connect(self.onItemCollapsed)                             # Recursivelly Collapse children
-        self.lw_objects.itemCollapsed.connect(self.onItemExpanded)                              # Recursivelly Expand children
+        self.lw_objects.pressed.connect(self.onAovItemClicked)                                  #   When AOV item clicked
+        self.lw_objects.collapsed.connect(self.onItemCollapsed)                                 # Recursivelly Collapse children
+        self.lw_objects.collapsed.connect(self.onItemExpanded)                                  # Recursivelly Expand children
+
+        #   More rows and thumbnails are loaded when scrolled into view
+        self.thumbScrollTimer.timeout.connect(self.onAovTreeScrolled)
+        self.lw_objects.verticalScrollBar().valueChanged.connect(self.thumbScrollTimer.start)
+        self.lw_objects.expanded.connect(self.thumbScrollTimer.start)
         self.b_browse.clicked.connect(lambda: self.browse(setChecked=True))                     #   Select Version Button
         self.b_browse.customContextMenuRequested.connect(self.openFolder)                       #   RCL Select Version Button
         self.b_importLatest.clicked.connect(lambda: self.importLatest(refreshUi=True,
@@ -395,6 +421,11 @@ class Image_ImportClass(object):
     #   Returns a list of channels/AOVs for a given filepth
     @err_catcher(name=__name__)
     def getLayersFromFile(self, filepath:str) -> list:
+        #   Read the layers from the EXR header, fallback to Prism
+        layers = Image.getExrLayers(filepath)
+        if layers is not None:
+            return layers
+
         try:
             return self.fuseFuncts.core.media.getLayersFromFile(filepath)
         except Exception as e:
@@ -433,72 +464,105 @@ class Image_ImportClass(object):
 
     #   Returns the Number of frames for a given video filepath
     @err_catcher(name=__name__)
-    def getVideoDuration(self, filepath:str) -> int:
+    def getVideoDuration(self, filePath:str) -> int:
+        return self.getVideoDurations([filePath]).get(filePath)
+
+
+    #   Returns the Number of frames for a list of video files as {filePath: frames}
+    #   Results are cached and the files are probed in parallel.  This blocks,
+    #   so the import uses probeVideoDurations() instead.
+    @err_catcher(name=__name__)
+    def getVideoDurations(self, filePaths:list) -> dict:
         try:
-            return self.getVideoDuration(filepath)
+            ffprobePath = os.path.normpath(self.getFFprobePath())
+            return Video.getVideoDurations(filePaths, ffprobePath)
         except Exception as e:
             logger.warning(f"ERROR:  Unable to get Video Duration from FFprobe:\n\n{e}")
+            return {}
 
 
-    #   Returns FFprobe Path
+    #   Probes the durations of the videos {filePath: [basefile]} in the
+    #   background.  The ranges are set when all probes are finished.
     @err_catcher(name=__name__)
-    def getFFprobePath(self):
-        module_file = inspect.getfile(self.fuseFuncts.__class__)
-        pluginDir = os.path.dirname(os.path.abspath(module_file))       
+    def probeVideoDurations(self, videoFiles:dict):
+        self.videoProbeGeneration += 1
+        self.videoProbeResults = []
 
-        return os.path.join(pluginDir, "thirdparty", "ffmpeg", "ffprobe.exe")
+        if not videoFiles:
+            return
 
+        try:
+            ffprobePath = os.path.normpath(self.getFFprobePath())
+        except Exception as e:
+            logger.warning(f"ERROR:  Unable to get FFprobe path:\n{e}")
+            ffprobePath = None
 
+        for filePath, basefiles in videoFiles.items():
+            job = VideoProbeJob(self.videoProbeGeneration, filePath, basefiles, ffprobePath)
+            job.signals.finished.connect(self.onVideoProbed)
+            self.videoProbeJobs.append(job)
+            getVideoProbePool().start(job)
+
+
+    #   Collects the probe results and sets the video ranges once the last
+    #   probe of the import is finished
     @err_catcher(name=__name__)
-    def getVideoDuration(self, filePath):
-        ffprobePath = os.path.normpath(self.getFFprobePath())
+    def onVideoProbed(self, job):
+        if job in self.videoProbeJobs:
+            self.videoProbeJobs.remove(job)
 
-        kwargs = {
-            "stdout": subprocess.PIPE,
-            "stderr": subprocess.PIPE,
-            "text":   True,
-        }
+        #   Import data was replaced by a later import
+        if job.generation != self.videoProbeGeneration:
+            return
 
-        if sys.platform == "win32":
-            kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
-
-        #   Execute Quick Method
-        result = subprocess.run(
-            [
-                ffprobePath,
-                "-v", "error",
-                "-select_streams", "v:0",
-                "-show_entries", "stream=nb_frames",
-                "-of", "default=nokey=1:noprint_wrappers=1",
-                filePath
-            ],
-            **kwargs
-        )
-
-        #   Get Frames from Output
-        frames = result.stdout.strip()
-
-        #   If Quick Method didnt work, try Slower Fallback Method
-        if frames == 'N/A' or not frames.isdigit():
-            result = subprocess.run(
-                [
-                    ffprobePath,
-                    "-v", "error",
-                    "-select_streams", "v:0",
-                    "-count_frames",
-                    "-show_entries", "stream=nb_read_frames",
-                    "-of", "default=nokey=1:noprint_wrappers=1",
-                    filePath
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+        #   A failed probe leaves the range unknown
+        if job.frames:
+            self.videoProbeResults.append(job)
+        else:
+            logger.debug(f"Unknown duration of {job.filePath}")
+
+        if any(j.generation == job.generation for j in self.videoProbeJobs):
+            return
+
+        results = self.videoProbeResults
+        self.videoProbeResults = []
+        if results:
+            self.setVideoRanges({basefile: result.frames for result in results for basefile in result.basefiles})
 
-            frames = result.stdout.strip() 
 
+    #   Sets the last frame of the videos {basefile: frames} that had an
+    #   unknown range in the import data and the Loaders of the State
+    @err_catcher(name=__name__)
+    def setVideoRanges(self, videoFrames:dict):
+        for fileData in self.importData.get("files", []):
+            if fileData.get("frame_end") is None and fileData["basefile"] in videoFrames:
+                fileData["frame_end"] = fileData["frame_start"] + videoFrames[fileData["basefile"]] - 1
 
-        return int(frames)
+        comp = self.fuseFuncts.getCurrentComp()
+        with Fus.compTransaction(comp, "Set Video Ranges"):
+            for tool in Fus.getToolsFromStateUIDs(comp, self.stateUID):
+                toolData = Fus.getToolData(tool)
+                if not toolData or toolData.get("frame_end") is not None:
+                    continue
+                if toolData.get("filepath") not in videoFrames:
+                    continue
+
+                frameStart = toolData.get("frame_start", 1)
+                frameEnd = frameStart + videoFrames[toolData["filepath"]] - 1
+                Fus.setClipRange(tool, frameStart, frameEnd)
+                Fus.updateToolData(tool, {"frame_end": frameEnd})
+
+        self.updateAovChnlTree()
+        self.stateManager.saveStatesToScene()
+
+
+    #   Returns FFprobe Path
+    @err_catcher(name=__name__)
+    def getFFprobePath(self):
+        module_file = inspect.getfile(self.fuseFuncts.__class__)
+        pluginDir = os.path.dirname(os.path.abspath(module_file))       
+
+        return os.path.join(pluginDir, "thirdparty", "ffmpeg", "ffprobe.exe")
     
     ########      ^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^     ##########
     ##################################################################
@@ -914,171 +978,270 @@ class Image_ImportClass(object):
             logger.warning(f"ERROR:  Unable to Load Color Combobox Colors:\n\n{e}")
 
 
-    #   Populates the AOV tree and adds file data to each item
+    #   Sets the AOV tree view up with the model and the thumbnail delegate
     @err_catcher(name=__name__)
-    def updateAovChnlTree(self):
+    def setupAovTree(self):
+        if isinstance(self.lw_objects.model(), AovTreeModel):
+            return
+
         #   Setup UI
         self.lw_objects.setHeaderHidden(True)
         self.lw_objects.setMinimumHeight(350)
 
-        #   Clear the list
-        self.lw_objects.clear()
-        #   Initialize the status icon
-        self.lw_objects.setItemDelegate(statusColorDelegate(self.lw_objects))
-        
-        # Create a root item
-        root_item = QTreeWidgetItem(self.lw_objects)
-        root_item.setText(0, f"{self.importData['identifier']}_{self.importData['version']}")
-        root_item.setExpanded(True)  # Expand the root item
+        #   Items are only exposed to the view as they are scrolled into view
+        self.aovTreeModel = AovTreeModel(self.lw_objects)
+        self.lw_objects.setModel(self.aovTreeModel)
+        self.aovTreeModel.rowsInserted.connect(self.onAovRowsInserted)
+
+        #   Second column shows the sequence check status
+        self.lw_objects.header().setStretchLastSection(False)
+        self.lw_objects.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.lw_objects.header().setSectionResizeMode(1, QHeaderView.ResizeToContents)
 
-        #   Add checkbox actions to item
-        self.setupAovActions(root_item)
+        #   Draws the status icon and the cached thumbnails
+        self.lw_objects.setItemDelegate(AovItemDelegate(self.lw_objects))
+
+        #   AOV tooltips are built on demand
+        self.aovToolTipFilter = AovToolTipFilter(self.onAovToolTipEvent, self.lw_objects)
+        self.lw_objects.viewport().installEventFilter(self.aovToolTipFilter)
+
+        self.thumbScrollTimer = QTimer(self.lw_objects)
+        self.thumbScrollTimer.setSingleShot(True)
+        self.thumbScrollTimer.setInterval(150)
+
+        #   New rows are expanded after the view has laid them out
+        self.pendingExpand = []
+        self.expandTimer = QTimer(self.lw_objects)
+        self.expandTimer.setSingleShot(True)
+        self.expandTimer.setInterval(0)
+        self.expandTimer.timeout.connect(self.expandPendingRows)
+
+
+    #   Populates the AOV tree and adds file data to each item
+    @err_catcher(name=__name__)
+    def updateAovChnlTree(self):
+        #   Drop pending AOV thumbnails (items without a thumbnail are requested again)
+        self.getThumbService().cancel(self, group="aov")
+        #   Files are checked again once per refresh
+        self.fileSignatures = {}
 
-        # Dictionary to store file data
-        basefile_dict = {}
+        #   Rows keyed by AOV and channel:  {key: {"parent", "text", "data", "basefile"}}
+        rootKey = ("root",)
+        rows = {rootKey: {"parent": None, "text": f"{self.importData['identifier']}_{self.importData['version']}",
+                          "data": None, "basefile": None}}
+        basefiles = set()
 
         #   To capture if there are AOVs
         hasAOVs = False
 
         try:
-            # Organize files by basefile
+            # Organize files by AOV and channel
             for fileData in self.importData["files"]:
                 basefile = fileData["basefile"]
                 aov = fileData.get("aov", None)
                 channel = fileData["channel"]
-                frameRange = f"{fileData['frame_start']} - {fileData['frame_end']}"
+                frameEnd = fileData['frame_end'] if fileData['frame_end'] is not None else "?"
+                frameRange = f"{fileData['frame_start']} - {frameEnd}"
+                basefiles.add(basefile)
 
-                if basefile not in basefile_dict:
-                    basefile_dict[basefile] = {"aov_items": {}, "channels": [], "frameRange": frameRange}
-                
                 if aov:
-                    if aov not in basefile_dict[basefile]["aov_items"]:
-                        basefile_dict[basefile]["aov_items"][aov] = []
-                    basefile_dict[basefile]["aov_items"][aov].append(channel)
+                    hasAOVs = True
+                    parentKey = ("aov", aov)
+                    if parentKey not in rows:
+                        rows[parentKey] = {"parent": rootKey, "text": f"{aov}    (aov)    ({frameRange})",
+                                           "data": None, "basefile": basefile}
                 else:
-                    basefile_dict[basefile]["channels"].append(channel)
-                
+                    parentKey = rootKey
+
+                #   First file of a channel is used for the item
+                channelKey = ("channel", aov, channel)
+                if channelKey not in rows:
+                    rows[channelKey] = {"parent": parentKey, "text": f"{channel}    (channel)",
+                                        "data": fileData, "basefile": basefile}
+
         except Exception as e:
             logger.warning(f"ERROR:  Unable to Configure Files by Basefile:\n\n{e}")
             return
 
-        # Populate tree with grouped data
-        for basefile, data in basefile_dict.items():
-            try:
-                # Add AOVs if they exist
-                if data["aov_items"]:
-                    #   Set if has AOVs
-                    hasAOVs = True
-                    #   Itterate through each AOV
-                    for aov, channels in data["aov_items"].items():
-                        aov_item = QTreeWidgetItem(root_item)
-                        aov_item.setText(0, f"{aov}    (aov)    ({data['frameRange']})")
-                        aov_item.setExpanded(True)
-
-                        #   Add checkbox actions to item
-                        self.setupAovActions(aov_item)
-
-                        for channel in channels:
-                            channel_item = QTreeWidgetItem(aov_item)
-                            channel_item.setText(0, f"{channel}    (channel)")
-                            channel_item.setExpanded(True)
-
-                            # Find the corresponding fileData for this channel
-                            correct_fileData = next(
-                                (f for f in self.importData["files"]
-                                if f["basefile"] == basefile and f.get("aov") == aov and f["channel"] == channel),
-                                None
-                            )
-
-                            if correct_fileData:
-                                #   Store fileData in tree item
-                                self.setItemData(channel_item, correct_fileData)
-
-                            #   Add checkbox actions to item
-                            self.setupAovActions(channel_item)
-
-                # If no AOVs, list channels directly under the root
-                for channel in data["channels"]:
-                    channel_item = QTreeWidgetItem(root_item)
-                    channel_item.setText(0, f"{channel}    (channel)")
-                    channel_item.setExpanded(True)
-
-                    # Find the corresponding fileData for this channel
-                    correct_fileData = next(
-                        (f for f in self.importData["files"]
-                        if f["basefile"] == basefile and f["channel"] == channel),
-                        None
-                    )
+        #   If there are no AOVs, add framerange under the MediaID
+        if not hasAOVs and self.importData["files"]:
+            rows[rootKey]["text"] += f"    ({frameRange})"
+            if len(basefiles) == 1:
+                rows[rootKey]["basefile"] = basefile
 
-                    if correct_fileData:
-                        #   Store fileData in tree item
-                        self.setItemData(channel_item, correct_fileData)
+        self.lw_objects.setUpdatesEnabled(False)
+        try:
+            defaultsAdded = self.diffAovTreeItems(rows)
+        except Exception as e:
+            logger.warning(f"ERROR:  Failed to Populate AOV List:\n\n{e}")
+            return
+        finally:
+            self.lw_objects.setUpdatesEnabled(True)
 
-                    #   Add checkbox actions to item
-                    self.setupAovActions(channel_item)
+        #   Only the checked state given to new files has to be saved
+        if defaultsAdded:
+            self.stateManager.saveImports()
+            self.stateManager.saveStatesToScene()
 
-            except Exception as e:
-                logger.warning(f"ERROR:  Failed to Populate AOV List:\n\n{e}")
-                return
+        self.updateAovStatus()
 
-        #   If there are no AOVs, add framerange under the MediaID
-        if not hasAOVs:
-            root_item.setText(0, f"{self.importData['identifier']}_{self.importData['version']}    ({data['frameRange']})")
+        seqItems = [(self.aovTreeModel.items[key], row["basefile"])
+                    for key, row in rows.items()
+                    if row["data"] is None and row["basefile"]]
+        self.checkSequences(seqItems)
+
+
+    #   Updates the tree model to match the rows.  Unchanged items are kept with
+    #   their thumbnails, new items are added and missing ones removed.
+    #   Returns True if files were given a default checked state.
+    @err_catcher(name=__name__)
+    def diffAovTreeItems(self, rows):
+        items = self.aovTreeModel.setRows(rows)
+        parentItems = []
+        defaultsAdded = False
+
+        for key, row in rows.items():
+            item = items[key]
+
+            fileData = row["data"]
+            if fileData is not None:
+                oldData = self.getItemData(item)
+                if oldData is not fileData:
+                    #   Thumbnail is outdated if the file path changed (overwritten
+                    #   files are caught by the signature in getAovThumbParams)
+                    if not oldData or oldData.get("basefile") != fileData.get("basefile"):
+                        item.thumb = None
+                    self.setItemData(item, fileData)
+
+                if "stateChecked" not in fileData:
+                    fileData["stateChecked"] = "unchecked"
+                    defaultsAdded = True
+                self.applyItemChecked(item, fileData["stateChecked"])
+            else:
+                parentItems.append(item)
 
-        self.updateAovStatus()
+        #   Set the parent checkboxes from the children (deepest first)
+        for item in reversed(parentItems):
+            self.applyItemChecked(item, self.getParentChecked(item))
+
+        return defaultsAdded
 
 
-    #   Adds checkbox and checkbox selection behaviour
+    #   Checks the sequences for missing, empty and truncated frames in the background
     @err_catcher(name=__name__)
-    def setupAovActions(self, item):
-        # Make item checkable
-        item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
+    def checkSequences(self, seqItems):
+        self.seqCheckGeneration += 1
 
-        matchingData = self.getMatchingDataFromItem(item)
-        if matchingData:
-            checked = matchingData.get("stateChecked", None)
-            if checked:
-                self.setItemChecked(item, checked)
-            else:
-                self.setItemChecked(item, "unchecked")
-        else:
-            self.setItemChecked(item, "unchecked")
+        for item, basefile in seqItems:
+            dirPath, fileName = os.path.split(basefile)
+            if "#" not in fileName:
+                continue
 
-        self._updateParentCheckbox(item)
+            self.setItemSeqStatus(item, "checking...")
+
+            job = SequenceCheckJob(self.seqCheckGeneration, item, dirPath, fileName)
+            job.signals.finished.connect(self.onSequenceChecked)
+            self.seqCheckJobs.append(job)
+            getSeqCheckPool().start(job)
+
+
+    #   Shows the sequence check result on the item
+    @err_catcher(name=__name__)
+    def onSequenceChecked(self, job):
+        if job in self.seqCheckJobs:
+            self.seqCheckJobs.remove(job)
+
+        #   Item was removed by a later refresh
+        if job.generation != self.seqCheckGeneration:
+            return
+
+        result = job.result
+        if not result:
+            self.setItemSeqStatus(job.item, "")
+            return
+
+        issues = []
+        tips = [f"Frames on disk:  {result['count']}  ({result['first']} - {result['last']})"]
+
+        if result["missingCount"]:
+            issues.append(f"{result['missingCount']} missing")
+            ranges = [f"{a}" if a == b else f"{a}-{b}" for a, b in result["missing"]]
+            tips.append(f"Missing:  {', '.join(ranges)}")
+        if result["empty"]:
+            issues.append(f"{len(result['empty'])} empty")
+            tips.append(f"Zero-byte:  {', '.join(map(str, result['empty']))}")
+        if result["truncated"]:
+            issues.append(f"{len(result['truncated'])} truncated")
+            tips.append(f"Truncated:  {', '.join(map(str, result['truncated']))}")
+        if result["outliers"]:
+            issues.append(f"{len(result['outliers'])} small")
+            tips.append(f"Much smaller than the other frames:  {', '.join(map(str, result['outliers']))}")
+
+        if issues:
+            self.setItemSeqStatus(job.item, ", ".join(issues), "\n".join(tips), COLOR_ORANGE)
+        else:
+            self.setItemSeqStatus(job.item, "frames ok", "\n".join(tips))
 
 
     #   Adds Shift Collapse/Expand Behabiours
     @err_catcher(name=__name__)
-    def onItemCollapsed(self, item):
+    def onItemCollapsed(self, index):
         if QApplication.keyboardModifiers() == Qt.ShiftModifier:
-            self.recursivelyCollapse(item)
+            self.recursivelyCollapse(index)
 
             
     @err_catcher(name=__name__)
-    def onItemExpanded(self, item: QTreeWidgetItem):
+    def onItemExpanded(self, index: QModelIndex):
         if QApplication.keyboardModifiers() == Qt.ControlModifier:
-            self.recursivelyExpand(item)
+            self.recursivelyExpand(index)
 
 
     @err_catcher(name=__name__)
-    def recursivelyCollapse(self, item):
-        for i in range(item.childCount()):
-            child = item.child(i)
-            self.lw_objects.collapseItem(child)
+    def recursivelyCollapse(self, index):
+        for i in range(self.aovTreeModel.rowCount(index)):
+            child = self.aovTreeModel.index(i, 0, index)
+            self.lw_objects.collapse(child)
             self.recursivelyCollapse(child)
 
 
     @err_catcher(name=__name__)
-    def recursivelyExpand(self, item):
-        for i in range(item.childCount()):
-            child = item.child(i)
-            self.lw_objects.expandItem(child)
+    def recursivelyExpand(self, index):
+        for i in range(self.aovTreeModel.rowCount(index)):
+            child = self.aovTreeModel.index(i, 0, index)
+            self.lw_objects.expand(child)
             self.recursivelyExpand(child)
 
 
+    #   Expands new parent rows like the first build of the tree
+    @err_catcher(name=__name__)
+    def onAovRowsInserted(self, parentIndex, first, last):
+        for row in range(first, last + 1):
+            index = self.aovTreeModel.index(row, 0, parentIndex)
+            if self.aovTreeModel.hasChildren(index):
+                self.pendingExpand.append(QPersistentModelIndex(index))
+
+        #   Rows can be inserted while the view lays out, so expanding is deferred
+        if self.pendingExpand:
+            self.expandTimer.start()
+
+        #   Request the thumbnails of the new rows
+        self.thumbScrollTimer.start()
+
+
+    @err_catcher(name=__name__)
+    def expandPendingRows(self):
+        pending, self.pendingExpand = self.pendingExpand, []
+        for index in pending:
+            #   Lays the view out once for all the rows instead of for each expand
+            if index.isValid():
+                self.lw_objects.expandRecursively(QModelIndex(index), 0)
+
+
     #   Adds checkbox selection behaviours
     @err_catcher(name=__name__)
-    def onAovItemClicked(self, item, column):
+    def onAovItemClicked(self, index):
+        item = self.aovTreeModel.itemFromIndex(index)
+
         #   Get current checked state
         current_checked = self.getItemChecked(item)
         #   Reverse the checked state
@@ -1102,10 +1265,6 @@ class Image_ImportClass(object):
     @err_catcher(name=__name__)
     def onCheckboxStateChanged(self, item):
         checked = self.getItemChecked(item)
-        item.setData(0, ITEM_ROLE_CHECKBOX, checked)
-
-        # Temporarily block signals to avoid recursion
-        self.lw_objects.blockSignals(True)
 
         # Recursively apply the state to all child items
         self._toggleCheckbox(item, checked)
@@ -1113,9 +1272,6 @@ class Image_ImportClass(object):
         # Update the parent check state
         self._updateParentCheckbox(item)
 
-        # Re-enable signals
-        self.lw_objects.blockSignals(False)
-
 
     @err_catcher(name=__name__)
     def _toggleCheckbox(self, item, checked):
@@ -1134,29 +1290,30 @@ class Image_ImportClass(object):
         if not parent:
             return
 
-        #   Find which children items are checked
-        all_checked = all(parent.child(i).checkState(0) == Qt.Checked for i in range(parent.childCount()))
-        any_checked = any(parent.child(i).checkState(0) == Qt.Checked for i in range(parent.childCount()))
-        any_unchecked = any(parent.child(i).checkState(0) == Qt.Unchecked for i in range(parent.childCount()))
-        any_partially = any(parent.child(i).checkState(0) == Qt.PartiallyChecked for i in range(parent.childCount()))
-
-        #   Set parent's checkbox based on its children
-        if all_checked:
-            checked = Qt.Checked
-        elif any_partially:
-            checked = Qt.PartiallyChecked
-        elif any_checked and any_unchecked:
-            checked = Qt.PartiallyChecked
-        else:
-            checked = Qt.Unchecked
-
-        self.setItemChecked(parent, checked)
+        self.setItemChecked(parent, self.getParentChecked(parent))
 
         # Stop at the root parent
         if parent.parent():
             self._updateParentCheckbox(parent)
 
 
+    #   Returns the check state of a parent based on its children
+    @err_catcher(name=__name__)
+    def getParentChecked(self, parent):
+        #   Find which children items are checked
+        states = set(parent.child(i).checked for i in range(parent.childCount()))
+
+        #   Set parent's checkbox based on its children
+        if states == {"checked"}:
+            return "checked"
+        elif "partial" in states:
+            return "partial"
+        elif "checked" in states and "unchecked" in states:
+            return "partial"
+        else:
+            return "unchecked"
+
+
     @err_catcher(name=__name__)
     def getAllItems(self, useChecked=False, aovs=False):
         items = []
@@ -1169,8 +1326,9 @@ class Image_ImportClass(object):
                 _recursiveCollect(item.child(i))
 
         # Iterate through top-level items
-        for i in range(self.lw_objects.topLevelItemCount()):
-            _recursiveCollect(self.lw_objects.topLevelItem(i))
+        rootItem = self.aovTreeModel.rootItem
+        for i in range(rootItem.childCount()):
+            _recursiveCollect(rootItem.child(i))
 
         return items
 
@@ -1180,11 +1338,11 @@ class Image_ImportClass(object):
         comp = self.fuseFuncts.getCurrentComp()
 
         try:
-            #   Make Prism Loaders Cache
+            #   Make Prism Loaders Cache from a single Comp sweep
             prismloaders: dict = {
-                prism_data.get("toolUID"): prismloader
-                for prismloader in comp.GetToolList(False, "Loader").values()
-                if (prism_data := prismloader.GetData("Prism_ToolData")) and prism_data.get("toolUID")
+                rec["toolData"].get("toolUID"): rec["toolData"]
+                for rec in Fus.getCompSnapshot(comp, toolType="Loader", prismOnly=True, dataOnly=True)
+                if rec["toolData"].get("toolUID")
                 }
             
         except Exception as e:
@@ -1203,8 +1361,8 @@ class Image_ImportClass(object):
         uidDataDict = {}
 
         for uid in stateUIDs:
-            if uid in list(prismloaders.keys()):
-                uidData:dict = prismloaders[uid].GetData('Prism_ToolData')
+            if uid in prismloaders:
+                uidData:dict = prismloaders[uid]
 
                 if uidData:
                     uidDataDict[uid] = uidData
@@ -1216,6 +1374,7 @@ class Image_ImportClass(object):
             try:
                 #   Skip unchecked items
                 if self.getItemChecked(item) != "checked":
+                    item.status = None
                     self.setItemStatusColor(item, None)
                     continue
 
@@ -1252,14 +1411,18 @@ class Image_ImportClass(object):
                 #   Assign color based on match status
                 if ver_match:
                     color = COLOR_GREEN
+                    status = "imported"
                     aovStatuses.append("ok")
                 elif id_match:
                     color = COLOR_ORANGE
+                    status = "outdated"
                     aovStatuses.append("warning")
                 else:
                     color = COLOR_RED
+                    status = "missing"
                     aovStatuses.append("error")
 
+                item.status = status
                 self.setItemStatusColor(item, color)
 
             except Exception as e:
@@ -1419,122 +1582,281 @@ class Image_ImportClass(object):
             logger.warning("ERROR:  Unable to set State Thumbnail")
             return
 
-        # Create thumb thread
-        self.createThumb_thread = ThumbnailThread(self.l_thumb,
-                                                  beautyFilepath,
-                                                  thumb_width,
-                                                  temp_height,
-                                                  channel,
-                                                  allowThumb,
-                                                  self.getPixMap)
-        
-        # Connect the signal to update the QLabel when the thumbnail is ready
-        self.createThumb_thread.thumbnail_ready.connect(self.updateThumbnail)
-        # Start the thread
-        self.createThumb_thread.start()
+        # Queue the State thumb ahead of the AOV thumbs (replacing an older request)
+        self.getThumbService().cancel(self, group="state")
+        self.getThumbService().request(self,
+                                       self.l_thumb,
+                                       beautyFilepath,
+                                       thumb_width,
+                                       temp_height,
+                                       channel,
+                                       allowThumb,
+                                       self.getPixMap,
+                                       self.updateThumbnail,
+                                       priority=2,
+                                       group="state")
 
 
-    #   Generates pixmap for each AOV item with threading
+    #   Returns the shared thumbnail pool
+    @err_catcher(name=__name__)
+    def getThumbService(self):
+        maxThreads = getattr(self.fuseFuncts, "thumbThreads", 4)
+        return ThumbnailService.instance(maxThreads)
+
+
+    #   Generates the thumbnails of the visible AOV items with the thumbnail pool.
+    #   Other thumbnails are generated when scrolled into view or when the tooltip is requested.
     @err_catcher(name=__name__)
     def createAovThumbs(self):
         if self.fuseFuncts.useAovThumbs == "Disabled":
             return
 
-        #   Store list of active threads
-        self.thumb_threads = []
+        #   Drop AOV thumbnails still queued from the last refresh
+        self.getThumbService().cancel(self, group="aov")
+        self.requestVisibleThumbs()
 
-        #   Get all child items from AOV list
-        imageItems = self.getAllItems(aovs=True)
 
-        for item in imageItems:
-            #   Get data from item
-            itemData = self.getItemData(item)
+    #   Loads more rows and the thumbnails when the AOV tree is scrolled
+    @err_catcher(name=__name__)
+    def onAovTreeScrolled(self):
+        self.fetchVisibleRows()
+        self.requestVisibleThumbs()
 
-            #   Skip item if no data
-            if not itemData:
+
+    #   Returns the indexes of the AOV tree rows in the viewport
+    @err_catcher(name=__name__)
+    def getVisibleIndexes(self):
+        indexes = []
+        viewHeight = self.lw_objects.viewport().height()
+
+        index = self.lw_objects.indexAt(QPoint(0, 0))
+        while index.isValid() and self.lw_objects.visualRect(index).top() < viewHeight:
+            indexes.append(index)
+            index = self.lw_objects.indexBelow(index)
+
+        return indexes
+
+
+    #   Exposes the next rows of a parent when its last loaded row is in view
+    @err_catcher(name=__name__)
+    def fetchVisibleRows(self):
+        model = self.aovTreeModel
+        fetchParents = []
+
+        for index in self.getVisibleIndexes():
+            parentIndex = index.parent()
+            if index.row() == model.rowCount(parentIndex) - 1 and model.canFetchMore(parentIndex):
+                fetchParents.append(QPersistentModelIndex(parentIndex))
+
+        for parentIndex in fetchParents:
+            model.fetchMore(QModelIndex(parentIndex))
+
+
+    #   Requests the thumbnails of the AOV items in the viewport
+    @err_catcher(name=__name__)
+    def requestVisibleThumbs(self):
+        if self.fuseFuncts.useAovThumbs == "Disabled":
+            return
+
+        for index in self.getVisibleIndexes():
+            item = self.aovTreeModel.itemFromIndex(index)
+            if not self.getItemData(item):
                 continue
 
-            #   Get data items
-            origFilePath = itemData.get("basefile")
-            channel = itemData.get("channel")
+            thumbParams = self.getAovThumbParams(item)
+            if thumbParams and not thumbParams["ready"]:
+                self.requestAovThumb(item, thumbParams, priority=1)
 
-            #   Get source file for thumb generation
-            try:
-                #   Use Prism thumbnail
-                if self.core.media.getUseThumbnailForFile(origFilePath):
-                    thumbPath = self.core.media.getThumbnailPath(origFilePath)
-                else:
-                    raise FileNotFoundError("Thumbnail not available")
-            except FileNotFoundError:
-                #   Use original thumbnail
-                thumbPath = origFilePath
 
-            #   Get width based on DCC settings
-            width = self.aovThumbWidth
+    #   Returns the thumbnail parameters of an AOV item.  They are stored on
+    #   the item so the image header is only read once while the file is unchanged.
+    @err_catcher(name=__name__)
+    def getAovThumbParams(self, item):
+        thumbParams = item.thumb
+        if thumbParams:
+            #   Reuse the thumbnail only if the source files were not overwritten
+            signature = self.getThumbSignature(thumbParams["basefile"], thumbParams["thumbPath"])
+            if signature == thumbParams["signature"]:
+                return thumbParams
+
+            item.thumb = None
+            self.aovTreeModel.itemChanged(item)
 
-            # Load the original image to get its size
+        #   Get data from item
+        itemData = self.getItemData(item)
+
+        #   Skip item if no data
+        if not itemData:
+            return None
+
+        #   Get data items
+        origFilePath = itemData.get("basefile")
+        channel = itemData.get("channel")
+
+        #   Get source file for thumb generation
+        try:
+            #   Use Prism thumbnail
+            if self.core.media.getUseThumbnailForFile(origFilePath):
+                thumbPath = self.core.media.getThumbnailPath(origFilePath)
+            else:
+                raise FileNotFoundError("Thumbnail not available")
+        except FileNotFoundError:
+            #   Use original thumbnail
+            thumbPath = origFilePath
+
+        #   Get width based on DCC settings
+        width = self.aovThumbWidth
+
+        #   Get the original size from the file header
+        origSize = Image.getImageSize(thumbPath)
+        if not origSize:
+            #   Fallback to loading the image for unsupported formats
             orig_pixmap = QPixmap(thumbPath)
             if orig_pixmap.isNull():
-                continue
+                return None
+            origSize = (orig_pixmap.width(), orig_pixmap.height())
 
-            #   Get sizes
-            orig_width = orig_pixmap.width()
-            orig_height = orig_pixmap.height()
-            height = int((width / orig_width) * orig_height) if orig_width else width
+        #   Get sizes
+        orig_width, orig_height = origSize
+        height = int((width / orig_width) * orig_height) if orig_width else width
 
-            #   Default to using Prism thumbnail
-            path = thumbPath
-            allowThumb = True
+        #   Default to using Prism thumbnail
+        path = thumbPath
+        allowThumb = True
+
+        #   If user selects All in DCC settings, use original image
+        if self.fuseFuncts.useAovThumbs == "All":
+            if channel and channel.lower() not in COLORNAMES:
+                path = origFilePath
+                allowThumb = False
+
+        thumbParams = {"path": path,
+                       "basefile": origFilePath,
+                       "thumbPath": thumbPath,
+                       "signature": self.getThumbSignature(origFilePath, thumbPath),
+                       "width": width,
+                       "height": height,
+                       "channel": channel,
+                       "allowThumb": allowThumb,
+                       "ready": False,
+                       "cacheKey": None}
+
+        item.thumb = thumbParams
+        return thumbParams
 
-            #   If user selects All in DCC settings, use original image
-            if self.fuseFuncts.useAovThumbs == "All":
-                if channel and channel.lower() not in COLORNAMES:
-                    path = origFilePath
-                    allowThumb = False
-
-            # Create thumbnail thread
-            thumb_thread = ThumbnailThread(item,
-                                           path,
-                                           width,
-                                           height,
-                                           channel,
-                                           allowThumb,
-                                           self.getPixMap)
-            #   Store thread
-            self.thumb_threads.append(thumb_thread)
-            #   Connect thread finish
-            thumb_thread.thumbnail_ready.connect(self.setThumbToolTip)
-            #   Launch thread
-            thumb_thread.start()
-    
 
-    #   Create html pixmap for AOV items
+    #   Size and mtime of the files a thumbnail is made from
     @err_catcher(name=__name__)
-    def setThumbToolTip(self, item, pixMap, new_height, new_width):
-        try:
-            if not item:
-                logger.warning("ERROR: No AOV Item")
-                return
+    def getThumbSignature(self, origFilePath, thumbPath):
+        if thumbPath == origFilePath:
+            return self.getFileSignature(origFilePath)
+
+        return (self.getFileSignature(origFilePath), self.getFileSignature(thumbPath))
 
-            # Convert QPixmap to Base64
-            byte_array = QByteArray()
-            buffer = QBuffer(byte_array)
-            buffer.open(QIODevice.WriteOnly)
-            pixMap.save(buffer, "PNG")
 
-            base64_data = byte_array.toBase64().data().decode()
-            thumbTip = f'<img src="data:image/png;base64,{base64_data}" width="{new_width}"/>'
+    #   Returns the size and mtime of a file.  Each file is only read once per
+    #   AOV tree refresh, so scrolling and tooltips do not touch the storage.
+    @err_catcher(name=__name__)
+    def getFileSignature(self, filePath):
+        if filePath not in self.fileSignatures:
+            self.fileSignatures[filePath] = Cache.getFileSignature(filePath)
 
-            #   Set Tool Tip
-            item.setToolTip(0, thumbTip)
+        return self.fileSignatures[filePath]
 
-        except:
-            logger.warning("ERROR:  Unable to set AOV thumb tooltip")
+
+    #   Returns the thumbnail cache key of the thumbnail parameters
+    @err_catcher(name=__name__)
+    def getAovThumbCacheKey(self, thumbParams):
+        return Cache.getThumbCacheKey(thumbParams["path"],
+                                      thumbParams["channel"],
+                                      thumbParams["width"],
+                                      thumbParams["allowThumb"],
+                                      signature=self.getFileSignature(thumbParams["path"]))
+
+
+    #   Queues the thumbnail of an AOV item
+    @err_catcher(name=__name__)
+    def requestAovThumb(self, item, thumbParams, priority=0):
+        self.getThumbService().request(self,
+                                       item,
+                                       thumbParams["path"],
+                                       thumbParams["width"],
+                                       thumbParams["height"],
+                                       thumbParams["channel"],
+                                       thumbParams["allowThumb"],
+                                       self.getPixMap,
+                                       self.onAovThumbReady,
+                                       priority=priority,
+                                       group="aov")
+
+
+    #   Marks the thumbnail as cached so the delegate draws it, and updates
+    #   the tooltip if it is showing
+    @err_catcher(name=__name__)
+    def onAovThumbReady(self, item, pixMap, new_height, new_width, imageData=None):
+        thumbParams = item.thumb
+        if thumbParams:
+            thumbParams["ready"] = True
+            thumbParams["cacheKey"] = self.getAovThumbCacheKey(thumbParams)
+            self.aovTreeModel.itemChanged(item)
+
+        if self.toolTipItem is item and QToolTip.isVisible():
+            self.toolTipThumb = imageData
+            self.showAovToolTip(item, QCursor.pos())
+
+
+    #   Builds the AOV item tooltip when it is requested.  The thumbnail is read
+    #   from the thumbnail cache so no image data is stored on the items.
+    @err_catcher(name=__name__)
+    def onAovToolTipEvent(self, pos, globalPos):
+        index = self.lw_objects.indexAt(pos)
+        if not index.isValid() or index.column() != 0:
+            return False
+
+        item = self.aovTreeModel.itemFromIndex(index)
+        if not self.getItemData(item):
+            return False
+
+        if self.toolTipItem is not item:
+            self.toolTipItem = item
+            self.toolTipThumb = None
+
+        self.showAovToolTip(item, globalPos)
+        return True
+
+
+    @err_catcher(name=__name__)
+    def showAovToolTip(self, item, globalPos):
+        itemData = self.getItemData(item)
+        status = item.status
+
+        tipLines = [f"{itemData.get('aov') or itemData.get('identifier')}  -  {itemData.get('channel')}"]
+        if status:
+            tipLines.append(f"Loader: {status}")
+
+        thumbParams = None
+        if self.fuseFuncts.useAovThumbs != "Disabled":
+            thumbParams = self.getAovThumbParams(item)
+
+        if thumbParams:
+            imageData = self.toolTipThumb
+            if not imageData:
+                cacheKey = thumbParams["cacheKey"] or self.getAovThumbCacheKey(thumbParams)
+                imageData = Cache.getCachedThumb(cacheKey)
+
+            if imageData:
+                base64_data = QByteArray(imageData).toBase64().data().decode()
+                tipLines.append(f'<img src="data:image/png;base64,{base64_data}" width="{thumbParams["width"]}"/>')
+            else:
+                tipLines.append("<i>Loading thumbnail...</i>")
+                self.requestAovThumb(item, thumbParams, priority=2)
+
+        QToolTip.showText(globalPos, "<br>".join(tipLines), self.lw_objects.viewport())
 
 
     #   Replace placeholder thumb with generated pixmap
     @err_catcher(name=__name__)
-    def updateThumbnail(self, item, pixMap, new_height, new_width):
+    def updateThumbnail(self, item, pixMap, new_height, new_width, imageData=None):
         # This will be called when the thumbnail is ready in the thread
         try:
             # Update QLabel with new pixmap and size
@@ -1627,6 +1949,8 @@ class Image_ImportClass(object):
             return {}
 
         files = []
+        #   Videos without a cached duration:  {filePath: [basefile]}
+        videoProbes = {}
 
         #   If there are Prism AOV's (for example not for 2d Renders)
         hasAOVs = bool(aovDict)
@@ -1645,11 +1969,15 @@ class Image_ImportClass(object):
 
             basefile = filesList[0]
 
+            if sourceItem[2] is None:
+                videoProbes.setdefault(sourceItem[0], []).append(basefile)
+
             # Get file extension
             extension = self.getImageExtension(importData, basefile)
 
             # Get channels list
-            channels = self.getLayersFromFile(basefile)
+            fileLayers = self.getLayersFromFile(basefile)
+            channels = fileLayers
 
             if len(channels) == 0:
                 channels = ["Color"]
@@ -1690,8 +2018,8 @@ class Image_ImportClass(object):
             if "channel" in context:
                 importData["channel"] = context["channel"]
 
-            channels = self.getLayersFromFile(basefile)
-            importData["channels"] = channels
+            #   Reuse the layers of the last basefile
+            importData["channels"] = fileLayers
 
         except Exception as e:
             logger.warning(f"ERROR: Unable to add channel data to importData: {e}")
@@ -1705,6 +2033,9 @@ class Image_ImportClass(object):
         #   Set global data object
         self.importData = importData
 
+        #   Probe the videos without a cached duration
+        self.probeVideoDurations(videoProbes)
+
         return True
     
 
@@ -1712,16 +2043,19 @@ class Image_ImportClass(object):
     @err_catcher(name=__name__)
     def getImportSource(self, versionDir, usePasses):
         sourceData = []
+        videoFiles = []
 
         if usePasses:
             #   Get AOV directories from version directory
             sources = [
                 x
-                for x in os.listdir(versionDir)
+                for x in Cache.listDir(versionDir, dirsOnly=True)
                 if x[-5:] not in ["(mp4)", "(jpg)", "(png)"]
-                and os.path.isdir(os.path.join(versionDir, x))
             ]
 
+            #   Scan the AOV directories in parallel
+            Cache.prefetchDirs([os.path.join(versionDir, x) for x in sources])
+
         else:
             #   Get souce
             sources = self.core.media.getImgSources(versionDir, getFirstFile=True)
@@ -1741,14 +2075,14 @@ class Image_ImportClass(object):
 
             #   Handle images sequence
             if len(seqFiles) > 1 and extension not in self.core.media.videoFormats:
-                    firstFrame, lastFrame = self.core.media.getFrameRangeFromSequence(seqFiles, baseFile=baseFile)
+                    firstFrame, lastFrame = self.getSequenceRange(sourceDir, seqFiles, baseFile)
                     filePath = os.path.join(versionDir, seqName).replace("\\", "/")
-            #   Handle video files
+            #   Handle video files (durations are added below in one batch)
             elif extension in self.core.media.videoFormats:
                 filePath = os.path.join(sourceDir, baseFile).replace("\\", "/")
-                duration = self.getVideoDuration(filePath)
                 firstFrame = 1
-                lastFrame = duration
+                lastFrame = None
+                videoFiles.append(filePath)
             #   Handle single image stills
             else:
                 filePath = os.path.join(sourceDir, baseFile).replace("\\", "/")
@@ -1757,18 +2091,30 @@ class Image_ImportClass(object):
 
             sourceData.append([filePath, firstFrame, lastFrame])
 
+        #   Use the cached video durations.  The others are left unknown and
+        #   probed in the background after the import data is made.
+        if videoFiles:
+            durations, _missing = Video.getCachedDurations(videoFiles)
+            for sourceItem in sourceData:
+                if sourceItem[0] in durations:
+                    sourceItem[2] = durations[sourceItem[0]]
+
         return sourceData
     
 
+    #   Returns the first sequence in the directory.  The result is cached
+    #   with the directory listing until the directory changes.
     @err_catcher(name=__name__)
     def getSequenceData(self, sourceDir):
+        return Cache.getDirData(sourceDir, "sequence", lambda files: self._detectSequence(sourceDir, files))
+
+
+    @err_catcher(name=__name__)
+    def _detectSequence(self, sourceDir, files):
         #   Handle
-        if self.getLinkedFilepath(sourceDir):
+        if "REDIRECT.txt" in files:
             files = self.getLinkedFilepath(sourceDir)
 
-        else:
-            files = os.listdir(sourceDir)
-
         #   Filter and get sequence Dict
         validFiles = self.core.media.filterValidMediaFiles(files)
         validFiles = sorted(validFiles, key=lambda x: x if "cryptomatte" not in os.path.basename(x) else "zzz" + x)
@@ -1779,6 +2125,21 @@ class Image_ImportClass(object):
         return seqName, seqFiles
 
 
+    #   Returns the frame range of a sequence, cached with the directory listing
+    @err_catcher(name=__name__)
+    def getSequenceRange(self, sourceDir, seqFiles, baseFile):
+        return Cache.getDirData(sourceDir,
+                                "frameRange",
+                                lambda files: self.core.media.getFrameRangeFromSequence(seqFiles, baseFile=baseFile))
+
+
+    #   Returns the frames, gaps and padding of the sequence in the directory
+    @err_catcher(name=__name__)
+    def getSequenceInfo(self, sourceDir):
+        seqName, seqFiles = self.getSequenceData(sourceDir)
+        return Cache.getDirData(sourceDir, "sequenceInfo", lambda files: Helper.getSequenceInfo(seqFiles))
+
+
     @err_catcher(name=__name__)
     def getLinkedFilepath(self, sourceDir):
         redirectFile = os.path.join(sourceDir, "REDIRECT.txt")
@@ -1806,12 +2167,13 @@ class Image_ImportClass(object):
 
     @err_catcher(name=__name__)
     def setItemData(self, item, data):
-        item.setData(0, ITEM_ROLE_DATA, data)
+        item.itemData = data
+        self.aovTreeModel.itemChanged(item)
 
 
     @err_catcher(name=__name__)
     def getItemData(self, item):
-        return item.data(0, ITEM_ROLE_DATA)
+        return item.itemData
     
 
     #   Sets item checkbox and saves it to the item data
@@ -1827,10 +2189,7 @@ class Image_ImportClass(object):
             checked_str = "unchecked"
             checked_qt = self.strToQtChecked("unchecked")
 
-        #   Set the checkbox using Qt.checked
-        item.setCheckState(0, checked_qt)
-        #   Save to item's data as str
-        item.setData(0, ITEM_ROLE_CHECKBOX, checked_str)
+        self.applyItemChecked(item, checked_qt, checked_str)
 
         #   Save checked to importData
         matching_fileData = self.getMatchingDataFromItem(item)
@@ -1841,22 +2200,23 @@ class Image_ImportClass(object):
         self.stateManager.saveStatesToScene()
 
 
+    #   Sets the item checkbox without saving to the importData
     @err_catcher(name=__name__)
-    def getItemChecked(self, item):
-        checked_raw = item.data(0, ITEM_ROLE_CHECKBOX)
-        if not checked_raw:
-            return None
-        
-        if isinstance(checked_raw, str):
-            checked_str = checked_raw
-            checked_qt = self.strToQtChecked(checked_raw)
-        elif isinstance(checked_raw, Qt.CheckState):
-            checked_str = self.qtCheckedToStr(checked_raw)
-            checked_qt = checked_raw
-        else:
-            return None
+    def applyItemChecked(self, item, checked, checked_str=None):
+        if isinstance(checked, str):
+            checked_str = checked
+        elif checked_str is None:
+            checked_str = self.qtCheckedToStr(checked)
 
-        return checked_str
+        #   Save to item's data as str (the model shows it as the checkbox)
+        if item.checked != checked_str:
+            item.checked = checked_str
+            self.aovTreeModel.itemChanged(item)
+
+
+    @err_catcher(name=__name__)
+    def getItemChecked(self, item):
+        return item.checked
     
 
     @err_catcher(name=__name__)
@@ -1893,12 +2253,22 @@ class Image_ImportClass(object):
 
     @err_catcher(name=__name__)
     def setItemStatusColor(self, item, color):
-        item.setData(0, ITEM_ROLE_COLOR, color)
+        item.color = color
+        self.aovTreeModel.itemChanged(item)
 
 
     @err_catcher(name=__name__)
     def getItemStatusColor(self, item):
-        return item.data(0, ITEM_ROLE_COLOR)
+        return item.color
+
+
+    #   Sets the sequence check text of the second column
+    @err_catcher(name=__name__)
+    def setItemSeqStatus(self, item, text, tip="", color=None):
+        item.seqText = text
+        item.seqTip = tip
+        item.seqColor = color
+        self.aovTreeModel.itemChanged(item, column=1)
     
 
     @err_catcher(name=__name__)
@@ -2093,30 +2463,31 @@ class Image_ImportClass(object):
         if not result:
             return
 
-        #   Execute import
-        importResult = self.fuseFuncts.imageImport(self, importData, self.sortMode)
+        with self.fuseFuncts.stateSaveBatch():
+            #   Execute import
+            importResult = self.fuseFuncts.imageImport(self, importData, self.sortMode)
 
-        if not importResult:
-            result = None
-            doImport = False
-        else:
-            result = importResult["result"]
-            doImport = importResult["doImport"]
+            if not importResult:
+                result = None
+                doImport = False
+            else:
+                result = importResult["result"]
+                doImport = importResult["doImport"]
 
-        if doImport:
-            if result == "canceled":
-                return False
+            if doImport:
+                if result == "canceled":
+                    return False
 
-        kwargs = {
-            "state": self,
-            "scenefile": fileName,
-            "importfile": impFileName,
-        }
-        self.core.callback("postImport", **kwargs)
+            kwargs = {
+                "state": self,
+                "scenefile": fileName,
+                "importfile": impFileName,
+            }
+            self.core.callback("postImport", **kwargs)
 
-        # self.setImportPath(impFileName)
-        self.stateManager.saveImports()
-        self.stateManager.saveStatesToScene()
+            # self.setImportPath(impFileName)
+            self.stateManager.saveImports()
+            self.stateManager.saveStatesToScene()
 
         #   Show version update popup if enabled
         if self.useUpdatePopup and result == "updated":
@@ -2275,7 +2646,15 @@ class Image_ImportClass(object):
             path = self.getImportPath()
             curVerData = {"version": self.importData["version"], "path": path}
 
-            latestVerDict = self.getLatestVersion(self.importData, includeMaster=True)
+            #   Latest version is only looked up again after the watcher reports a change
+            self.watchMedia()
+            if self.latestVersionCache and self.latestVersionCache[0] == path:
+                latestVerDict = self.latestVersionCache[1]
+            else:
+                latestVerDict = self.getLatestVersion(self.importData, includeMaster=True)
+                if self.watchedDirs:
+                    self.latestVersionCache = (path, latestVerDict)
+
             lastestVerName = latestVerDict["version"]
             lastestVerPath = latestVerDict["path"]
 
@@ -2300,6 +2679,45 @@ class Image_ImportClass(object):
             return None
     
 
+    #   Watches the version folder (new AOVs) and the identifier folder (new versions)
+    @err_catcher(name=__name__)
+    def watchMedia(self):
+        dirs = Helper.getVersionDirs(self.getImportPath(), self.importData.get("version"))
+        watcher = self.fuseFuncts.getMediaWatcher()
+
+        #   Watch again if the watcher was cleared by a State Manager reload
+        if dirs == self.watchedDirs and watcher.isWatching(self):
+            return
+
+        self.latestVersionCache = None
+        if watcher.watch(self, dirs, self.onMediaChanged):
+            self.watchedDirs = dirs
+        else:
+            self.watchedDirs = None
+
+
+    #   Called by the watcher when the watched media folders change.  Not wrapped
+    #   in err_catcher, so a deleted State raises RuntimeError to the watcher,
+    #   which then drops it.
+    def onMediaChanged(self, changedDirs):
+        if not self.watchedDirs:
+            return
+
+        #   Raises if the State UI was deleted
+        self.objectName()
+
+        versionDir, identifierDir = [os.path.normpath(d) for d in self.watchedDirs]
+        self.latestVersionCache = None
+
+        if versionDir in changedDirs:
+            logger.debug(f"Media changed for {self.importData.get('identifier')}, refreshing AOVs")
+            self.refresh()
+
+        elif identifierDir in changedDirs:
+            logger.debug(f"New version available for {self.importData.get('identifier')}")
+            self.updateUi()
+
+
     @err_catcher(name=__name__)
     def importLatest(self, refreshUi=True, selectedStates=True, setChecked=False):
         importIdentifier = self.importData.copy()
@@ -2327,19 +2745,20 @@ class Image_ImportClass(object):
         if result == "Empty":
             return result
         
-        self.updateAovChnlTree()
-
-        if setChecked:
-            for iData in selItemData:
-                newItem = self.getMatchingItemFromData(iData)
-                if newItem:
-                    self.setItemChecked(newItem, "checked")
-                    self.onCheckboxStateChanged(newItem)
+        with self.fuseFuncts.stateSaveBatch():
+            self.updateAovChnlTree()
+
+            if setChecked:
+                for iData in selItemData:
+                    newItem = self.getMatchingItemFromData(iData)
+                    if newItem:
+                        self.setItemChecked(newItem, "checked")
+                        self.onCheckboxStateChanged(newItem)
                 
-        if selectedStates:
-            self.importSelected(refreshUi=False)
-        else:
-            self.importAll(refreshUi=False)
+            if selectedStates:
+                self.importSelected(refreshUi=False)
+            else:
+                self.importAll(refreshUi=False)
 
         if refreshUi:
             self.updateAovStatus()
@@ -2371,6 +2790,13 @@ class Image_ImportClass(object):
             for uid in uids:
                 self.fuseFuncts.deleteNode(uid, delAction=True)
 
+        #   Drop pending thumbnails of the State
+        self.getThumbService().release(self)
+        #   Stop watching the media folders
+        self.fuseFuncts.getMediaWatcher().unwatch(self)
+        #   Ignore the running video probes
+        self.videoProbeGeneration += 1
+
                
 
     @err_catcher(name=__name__)
@@ -2609,7 +3035,10 @@ class statusColorDelegate(QStyledItemDelegate):
     def paint(self, painter, option, index):
         # Call the default painting method
         super().paint(painter, option, index)
+        self.paintStatusColor(painter, option, index)
+
 
+    def paintStatusColor(self, painter, option, index):
         # Get the color from the item’s data
         color = index.data(ITEM_ROLE_COLOR)
 
@@ -2630,33 +3059,588 @@ class statusColorDelegate(QStyledItemDelegate):
 
 
 
-#   Generates thumbnails in separate threads
-class ThumbnailThread(QThread):
-    thumbnail_ready = Signal(QWidget, QPixmap, int, int)
+#   Number of scaled row thumbnails kept by the delegate
+ROW_THUMB_CACHE_SIZE = 256
+
+#   Draws the AOV thumbnails next to the status icon.  The thumbnails are read
+#   from the thumbnail cache when a row is painted, so only visible rows load them.
+class AovItemDelegate(statusColorDelegate):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        #   {(cacheKey, height): QPixmap}
+        self.rowThumbs = OrderedDict()
+
+
+    def paint(self, painter, option, index):
+        pixMap = None
+        if index.column() == 0:
+            pixMap = self.getRowThumb(index.data(ITEM_ROLE_THUMB), option.rect.height() - 2)
+
+        if not pixMap:
+            super().paint(painter, option, index)
+            return
+
+        #   Thumbnail sits left of the status icon and the text is elided before it
+        thumbRect = QRect(option.rect.right() - 18 - pixMap.width(),
+                          option.rect.top() + (option.rect.height() - pixMap.height()) // 2,
+                          pixMap.width(),
+                          pixMap.height())
+
+        textRect = QRect(option.rect)
+        textRect.setRight(thumbRect.left() - 4)
+        textOption = QStyleOptionViewItem(option)
+        textOption.rect = textRect
+
+        QStyledItemDelegate.paint(self, painter, textOption, index)
+        painter.drawPixmap(thumbRect, pixMap)
+        self.paintStatusColor(painter, option, index)
+
+
+    #   Returns the cached thumbnail scaled to the row height
+    def getRowThumb(self, thumbParams, height):
+        if not thumbParams or not thumbParams.get("cacheKey") or height <= 0:
+            return None
+
+        key = (thumbParams["cacheKey"], height)
+        pixMap = self.rowThumbs.get(key)
+        if pixMap is not None:
+            self.rowThumbs.move_to_end(key)
+            return pixMap
+
+        imageData = Cache.getCachedThumb(thumbParams["cacheKey"])
+        if not imageData:
+            return None
+
+        pixMap = QPixmap()
+        pixMap.loadFromData(imageData, "PNG")
+        if pixMap.isNull():
+            return None
+
+        pixMap = pixMap.scaledToHeight(height, Qt.SmoothTransformation)
+        self.rowThumbs[key] = pixMap
+        while len(self.rowThumbs) > ROW_THUMB_CACHE_SIZE:
+            self.rowThumbs.popitem(last=False)
+
+        return pixMap
+
+
+
+#   Node of the AOV tree.  Holds the row values, the view reads them through the model.
+class AovTreeItem(object):
+    def __init__(self, key=None, parentItem=None):
+        self.key = key
+        self.parentItem = parentItem
+        self.children = []
+        self.rowNum = 0
+        #   Number of children exposed to the view
+        self.fetched = 0
+
+        self.text = ""
+        self.itemData = None
+        self.checked = None
+        self.color = None
+        self.status = None
+        self.thumb = None
+        self.seqText = ""
+        self.seqTip = ""
+        self.seqColor = None
+
+
+    #   Returns None for the top level items
+    def parent(self):
+        if self.parentItem is None or self.parentItem.key is None:
+            return None
+        return self.parentItem
+
+
+    def child(self, row):
+        return self.children[row]
+
+
+    def childCount(self):
+        return len(self.children)
+
+
+
+#   Number of child rows exposed to the view at a time
+AOV_FETCH_BATCH = 64
+
+#   Model of the AOV tree.  The items are plain objects built from the parsed import
+#   data and the children of each item are handed to the view in batches when it
+#   asks for them, so the view only creates and paints the rows it shows.
+class AovTreeModel(QAbstractItemModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rootItem = AovTreeItem()
+        #   {key: AovTreeItem}
+        self.items = {}
+
+        self.checkStates = {"checked": Qt.Checked,
+                            "partial": Qt.PartiallyChecked,
+                            "unchecked": Qt.Unchecked}
+
+
+    def itemFromIndex(self, index):
+        if index.isValid():
+            return index.internalPointer()
+        return self.rootItem
+
+
+    #   Returns an invalid index if the item is not exposed to the view
+    def indexFromItem(self, item, column=0):
+        if item is None or self.items.get(item.key) is not item:
+            return QModelIndex()
+        if item.rowNum >= item.parentItem.fetched:
+            return QModelIndex()
+
+        return self.createIndex(item.rowNum, column, item)
+
+
+    def index(self, row, column, parent=QModelIndex()):
+        parentItem = self.itemFromIndex(parent)
+        if row < 0 or row >= parentItem.fetched or column < 0 or column >= self.columnCount():
+            return QModelIndex()
+
+        return self.createIndex(row, column, parentItem.children[row])
+
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+
+        parentItem = index.internalPointer().parentItem
+        if parentItem is None or parentItem is self.rootItem:
+            return QModelIndex()
+
+        return self.createIndex(parentItem.rowNum, 0, parentItem)
+
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return self.itemFromIndex(parent).fetched
+
+
+    def columnCount(self, parent=QModelIndex()):
+        return 2
+
+
+    def hasChildren(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return False
+        return bool(self.itemFromIndex(parent).children)
+
+
+    def canFetchMore(self, parent):
+        item = self.itemFromIndex(parent)
+        return item.fetched < len(item.children)
+
 
-    def __init__(self, item, filepath, width, height, channel, allowThumb, funct_getPixMap):
+    def fetchMore(self, parent):
+        item = self.itemFromIndex(parent)
+        count = min(AOV_FETCH_BATCH, len(item.children) - item.fetched)
+        if count <= 0:
+            return
+
+        self.beginInsertRows(parent, item.fetched, item.fetched + count - 1)
+        item.fetched += count
+        self.endInsertRows()
+
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        item = index.internalPointer()
+
+        #   Sequence check column
+        if index.column() == 1:
+            if role == Qt.DisplayRole:
+                return item.seqText
+            if role == Qt.ToolTipRole:
+                return item.seqTip or None
+            if role == Qt.ForegroundRole and item.seqColor:
+                return QBrush(QColor(*item.seqColor))
+            return None
+
+        if role == Qt.DisplayRole:
+            return item.text
+        if role == Qt.CheckStateRole:
+            return self.checkStates.get(item.checked)
+        if role == ITEM_ROLE_DATA:
+            return item.itemData
+        if role == ITEM_ROLE_CHECKBOX:
+            return item.checked
+        if role == ITEM_ROLE_COLOR:
+            return item.color
+        if role == ITEM_ROLE_STATUS:
+            return item.status
+        if role == ITEM_ROLE_THUMB:
+            return item.thumb
+
+        return None
+
+
+    #   Repaints the item if the view shows it
+    def itemChanged(self, item, column=0):
+        index = self.indexFromItem(item, column)
+        if index.isValid():
+            self.dataChanged.emit(index, index)
+
+
+    #   Updates the items to match the rows:  {key: {"parent", "text", ...}}.
+    #   Kept items keep their values, and the children of new items are exposed
+    #   to the view when it fetches them.  Returns the items by key.
+    def setRows(self, rows):
+        #   Remove items that are not in the rows or moved to another parent
+        removedItems = [item for key, item in self.items.items()
+                        if key not in rows or rows[key]["parent"] != item.parentItem.key]
+        removedSet = set(removedItems)
+
+        #   Children of removed items go with them:  {parentItem: [row]}
+        removeRows = {}
+        for item in removedItems:
+            if item.parentItem not in removedSet:
+                removeRows.setdefault(item.parentItem, []).append(item.rowNum)
+
+        for parentItem, rowNums in removeRows.items():
+            self._removeRows(parentItem, sorted(rowNums))
+
+        #   {parentItem: first new row} of the parents that already existed
+        newRows = {}
+        created = set()
+
+        for key, row in rows.items():
+            item = self.items.get(key)
+            if item is None:
+                parentItem = self.items[row["parent"]] if row["parent"] is not None else self.rootItem
+                item = AovTreeItem(key, parentItem)
+                item.rowNum = len(parentItem.children)
+                parentItem.children.append(item)
+                self.items[key] = item
+
+                #   Children of new items are fetched by the view
+                created.add(item)
+                if parentItem not in created:
+                    newRows.setdefault(parentItem, item.rowNum)
+
+            if item.text != row["text"]:
+                item.text = row["text"]
+                self.itemChanged(item)
+
+        #   Append the new rows if all the rows of the parent are already exposed
+        for parentItem, first in newRows.items():
+            if parentItem.fetched != first:
+                continue
+
+            parentIndex = self.indexFromItem(parentItem)
+            if parentItem is not self.rootItem and not parentIndex.isValid():
+                continue
+
+            last = len(parentItem.children) - 1
+            self.beginInsertRows(parentIndex, first, last)
+            parentItem.fetched = last + 1
+            self.endInsertRows()
+
+        return self.items
+
+
+    #   Removes the rows in contiguous runs, starting from the last run so the
+    #   row numbers of the other runs stay valid
+    def _removeRows(self, parentItem, rowNums):
+        runs = []
+        for row in rowNums:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1][1] = row
+            else:
+                runs.append([row, row])
+
+        parentIndex = self.indexFromItem(parentItem)
+
+        for first, last in reversed(runs):
+            #   Only the rows exposed to the view are announced
+            exposedLast = min(last, parentItem.fetched - 1)
+            exposed = first <= exposedLast
+
+            if exposed:
+                self.beginRemoveRows(parentIndex, first, exposedLast)
+
+            for item in parentItem.children[first:last + 1]:
+                self._dropItem(item)
+            del parentItem.children[first:last + 1]
+
+            if exposed:
+                parentItem.fetched -= exposedLast - first + 1
+                self.endRemoveRows()
+
+        for row, child in enumerate(parentItem.children):
+            child.rowNum = row
+
+
+    def _dropItem(self, item):
+        self.items.pop(item.key, None)
+        for child in item.children:
+            self._dropItem(child)
+
+
+
+#   Passes tooltip events of the AOV tree to the state
+class AovToolTipFilter(QObject):
+    def __init__(self, funct_onToolTip, parent=None):
+        super().__init__(parent)
+        self.onToolTip = funct_onToolTip
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.ToolTip:
+            return bool(self.onToolTip(event.pos(), event.globalPos()))
+        return False
+
+
+
+#   Shared pool for the sequence checks.  Kept small to not flood slow storage.
+SEQ_CHECK_THREADS = 2
+_seqCheckPool = None
+
+def getSeqCheckPool():
+    global _seqCheckPool
+    if _seqCheckPool is None:
+        _seqCheckPool = QThreadPool()
+        _seqCheckPool.setMaxThreadCount(SEQ_CHECK_THREADS)
+
+    return _seqCheckPool
+
+
+class SequenceCheckSignals(QObject):
+    finished = Signal(object)
+
+
+#   Analyzes a sequence in the thread pool.  The listing is cached by the
+#   directory mtime and the frames are only read again if their size or mtime changed.
+class SequenceCheckJob(QRunnable):
+    def __init__(self, generation, item, dirPath, fileName):
         super().__init__()
+        self.setAutoDelete(False)
+        self.generation = generation
         self.item = item
+        self.dirPath = dirPath
+        self.fileName = fileName
+        self.signals = SequenceCheckSignals()
+
+        self.result = None
+
+    def run(self):
+        try:
+            fileNames = Cache.listDir(self.dirPath, filesOnly=True)
+            self.result = Image.analyzeSequence(self.dirPath, self.fileName, fileNames)
+        except Exception as e:
+            logger.warning(f"ERROR:  Unable to check sequence {self.fileName}:\n{e}")
+
+        self.signals.finished.emit(self)
+
+
+
+#   Shared pool for the video duration probes
+_videoProbePool = None
+
+def getVideoProbePool():
+    global _videoProbePool
+    if _videoProbePool is None:
+        _videoProbePool = QThreadPool()
+        _videoProbePool.setMaxThreadCount(Video.PROBE_MAX_THREADS)
+
+    return _videoProbePool
+
+
+class VideoProbeSignals(QObject):
+    finished = Signal(object)
+
+
+#   Reads the duration of a video in the thread pool.  frames stays None if
+#   the probe failed.
+class VideoProbeJob(QRunnable):
+    def __init__(self, generation, filePath, basefiles, ffprobePath):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.generation = generation
+        self.filePath = filePath
+        self.basefiles = basefiles
+        self.ffprobePath = ffprobePath
+        self.signals = VideoProbeSignals()
+
+        self.frames = None
+
+    def run(self):
+        try:
+            self.frames = Video.getVideoDuration(self.filePath, self.ffprobePath)
+        except Exception as e:
+            logger.warning(f"ERROR:  Unable to probe video {self.filePath}:\n{e}")
+
+        self.signals.finished.emit(self)
+
+
+
+#   Signals for the thumbnail jobs (QRunnable cannot emit signals)
+class ThumbnailJobSignals(QObject):
+    finished = Signal(object, QPixmap, int, int)
+
+
+#   Generates a single thumbnail in the thread pool
+class ThumbnailJob(QRunnable):
+    def __init__(self, key, filepath, width, height, channel, allowThumb, funct_getPixMap):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.key = key
         self.filepath = filepath
         self.width = width
         self.height = height
         self.channel = channel
         self.allowThumb = allowThumb
         self.getPixMap = funct_getPixMap
+        self.signals = ThumbnailJobSignals()
+
+        self.imageData = None
 
     def run(self):
-        # Get PixMap
-        pixMap = self.getPixMap(self.filepath, self.width, self.height, self.channel, self.allowThumb)
+        try:
+            #   Use the cached thumbnail if the source has not changed
+            cacheKey = Cache.getThumbCacheKey(self.filepath, self.channel, self.width, self.allowThumb)
+            self.imageData = Cache.getCachedThumb(cacheKey)
+
+            if self.imageData:
+                scaledPixmap = QPixmap()
+                scaledPixmap.loadFromData(self.imageData, "PNG")
+                new_height = scaledPixmap.height()
+
+            else:
+                # Get PixMap
+                pixMap = self.getPixMap(self.filepath, self.width, self.height, self.channel, self.allowThumb)
 
-        # Maintain aspect ratio: Calculate new height
-        aspectRatio = pixMap.height() / pixMap.width()
-        new_height = int(self.width * aspectRatio)
+                # Maintain aspect ratio: Calculate new height
+                aspectRatio = pixMap.height() / pixMap.width()
+                new_height = int(self.width * aspectRatio)
 
-        # Scale the pixmap to fill the QLabel's width while maintaining aspect ratio
-        scaledPixmap = pixMap.scaled(self.width, new_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                # Scale the pixmap to fill the QLabel's width while maintaining aspect ratio
+                scaledPixmap = pixMap.scaled(self.width, new_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+                #   Encode once for the cache and the tooltips
+                byte_array = QByteArray()
+                buffer = QBuffer(byte_array)
+                buffer.open(QIODevice.WriteOnly)
+                scaledPixmap.save(buffer, "PNG")
+                self.imageData = bytes(byte_array.data())
+
+                Cache.saveCachedThumb(cacheKey, self.imageData)
+
+        except Exception as e:
+            logger.warning(f"ERROR:  Unable to generate thumbnail for {self.filepath}:\n{e}")
+            scaledPixmap = QPixmap()
+            new_height = 0
 
         # Emit signal to update the UI with the pixmap
-        self.thumbnail_ready.emit(self.item, scaledPixmap, new_height, self.width)
+        self.signals.finished.emit(self, scaledPixmap, new_height, self.width)
+
+
+#   Shared bounded thumbnail generator for all Image Import States.
+#       - limits the number of concurrent thumbnail jobs
+#       - drops duplicate requests for the same (file, channel, size)
+#       - cancels the pending jobs of a State group (AOV or State thumbs) when it
+#         refreshes, or all of them when it is deleted
+#       - starts higher priority (visible) requests first
+class ThumbnailService(QObject):
+    _instance = None
+
+    def __init__(self, maxThreads=4):
+        super().__init__()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(maxThreads)
+
+        #   {key: {"job": ThumbnailJob, "waiters": [(ownerId, group, generation, item, callback)]}}
+        self.pending = {}
+        #   {(ownerId, group): generation}
+        self.generations = {}
+
+
+    #   Returns the shared service
+    @classmethod
+    def instance(cls, maxThreads=4):
+        if cls._instance is None:
+            cls._instance = ThumbnailService(maxThreads)
+        elif cls._instance.pool.maxThreadCount() != maxThreads:
+            cls._instance.pool.setMaxThreadCount(maxThreads)
+
+        return cls._instance
+
+
+    #   Queues a thumbnail and calls callback(item, pixMap, height, width, imageData) when done
+    def request(self, owner, item, filepath, width, height, channel, allowThumb, funct_getPixMap, callback,
+                priority=0, group="default"):
+        ownerId = id(owner)
+        generation = self.generations.setdefault((ownerId, group), 0)
+        waiter = (ownerId, group, generation, item, callback)
+
+        key = (filepath, channel, width, allowThumb)
+
+        #   Join the existing job for the same thumbnail
+        if key in self.pending:
+            self.pending[key]["waiters"].append(waiter)
+            return
+
+        job = ThumbnailJob(key, filepath, width, height, channel, allowThumb, funct_getPixMap)
+        job.signals.finished.connect(self._onJobFinished)
+
+        self.pending[key] = {"job": job, "waiters": [waiter]}
+        self.pool.start(job, priority)
+
+
+    #   Drops the pending thumbnails of a group of the owner, or of all its groups
+    def cancel(self, owner, group=None):
+        ownerId = id(owner)
+
+        for genKey in list(self.generations):
+            if genKey[0] == ownerId and (group is None or genKey[1] == group):
+                self.generations[genKey] += 1
+
+        for key in list(self.pending):
+            entry = self.pending[key]
+            entry["waiters"] = [w for w in entry["waiters"]
+                                if w[0] != ownerId or (group is not None and w[1] != group)]
+
+            #   Remove queued jobs nobody waits for
+            if not entry["waiters"]:
+                try:
+                    if self.pool.tryTake(entry["job"]):
+                        del self.pending[key]
+                except AttributeError:
+                    pass
+
+
+    #   Forgets the owner after it is deleted
+    def release(self, owner):
+        self.cancel(owner)
+
+        ownerId = id(owner)
+        for genKey in list(self.generations):
+            if genKey[0] == ownerId:
+                del self.generations[genKey]
+
+
+    #   Delivers the result to the current requests
+    def _onJobFinished(self, job, pixMap, new_height, new_width):
+        entry = self.pending.pop(job.key, None)
+        if not entry or pixMap.isNull():
+            return
+
+        #   Callbacks handle their own errors (deleted widgets included)
+        for ownerId, group, generation, item, callback in entry["waiters"]:
+            if self.generations.get((ownerId, group)) != generation:
+                continue
+            callback(item, pixMap, new_height, new_width, job.imageData)
 
 
 #	Popup for update message
@@ -75,7 +75,7 @@ from qtpy.QtCore import *
 from qtpy.QtGui import *
 from qtpy.QtWidgets import *
 
-from PrismUtils.Decorators import err_catcher
+from Libs.Prism_Fusion_lib_Profiler import err_catcher
 
 logger = logging.getLogger(__name__)
 
@@ -54,7 +54,7 @@ from qtpy.QtCore import *
 from qtpy.QtGui import *
 from qtpy.QtWidgets import *
 
-from PrismUtils.Decorators import err_catcher
+from Libs.Prism_Fusion_lib_Profiler import err_catcher
 
 import Libs.Prism_Fusion_lib_Fus as Fus
 import Libs.Prism_Fusion_lib_Helper as Helper
@@ -98,6 +98,10 @@ class Object3d_ImportClass(object):
         self.stateManager = stateManager
         self.fuseFuncts = self.core.appPlugin
 
+        #   Version folders watched for changes and the cached latest version
+        self.watchedDirs = None
+        self.latestVersionCache = None
+
         self.supportedFormats = [".fbx", ".abc"]
 
         self.taskName = ""
@@ -564,7 +568,16 @@ class Object3d_ImportClass(object):
         path = self.getImportPath()
         curVersionName = self.core.products.getVersionFromFilepath(path) or ""
         curVersionData = {"version": curVersionName, "path": path}
-        latestVersion = self.core.products.getLatestVersionFromPath(path)
+
+        #   Latest version is only looked up again after the watcher reports a change
+        self.watchMedia(path, curVersionName)
+        if self.latestVersionCache and self.latestVersionCache[0] == path:
+            latestVersion = self.latestVersionCache[1]
+        else:
+            latestVersion = self.core.products.getLatestVersionFromPath(path)
+            if self.watchedDirs:
+                self.latestVersionCache = (path, latestVersion)
+
         if latestVersion:
             latestVersionData = {"version": latestVersion["version"], "path": latestVersion["path"]}
         else:
@@ -573,6 +586,28 @@ class Object3d_ImportClass(object):
         return curVersionData, latestVersionData
 
 
+    #   Watches the product folder for new versions
+    @err_catcher(name=__name__)
+    def watchMedia(self, path, version):
+        dirs = Helper.getVersionDirs(path, version)[1:]
+        if dirs == self.watchedDirs:
+            return
+
+        self.latestVersionCache = None
+        if self.fuseFuncts.getMediaWatcher().watch(self, dirs, self.onMediaChanged):
+            self.watchedDirs = dirs
+        else:
+            self.watchedDirs = None
+
+
+    #   Called by the watcher when a version was added or removed
+    @err_catcher(name=__name__)
+    def onMediaChanged(self, changedDirs):
+        self.latestVersionCache = None
+        logger.debug(f"Versions changed for {self.getImportPath()}")
+        self.updateUi()
+
+
     @err_catcher(name=__name__)
     def setToolColor(self, color):
         comp = self.fuseFuncts.getCurrentComp()
@@ -712,6 +747,9 @@ class Object3d_ImportClass(object):
         except:
             logger.warning("ERROR: Unable to remove Loader3d from Comp")
 
+        #   Stop watching the product folder
+        self.fuseFuncts.getMediaWatcher().unwatch(self)
+
 
     @err_catcher(name=__name__)
     def getStateProps(self):
@@ -56,7 +56,7 @@ from qtpy.QtCore import *
 from qtpy.QtGui import *
 from qtpy.QtWidgets import *
 
-from PrismUtils.Decorators import err_catcher
+from Libs.Prism_Fusion_lib_Profiler import err_catcher
 
 import Libs.Prism_Fusion_lib_Fus as Fus
 import Libs.Prism_Fusion_lib_Helper as Helper
@@ -93,6 +93,7 @@ class RenderGroupClass(object):
 		self.cb_context.addItems(["From scenefile", "Custom"])
 
 		self.groupStates = []
+		self.stateNameMaps = None
 
 		#	Tuple of State types that can be used with RenderGroup
 		self.includedStateTypes = ["ImageRender"]
@@ -789,7 +790,7 @@ class RenderGroupClass(object):
 	@err_catcher(name=__name__)
 	def getStateData(self):
 		try:
-			stateDataRaw = json.loads(self.fuseFuncs.sm_readStates(self))
+			stateDataRaw = self.fuseFuncs.getStatesData()
 			return stateDataRaw['states']
 		
 		except:
@@ -797,17 +798,43 @@ class RenderGroupClass(object):
 			return None
 	
 
+	#	Returns the State name/UID maps, built once per State data.
+	#	The maps are rebuilt when the State store revision changes, and the
+	#	State data is only read then.
+	@err_catcher(name=__name__)
+	def getStateNameMaps(self):
+		self.fuseFuncs.flushStateSaves()
+		revision = Fus.getStateStoreRevision(self.fuseFuncs.getCurrentComp())
+		if self.stateNameMaps and revision and self.stateNameMaps[0] == revision:
+			return self.stateNameMaps[1], self.stateNameMaps[2]
+
+		stateData = self.getStateData()
+		if not stateData:
+			return {}, {}
+
+		revision = Fus.getStateStoreRevision()
+
+		uidToName = {}
+		nameToUid = {}
+
+		#	Itterates through states
+		for state in stateData:
+			if "stateclass" in state and "taskname" in state and "toolUID" in state:
+				#	Create displayName format
+				displayName = f"{state['stateclass']} - {state['taskname']}"
+				uidToName.setdefault(state["toolUID"], displayName)
+				nameToUid.setdefault(displayName, state["toolUID"])
+
+		self.stateNameMaps = (revision, uidToName, nameToUid)
+
+		return uidToName, nameToUid
+
+
 	@err_catcher(name=__name__)
 	def getStateNameFromUID(self, UID):
 		try:
-			stateData = self.getStateData()
-
-			#	Itterates through states
-			for state in stateData:
-				if "toolUID" in state and state["toolUID"] == UID:
-					#	Create displayName format
-					stateName = f"{state['stateclass']} - {state['taskname']}"
-					return stateName
+			uidToName, _ = self.getStateNameMaps()
+			return uidToName.get(UID)
 		except:
 			logger.debug(f"ERROR: Unable to get state name from: {UID}")
 
@@ -815,15 +842,8 @@ class RenderGroupClass(object):
 	@err_catcher(name=__name__)
 	def getStateUidFromName(self, stateName):
 		try:
-			stateData = self.getStateData()
-
-			#	Extract stateclass and taskname from stateName
-			for state in stateData:
-				if "stateclass" in state and "taskname" in state:
-					#	Create displayName format
-					displayName = f"{state['stateclass']} - {state['taskname']}"
-					if displayName == stateName:
-						return state["toolUID"]
+			_, nameToUid = self.getStateNameMaps()
+			return nameToUid.get(stateName)
 		except:
 			logger.debug(f"ERROR: Unable to get state UID from: {stateName}")
 
@@ -853,8 +873,10 @@ class RenderGroupClass(object):
 		selStatesUI.tw_steps.setColumnHidden(1, True)
 
 		#	Populate list of states using state names based on UID
+		uidToName, nameToUid = self.getStateNameMaps()
+		selStatesUI.tw_steps.setUpdatesEnabled(False)
 		for uid in stateList:
-			stateName = self.getStateNameFromUID(uid)
+			stateName = uidToName.get(uid)
 			if stateName:
 				rc = selStatesUI.tw_steps.rowCount()
 				selStatesUI.tw_steps.insertRow(rc)
@@ -865,6 +887,7 @@ class RenderGroupClass(object):
 				if uid in self.groupStates:
 					row_index = selStatesUI.tw_steps.rowCount() - 1
 					selStatesUI.tw_steps.setRangeSelected(QTableWidgetSelectionRange(row_index, 0, row_index, 0), True)
+		selStatesUI.tw_steps.setUpdatesEnabled(True)
 
 		result = selStatesUI.exec_()
 
@@ -881,11 +904,10 @@ class RenderGroupClass(object):
 			# 	Ensure the correct column
 			if i.column() == 0:
 				#	Finds the corresponding UID
-				selectedUID = self.getStateUidFromName(i.text())
+				selectedUID = nameToUid.get(i.text())
 				if selectedUID:
 					self.groupStates.append(selectedUID)
-					stateName = self.getStateNameFromUID(selectedUID)
-					logger.debug(f"Added '{stateName}' state to RenderGroup")
+					logger.debug(f"Added '{uidToName.get(selectedUID)}' state to RenderGroup")
 
 		self.updateUi()
 		self.stateManager.saveStatesToScene()
@@ -897,8 +919,9 @@ class RenderGroupClass(object):
 		self.tw_renderStates.clear()
 
 		# Populate State List from UID's
+		uidToName, _ = self.getStateNameMaps()
 		for stateUID in self.groupStates:
-			stateName = self.getStateNameFromUID(stateUID)
+			stateName = uidToName.get(stateUID)
 
 			# Create the list item and set its text
 			item = QListWidgetItem(stateName)
@@ -1290,12 +1313,13 @@ class RenderGroupClass(object):
 			#	Gets group stateNames from UID's
 			renderStatesNames = []
 			missingSaverList = []
+			uidToName, _ = self.getStateNameMaps()
 			for toolUID in self.groupStates:
 				#	Gets the State names in group
-				renderStatesNames.append(self.getStateNameFromUID(toolUID))
+				renderStatesNames.append(uidToName.get(toolUID))
 				#	If the associated Saver does not exist
 				if not Fus.toolExists(comp, toolUID):
-					missingSaverList.append(self.getStateNameFromUID(toolUID))
+					missingSaverList.append(uidToName.get(toolUID))
 			
 			#	Makes the warning string for Group states
 			if len(renderStatesNames) > 0:
@@ -40,10 +40,11 @@ from qtpy.QtCore import *
 from qtpy.QtGui import *
 from qtpy.QtWidgets import *
 
-from PrismUtils.Decorators import err_catcher
+from Libs.Prism_Fusion_lib_Profiler import err_catcher
 
 import Libs.Prism_Fusion_lib_Fus as Fus
 import Libs.Prism_Fusion_lib_Helper as Helper
+import Libs.Prism_Fusion_lib_Cache as Cache
 
 from typing import TYPE_CHECKING, Union, Dict, Any, Tuple
 if TYPE_CHECKING:
@@ -632,7 +633,7 @@ class USD_MaterialClass(object):
                 path = textureFiles[0]
                 texDir = os.path.dirname(path)
                 #   Loop through files to get full filepaths
-                for file in os.listdir(texDir):
+                for file in Cache.listDir(texDir):
                     fullPath = os.path.join(texDir, file)
                     full_fileList.append(fullPath)
 
@@ -757,99 +758,101 @@ class USD_MaterialClass(object):
     # Receive the texture list and populate the table
     @err_catcher(name=__name__)
     def populateTextList(self, textureFiles):
-        # Clear the table
-        self.tw_textureFiles.setRowCount(0)
+        with self.fuseFuncts.stateSaveBatch():
+            # Clear the table
+            self.tw_textureFiles.setRowCount(0)
 
-        # Get the table's text color
-        tableTextColor = self.tw_textureFiles.palette().color(QPalette.Text)
+            # Get the table's text color
+            tableTextColor = self.tw_textureFiles.palette().color(QPalette.Text)
 
-        # Loop through the texture files and add rows to the table
-        for row, filePath in enumerate(textureFiles):
-            if self.isSupportedFormat(filePath):
-                fileName = os.path.basename(filePath)
-                rowPosition = self.tw_textureFiles.rowCount()
+            # Loop through the texture files and add rows to the table
+            for row, filePath in enumerate(textureFiles):
+                if self.isSupportedFormat(filePath):
+                    fileName = os.path.basename(filePath)
+                    rowPosition = self.tw_textureFiles.rowCount()
+
+                    # Insert a new row
+                    self.tw_textureFiles.insertRow(rowPosition)
+
+                    # Attempt to match texType from the fileName
+                    matchedTexType = self.matchTexType(fileName, textureFiles)
+
+                    # Add Map column with a combo box
+                    mapComboBox = QComboBox()
+                    mapComboBox.currentIndexChanged.connect(lambda index, r=row: self.updateTexType(r))
+                    mapComboBox.addItem("NONE")
+                    for texType in TEXTYPES.keys():
+                        mapComboBox.addItem(texType.capitalize())
+                    if matchedTexType:
+                        index = mapComboBox.findText(matchedTexType.capitalize())
+                        if index != -1:
+                            mapComboBox.setCurrentIndex(index)
+                    else:
+                        mapComboBox.setCurrentIndex(0)
+
+                    # Apply the same text color as the table
+                    mapComboBox.setStyleSheet(f"QComboBox {{ color: {tableTextColor.name()}; }}")
+                    self.tw_textureFiles.setCellWidget(rowPosition, 0, mapComboBox)
+
+                    # Add File column with the file name
+                    fileItem = QTableWidgetItem(fileName)
+                    self.tw_textureFiles.setItem(rowPosition, 1, fileItem)
+
+                    # Add Path column with the full file path (hidden)
+                    pathItem = QTableWidgetItem(filePath)
+                    self.tw_textureFiles.setItem(rowPosition, 2, pathItem)
+
+            self.saveTexList()
+
+
+    @err_catcher(name=__name__)
+    def refreshTexList(self):
+        with self.fuseFuncts.stateSaveBatch():
+            # Clear the table
+            self.tw_textureFiles.setRowCount(0)
+
+            # Force text color to white
+            forcedTextColor = "#D0D0D0"
+
+            # Loop through self.textureFiles and add rows to the table
+            for row, texFile in enumerate(self.textureFiles):
+                filePath = texFile.get("path", "")
+                fileName = texFile.get("file", "")
+                texType = texFile.get("map", "NONE")
 
                 # Insert a new row
+                rowPosition = self.tw_textureFiles.rowCount()
                 self.tw_textureFiles.insertRow(rowPosition)
 
-                # Attempt to match texType from the fileName
-                matchedTexType = self.matchTexType(fileName, textureFiles)
-
                 # Add Map column with a combo box
                 mapComboBox = QComboBox()
                 mapComboBox.currentIndexChanged.connect(lambda index, r=row: self.updateTexType(r))
                 mapComboBox.addItem("NONE")
-                for texType in TEXTYPES.keys():
-                    mapComboBox.addItem(texType.capitalize())
-                if matchedTexType:
-                    index = mapComboBox.findText(matchedTexType.capitalize())
+                for texTypeKey in TEXTYPES.keys():
+                    mapComboBox.addItem(texTypeKey.capitalize())
+                if texType:
+                    index = mapComboBox.findText(texType.capitalize())
                     if index != -1:
                         mapComboBox.setCurrentIndex(index)
                 else:
                     mapComboBox.setCurrentIndex(0)
 
-                # Apply the same text color as the table
-                mapComboBox.setStyleSheet(f"QComboBox {{ color: {tableTextColor.name()}; }}")
+                # Manually set combo box text color to white
+                mapComboBox.setStyleSheet(f"QComboBox {{ color: {forcedTextColor}; }}")
                 self.tw_textureFiles.setCellWidget(rowPosition, 0, mapComboBox)
 
                 # Add File column with the file name
                 fileItem = QTableWidgetItem(fileName)
+                fileItem.setForeground(QBrush(QColor(forcedTextColor)))  # Set text to white
                 self.tw_textureFiles.setItem(rowPosition, 1, fileItem)
 
                 # Add Path column with the full file path (hidden)
                 pathItem = QTableWidgetItem(filePath)
+                pathItem.setForeground(QBrush(QColor(forcedTextColor)))  # Set text to white
                 self.tw_textureFiles.setItem(rowPosition, 2, pathItem)
 
-        self.saveTexList()
-
-
-    @err_catcher(name=__name__)
-    def refreshTexList(self):
-        # Clear the table
-        self.tw_textureFiles.setRowCount(0)
-
-        # Force text color to white
-        forcedTextColor = "#D0D0D0"
-
-        # Loop through self.textureFiles and add rows to the table
-        for row, texFile in enumerate(self.textureFiles):
-            filePath = texFile.get("path", "")
-            fileName = texFile.get("file", "")
-            texType = texFile.get("map", "NONE")
-
-            # Insert a new row
-            rowPosition = self.tw_textureFiles.rowCount()
-            self.tw_textureFiles.insertRow(rowPosition)
-
-            # Add Map column with a combo box
-            mapComboBox = QComboBox()
-            mapComboBox.currentIndexChanged.connect(lambda index, r=row: self.updateTexType(r))
-            mapComboBox.addItem("NONE")
-            for texTypeKey in TEXTYPES.keys():
-                mapComboBox.addItem(texTypeKey.capitalize())
-            if texType:
-                index = mapComboBox.findText(texType.capitalize())
-                if index != -1:
-                    mapComboBox.setCurrentIndex(index)
-            else:
-                mapComboBox.setCurrentIndex(0)
-
-            # Manually set combo box text color to white
-            mapComboBox.setStyleSheet(f"QComboBox {{ color: {forcedTextColor}; }}")
-            self.tw_textureFiles.setCellWidget(rowPosition, 0, mapComboBox)
-
-            # Add File column with the file name
-            fileItem = QTableWidgetItem(fileName)
-            fileItem.setForeground(QBrush(QColor(forcedTextColor)))  # Set text to white
-            self.tw_textureFiles.setItem(rowPosition, 1, fileItem)
-
-            # Add Path column with the full file path (hidden)
-            pathItem = QTableWidgetItem(filePath)
-            pathItem.setForeground(QBrush(QColor(forcedTextColor)))  # Set text to white
-            self.tw_textureFiles.setItem(rowPosition, 2, pathItem)
-
-        # Optionally save the table state
-        self.saveTexList()
+            # Optionally save the table state
+            self.saveTexList()
 
 
     #   Clears all items from list
@@ -0,0 +1,52 @@
+#   Headless tests of the plugin libraries against the mock Fusion in
+#   Libs/Prism_Fusion_lib_MockFusion.py.  Run from the repository root:
+#
+#       python -m pytest tests
+#
+#   The plugin libraries import err_catcher from Prism.  If PrismUtils is not
+#   on the path, a stand-in that returns the functions unchanged is used.
+
+import os
+import sys
+import types
+
+import pytest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Fusion", "Scripts")
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+try:
+    import PrismUtils.Decorators
+except ImportError:
+    def _err_catcher(name=None):
+        return lambda func: func
+
+    _prismUtils = types.ModuleType("PrismUtils")
+    _decorators = types.ModuleType("PrismUtils.Decorators")
+    _decorators.err_catcher = _err_catcher
+    _prismUtils.Decorators = _decorators
+    sys.modules["PrismUtils"] = _prismUtils
+    sys.modules["PrismUtils.Decorators"] = _decorators
+
+import Libs.Prism_Fusion_lib_Cache as Cache
+import Libs.Prism_Fusion_lib_MockFusion as MockFusion
+
+
+#   Keeps the plugin cache (manifests, benchmark history) out of the temp dir
+@pytest.fixture(autouse=True)
+def cacheRoot(tmp_path, monkeypatch):
+    cacheDir = tmp_path / "cache"
+    monkeypatch.setattr(Cache, "CACHE_ROOT", str(cacheDir))
+    Cache.invalidateMediaVersions()
+    return cacheDir
+
+
+@pytest.fixture
+def fusion():
+    return MockFusion.MockFusion()
+
+
+@pytest.fixture
+def comp(fusion):
+    return fusion.NewComp("Shot_010")
@@ -0,0 +1,122 @@
+import os
+import time
+import types
+
+import pytest
+
+import Libs.Prism_Fusion_lib_Cache as Cache
+
+
+AOV_COUNT = 200
+CHANNEL_COUNT = 40
+
+
+@pytest.fixture(scope="module")
+def ImageImport():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QtWidgets = pytest.importorskip("qtpy.QtWidgets")
+    QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    import StateManagerNodes.fus_Image_Import as ImageImport
+    return ImageImport
+
+
+#   Image Import State with only the AOV tree, without Prism and Fusion
+@pytest.fixture
+def state(ImageImport):
+    from qtpy.QtWidgets import QTreeView
+
+    class _TreeState(ImageImport.Image_ImportClass):
+        def __init__(self):
+            self.importData = {}
+            self.fileSignatures = {}
+            self.saves = 0
+            self.seqChecks = []
+            self.fuseFuncts = types.SimpleNamespace(useAovThumbs="Disabled", thumbThreads=1)
+            self.stateManager = types.SimpleNamespace(saveImports=self.countSave, saveStatesToScene=lambda: None)
+            self.lw_objects = QTreeView()
+            self.setupAovTree()
+
+        def countSave(self):
+            self.saves += 1
+
+        def updateAovStatus(self):
+            pass
+
+        def checkSequences(self, seqItems):
+            self.seqChecks.append(len(seqItems))
+
+    return _TreeState()
+
+
+def _makeImportData(aovCount:int=AOV_COUNT, channelCount:int=CHANNEL_COUNT) -> dict:
+    files = [{"basefile": f"/renders/v001/aov{aovIdx:03d}/Shot_010_aov{aovIdx:03d}.####.exr",
+              "aov": f"aov{aovIdx:03d}",
+              "channel": f"channel{channelIdx:02d}",
+              "frame_start": 1001,
+              "frame_end": 1100,
+              "fileUID": f"{aovIdx}_{channelIdx}"}
+             for aovIdx in range(aovCount) for channelIdx in range(channelCount)]
+
+    return {"identifier": "Shot_010_Comp", "version": "v001", "files": files}
+
+
+def test_aov_tree_benchmark(state):
+    state.importData = _makeImportData()
+
+    startTime = time.perf_counter()
+    state.updateAovChnlTree()
+    buildTime = time.perf_counter() - startTime
+
+    items = dict(state.aovTreeModel.items)
+    assert len(items) == 1 + AOV_COUNT + AOV_COUNT * CHANNEL_COUNT
+    assert state.saves == 1
+
+    #   Unchanged rows keep their items and nothing is saved
+    startTime = time.perf_counter()
+    state.updateAovChnlTree()
+    diffTime = time.perf_counter() - startTime
+
+    assert state.aovTreeModel.items == items
+    assert state.saves == 1
+
+    #   One new AOV only adds its rows
+    state.importData["files"] += _makeImportData(AOV_COUNT + 1)["files"][-CHANNEL_COUNT:]
+    startTime = time.perf_counter()
+    state.updateAovChnlTree()
+    addTime = time.perf_counter() - startTime
+
+    assert len(state.aovTreeModel.items) == len(items) + 1 + CHANNEL_COUNT
+    assert all(state.aovTreeModel.items[key] is item for key, item in items.items())
+    assert state.saves == 2
+
+    print(f"\n{AOV_COUNT} AOVs x {CHANNEL_COUNT} channels:  build {buildTime * 1000:.1f} ms, "
+          f"unchanged {diffTime * 1000:.1f} ms, one AOV added {addTime * 1000:.1f} ms")
+
+
+def test_thumb_signatures_are_read_once_per_refresh(state, monkeypatch, tmp_path):
+    filePath = str(tmp_path / "beauty.exr")
+    with open(filePath, "wb") as f:
+        f.write(b"frame")
+
+    stats = []
+    getFileSignature = Cache.getFileSignature
+    monkeypatch.setattr(Cache, "getFileSignature", lambda path: stats.append(path) or getFileSignature(path))
+
+    state.importData = _makeImportData(1, 1)
+    state.updateAovChnlTree()
+    item = state.aovTreeModel.items[("channel", "aov000", "channel00")]
+    item.thumb = {"path": filePath, "basefile": filePath, "thumbPath": filePath,
+                  "signature": getFileSignature(filePath), "width": 64, "height": 36,
+                  "channel": "channel00", "allowThumb": True, "ready": True, "cacheKey": None}
+
+    #   Scrolling and tooltips reuse the signature read in this refresh
+    for _idx in range(100):
+        assert state.getAovThumbParams(item) is item.thumb
+        state.getAovThumbCacheKey(item.thumb)
+    assert stats == [filePath]
+
+    #   The next refresh reads it again
+    state.updateAovChnlTree()
+    state.getAovThumbParams(item)
+    assert stats == [filePath, filePath]
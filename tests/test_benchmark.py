@@ -0,0 +1,94 @@
+import pytest
+
+import Libs.Prism_Fusion_lib_Fus as Fus
+import Libs.Prism_Fusion_lib_Benchmark as Benchmark
+import Libs.Prism_Fusion_lib_MockFusion as MockFusion
+
+
+def _prismData(idx:int, tool) -> dict:
+    return {"Prism_UUID": f"uid{idx}",
+            "Prism_ToolData": {"toolName": f"Tool{idx}", "stateUID": f"state{idx % 100}", "listType": "import2d"}}
+
+
+#   Builds a Comp of the size and returns the benchmark cases against it
+def _makeCases(toolCount:int, latency:float=0.0):
+    fusion = MockFusion.MockFusion(latency=latency)
+    comp = fusion.NewComp(f"Bench_{toolCount}")
+    comp.populate(toolCount, dataFunc=_prismData)
+    Fus.invalidateToolIndex()
+
+    cases = {
+        "getCompSnapshot": lambda: Fus.getCompSnapshot(comp),
+        "buildToolIndex": lambda: Fus.getToolIndex(comp, rebuild=True),
+        "getToolByUID": lambda: [Fus.getToolByUID(comp, f"uid{idx}") for idx in range(0, toolCount, 10)],
+        }
+
+    return fusion, cases
+
+
+@pytest.mark.parametrize("toolCount", [100, 1000])
+def test_call_counts_scale_with_comp(toolCount):
+    fusion, cases = _makeCases(toolCount)
+
+    run = Benchmark.runBenchmark(cases, {"tools": toolCount}, repeat=2, counter=fusion.getCallCount, save=False)
+
+    #   The FlowView, one listing, and two GetData, GetAttrs and GetPosTable per tool
+    assert run["cases"]["getCompSnapshot"]["calls"] == 2 + 1 + 4 * toolCount
+    assert run["cases"]["buildToolIndex"]["calls"] <= 2 + 3 * toolCount
+    #   Indexed lookups only check the Comp name and validate the tool
+    assert run["cases"]["getToolByUID"]["calls"] == 2 * (toolCount // 10)
+
+
+def test_latency_is_simulated():
+    fusion, cases = _makeCases(50, latency=0.0005)
+
+    case = Benchmark.runCase(cases["getCompSnapshot"], repeat=1, counter=fusion.getCallCount)
+
+    assert case["seconds"] >= case["calls"] * 0.0005
+
+
+def test_history_diffs():
+    fusion, cases = _makeCases(100)
+    sizes = {"tools": 100, "states": 0, "aovs": 0}
+
+    firstRun = Benchmark.runBenchmark(cases, sizes, repeat=1, counter=fusion.getCallCount)
+    secondRun = Benchmark.runBenchmark(cases, sizes, repeat=1, counter=fusion.getCallCount)
+
+    history = Benchmark.loadHistory()
+    assert len(history) == 2
+    assert Benchmark.getPreviousRun(secondRun, history) == firstRun
+
+    diffs = Benchmark.compareRuns(secondRun, firstRun)
+    assert diffs["getCompSnapshot"]["calls"] == diffs["getCompSnapshot"]["prevCalls"]
+    assert "getCompSnapshot:" in Benchmark.formatRun(secondRun, firstRun)
+
+
+def test_mock_benchmark_sizes():
+    runs = Benchmark.runMockBenchmark(repeat=1)
+
+    assert [(run["sizes"]["tools"], run["sizes"]["states"]) for run in runs] == \
+        [(tools, states) for tools in Benchmark.MOCK_TOOL_COUNTS for states in Benchmark.MOCK_STATE_COUNTS]
+    assert len(Benchmark.loadHistory()) == len(runs)
+
+    for run in runs:
+        tools, states = run["sizes"]["tools"], run["sizes"]["states"]
+        cases = run["cases"]
+        print(f"\n{tools} tools, {states} states: " +
+              ", ".join(f"{name} {case['seconds'] * 1000:.1f} ms / {case['calls']} calls" for name, case in cases.items()))
+
+        assert cases["getCompSnapshot"]["calls"] == 3 + 4 * tools
+        #   One store index read and one read per State entry
+        assert cases["getStatesData"]["calls"] <= 4 + states
+        #   Saving one changed State does not scale with the State count
+        assert cases["saveState"]["calls"] <= 10
+        assert cases["getStateTools"]["calls"] <= tools + 2 * states
+
+
+def test_mock_runs_compare_to_mock_runs():
+    liveRun = Benchmark.runBenchmark({}, {"tools": 100, "states": 10, "aovs": 40})
+    firstRun, = Benchmark.runMockBenchmark([100], [10], repeat=1)
+    assert Benchmark.getPreviousRun(firstRun) is None
+
+    secondRun, = Benchmark.runMockBenchmark([100], [10], repeat=1)
+    assert Benchmark.getPreviousRun(secondRun) == firstRun
+    assert Benchmark.getPreviousRun(liveRun) is None
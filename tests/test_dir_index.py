@@ -0,0 +1,39 @@
+import os
+
+import Libs.Prism_Fusion_lib_Cache as Cache
+import Libs.Prism_Fusion_lib_Helper as Helper
+import Libs.Prism_Fusion_lib_Benchmark as Benchmark
+
+
+def _getSequenceInfo(dirPath:str) -> dict:
+    return Cache.getDirData(dirPath, "sequenceInfo", lambda names: Helper.getSequenceInfo(sorted(names)))
+
+
+def test_sequence_info_follows_directory(tmp_path):
+    dirPath, = Benchmark.makeSequenceDirs(str(tmp_path), fileCount=20, aovCount=1, gapEvery=10)
+
+    info = _getSequenceInfo(dirPath)
+    assert info["pattern"] == "Shot_010_Comp_aov00.######.exr"
+    assert info["gaps"] == [(1010, 1010), (1020, 1020)]
+    assert len(info["frames"]) == 20
+
+    #   A new frame changes the directory and the sequence is detected again
+    open(os.path.join(dirPath, "Shot_010_Comp_aov00.001010.exr"), "wb").close()
+    os.utime(dirPath, ns=(0, os.stat(dirPath).st_mtime_ns + 1000))
+    assert _getSequenceInfo(dirPath)["gaps"] == [(1020, 1020)]
+
+    Cache.invalidateDirIndex()
+
+
+def test_dir_scan_benchmark(tmp_path):
+    dirPaths = Benchmark.makeSequenceDirs(str(tmp_path))
+
+    run = Benchmark.runDirScanBenchmark(dirPaths, repeat=2)
+    cases = run["cases"]
+
+    print(f"\n{run['sizes']['files']} files in {run['sizes']['dirs']} folders:  "
+          + ",  ".join(f"{name} {case['seconds'] * 1000:.1f} ms" for name, case in cases.items()))
+
+    assert run["sizes"] == {"files": Benchmark.SCAN_FILE_COUNT, "dirs": Benchmark.SCAN_AOV_COUNT, "source": "dirScan"}
+    assert cases["dirIndexWarm"]["seconds"] * 10 < cases["listdir"]["seconds"]
+    assert Benchmark.loadHistory()[-1] == run
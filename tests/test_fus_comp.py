@@ -0,0 +1,235 @@
+import time
+
+import pytest
+
+import Libs.Prism_Fusion_lib_Fus as Fus
+
+
+def _prismData(idx:int, tool) -> dict:
+    if idx % 2:
+        return {}
+    return {"Prism_UUID": f"uid{idx}",
+            "Prism_ToolData": {"toolName": f"Tool{idx}", "stateUID": f"state{idx % 10}", "listType": "import2d"}}
+
+
+@pytest.fixture(autouse=True)
+def resetFus():
+    Fus.invalidateToolIndex()
+    yield
+    Fus.invalidateToolIndex()
+
+
+def test_snapshot_reads_each_tool_once(fusion, comp):
+    comp.populate(100, dataFunc=_prismData)
+
+    records = Fus.getCompSnapshot(comp)
+
+    assert len(records) == 100
+    assert fusion.getCallCount("Composition.GetToolList") == 1
+    assert fusion.getCallCount("Tool.GetAttrs") == 100
+    assert fusion.getCallCount("FlowView.GetPosTable") == 100
+    #   Prism_ToolData is only read for tools with a UID
+    assert fusion.getCallCount("Tool.GetData") == 150
+
+    byUID = Fus.getSnapshotByUID(records)
+    assert len(byUID) == 50
+    assert byUID["uid2"]["pos"] == [2.0, 0.0]
+    assert byUID["uid2"]["type"] == "Loader"
+
+
+def test_snapshot_dataOnly(fusion, comp):
+    comp.populate(40, dataFunc=_prismData)
+
+    records = Fus.getCompSnapshot(comp, prismOnly=True, dataOnly=True)
+
+    assert len(records) == 20
+    assert fusion.getCallCount("Tool.GetAttrs") == 0
+    assert fusion.getCallCount("FlowView.GetPosTable") == 0
+
+
+def test_transaction_locks_once(fusion, comp):
+    records = []
+    Fus.addTransactionHook(records.append)
+    try:
+        with Fus.compTransaction(comp, "Add Loaders"):
+            for idx in range(10):
+                Fus.addTool(comp, "Loader", {"toolName": f"Ldr{idx}", "toolUID": f"uid{idx}"}, idx, 0, 0)
+                #   Nested transactions join the open one
+                with Fus.compTransaction(comp, "Inner"):
+                    Fus.setToolPosition(comp.CurrentFrame.FlowView, comp.FindTool(f"Ldr{idx}"), idx, 1)
+    finally:
+        Fus.removeTransactionHook(records.append)
+
+    assert comp.undoSteps == ["Add Loaders"]
+    assert comp.lockCount == 0
+    assert fusion.getCallCount("Composition.Lock") == 1
+    assert len(records) == 1
+    assert records[0]["name"] == "Add Loaders"
+    assert records[0]["ops"] == 40
+    assert not records[0]["failed"]
+
+
+def test_transaction_unwinds_on_error(comp):
+    records = []
+    Fus.addTransactionHook(records.append)
+    try:
+        with pytest.raises(RuntimeError):
+            with Fus.compTransaction(comp, "Broken"):
+                Fus.addTool(comp, "Loader", {}, 0, 0, 0)
+                raise RuntimeError("failed edit")
+    finally:
+        Fus.removeTransactionHook(records.append)
+
+    assert comp.lockCount == 0
+    assert comp.undoStack == []
+    assert comp.undoSteps == ["Broken"]
+    assert records[0]["failed"]
+    assert Fus.getTransactionStats()["Broken"]["count"] >= 1
+
+
+def test_tool_index_lookups(fusion, comp):
+    comp.populate(200, dataFunc=_prismData)
+
+    Fus.getToolIndex(comp)
+    listCalls = fusion.getCallCount("Composition.GetToolList")
+
+    for idx in range(0, 200, 2):
+        assert Fus.getToolByUID(comp, f"uid{idx}").GetData("Prism_UUID") == f"uid{idx}"
+    assert len(Fus.getAllPrismTools(comp, category="import2d")) == 100
+
+    #   Lookups do not list the Comp again
+    assert fusion.getCallCount("Composition.GetToolList") == listCalls
+
+    #   A Tool deleted outside the plugin makes the index rebuild once
+    comp.FindTool("Loader1").Delete()
+    assert Fus.getToolByUID(comp, "uid0") is None
+    assert Fus.getToolIndexStats()["tools"] == 99
+
+
+def test_snapshot_pos_uses_table_keys(comp, monkeypatch):
+    comp.AddTool("Loader", 3, 7)
+    flow = comp.CurrentFrame.FlowView
+
+    #   The bridge does not guarantee the order of the table
+    monkeypatch.setattr(flow, "GetPosTable", lambda tool: {2: 7.0, 1: 3.0})
+
+    assert Fus.getCompSnapshot(comp)[0]["pos"] == [3.0, 7.0]
+
+
+def test_state_tools_are_validated(comp):
+    comp.populate(40, dataFunc=_prismData)
+
+    assert len(Fus.getStateToolsByUID(comp)) == 20
+    assert sorted(Fus.getStateToolsByUID(comp, "state2")) == ["uid12", "uid2", "uid22", "uid32"]
+
+    #   Deleted Tools are not returned from the index
+    comp.FindTool("Loader3").Delete()
+    assert "uid2" not in Fus.getStateToolsByUID(comp)
+    assert sorted(Fus.getStateToolsByUID(comp, "state2")) == ["uid12", "uid22", "uid32"]
+
+
+def test_state_nodes_are_validated(comp):
+    Fus3d = pytest.importorskip("Libs.Prism_Fusion_lib_3d")
+    comp.populate(40, dataFunc=_prismData)
+
+    assert len(Fus3d.getAllNodes(comp)) == 20
+    assert sorted(Fus3d.getStateNodesList(comp, "state2")) == ["uid12", "uid2", "uid22", "uid32"]
+
+    #   Deleted Tools are not returned from the index
+    comp.FindTool("Loader3").Delete()
+    assert "uid2" not in Fus3d.getAllNodes(comp)
+    assert sorted(Fus3d.getStateNodesList(comp, "state2")) == ["uid12", "uid22", "uid32"]
+
+
+def test_add_tool_reads_no_attrs(fusion, comp):
+    comp.populate(10, dataFunc=_prismData)
+    Fus.getToolIndex(comp)
+    fusion.resetCalls()
+
+    tool = Fus.addTool(comp, "Loader", {"toolName": "NewLdr", "toolUID": "newUid", "stateUID": "stateX"})
+    Fus.updateToolData(tool, {"mediaId": "x"})
+
+    assert fusion.getCallCount("Tool.GetAttrs") == 0
+    assert Fus.getStateToolsByUID(comp, "stateX") == {"newUid": tool}
+    assert Fus.getToolIndex(comp)["byType"]["Loader"][-1] == "newUid"
+
+
+def test_index_call_count_benchmark(fusion, comp):
+    toolCount = 1000
+    comp.populate(toolCount, dataFunc=_prismData)
+    uids = [f"uid{idx}" for idx in range(0, toolCount, 20)]
+    stateUIDs = [f"state{idx}" for idx in range(10)]
+
+    #   Before: every lookup lists the Comp and reads the data of each Tool
+    fusion.resetCalls()
+    start = time.perf_counter()
+    for uid in uids:
+        Fus.getToolByUID(comp, uid, cache=comp.GetToolList(False))
+    for stateUID in stateUIDs:
+        [t for t in Fus.getAllPrismTools(comp, cache=comp.GetToolList(False))
+         if Fus.getToolData(t).get("stateUID") == stateUID]
+    scanTime = time.perf_counter() - start
+    scanCalls = fusion.getCallCount()
+
+    #   After: one index build, then validated lookups
+    fusion.resetCalls()
+    start = time.perf_counter()
+    for uid in uids:
+        Fus.getToolByUID(comp, uid)
+    for stateUID in stateUIDs:
+        Fus.getToolsFromStateUIDs(comp, stateUID)
+    indexTime = time.perf_counter() - start
+    indexCalls = fusion.getCallCount()
+
+    print(f"\n{len(uids)} UID and {len(stateUIDs)} State lookups on {toolCount} Tools: "
+          f"scan {scanCalls} calls / {scanTime * 1000:.1f} ms, "
+          f"index {indexCalls} calls / {indexTime * 1000:.1f} ms")
+
+    assert indexCalls * 5 < scanCalls
+
+
+def _importLoaders(comp, count:int) -> None:
+    flow = comp.CurrentFrame.FlowView
+    for idx in range(count):
+        toolData = {"nodeName": f"Beauty_{idx}", "nodeUID": f"ldr{idx}", "stateUID": "state0",
+                    "filepath": f"/renders/beauty_{idx}.####.exr", "frame_start": 1001, "frame_end": 1100,
+                    "listType": "import2d"}
+        tool = Fus.addTool(comp, "Loader", toolData, 0, idx, 0)
+        Fus.setToolPosition(flow, tool, 1, idx)
+
+
+def test_transaction_import_benchmark():
+    import Libs.Prism_Fusion_lib_MockFusion as MockFusion
+
+    loaderCount = 50
+    fusion = MockFusion.MockFusion(redrawLatency=0.0005)
+
+    #   Before: every edit redraws the Flow and is its own undo entry
+    plainComp = fusion.NewComp("Plain")
+    startTime = time.perf_counter()
+    _importLoaders(plainComp, loaderCount)
+    plainTime = time.perf_counter() - startTime
+
+    #   After: one locked undo block for the whole import
+    Fus.invalidateToolIndex()
+    batchComp = fusion.NewComp("Batch")
+    records = []
+    Fus.addTransactionHook(records.append)
+    try:
+        startTime = time.perf_counter()
+        with Fus.compTransaction(batchComp, "Import Media"):
+            _importLoaders(batchComp, loaderCount)
+        batchTime = time.perf_counter() - startTime
+    finally:
+        Fus.removeTransactionHook(records.append)
+
+    print(f"\nImport of {loaderCount} Loaders:  plain {plainTime * 1000:.1f} ms / {plainComp.redraws} redraws / "
+          f"{plainComp.undoEntries} undo entries,  transaction {batchTime * 1000:.1f} ms / {batchComp.redraws} redraws / "
+          f"{batchComp.undoEntries} undo entries ({records[0]['ops']} operations)")
+
+    assert plainComp.redraws >= loaderCount * 5
+    assert plainComp.undoEntries == plainComp.redraws
+    assert batchComp.redraws == 0
+    assert batchComp.undoEntries == 0
+    assert batchComp.undoSteps == ["Import Media"]
+    assert batchTime * 2 < plainTime
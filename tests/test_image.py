@@ -0,0 +1,113 @@
+import os
+import struct
+import time
+
+import pytest
+
+import Libs.Prism_Fusion_lib_Image as Image
+
+
+def _attr(name:str, attrType:str, value:bytes) -> bytes:
+    return name.encode() + b"\0" + attrType.encode() + b"\0" + struct.pack("<i", len(value)) + value
+
+
+def _chlist(channels:list) -> bytes:
+    #   HALF channels with 1x1 sampling
+    return b"".join(channel.encode() + b"\0" + struct.pack("<iB3xii", 1, 0, 1, 1) for channel in channels) + b"\0"
+
+
+#   Writes the header of a scanline EXR with parts [(name, channels)] and
+#   empty offset tables, followed by padding bytes
+def _writeExr(filePath:str, parts:list, width:int=64, height:int=32, padding:int=0) -> None:
+    multiPart = len(parts) > 1
+    data = struct.pack("<II", Image.EXR_MAGIC, 2 | (Image.EXR_FLAG_MULTIPART if multiPart else 0))
+
+    for name, channels in parts:
+        data += _attr("channels", "chlist", _chlist(channels))
+        data += _attr("compression", "compression", b"\0")
+        data += _attr("dataWindow", "box2i", struct.pack("<iiii", 0, 0, width - 1, height - 1))
+        data += _attr("displayWindow", "box2i", struct.pack("<iiii", 0, 0, width - 1, height - 1))
+        if name:
+            data += _attr("name", "string", name.encode())
+        if multiPart:
+            data += _attr("type", "string", b"scanlineimage")
+            data += _attr("chunkCount", "int", struct.pack("<i", height))
+        data += b"\0"
+
+    if multiPart:
+        data += b"\0"
+
+    with open(filePath, "wb") as f:
+        f.write(data + b"\0" * (8 * height * len(parts) + padding))
+
+
+@pytest.fixture(autouse=True)
+def clearCache():
+    Image.clearExrHeaderCache()
+
+
+def test_single_part_layers(tmp_path):
+    filePath = str(tmp_path / "beauty.0001.exr")
+    _writeExr(filePath, [(None, ["R", "G", "B", "A", "diffuse.R", "diffuse.G", "diffuse.B", "depth.Z"])])
+
+    assert Image.getExrLayers(filePath) == ["Color", "diffuse", "depth"]
+    assert Image.getExrPartNames(filePath) == []
+    assert Image.getImageSize(filePath) == (64, 32)
+
+
+def test_multi_part_layers_are_part_names(tmp_path):
+    filePath = str(tmp_path / "multi.0001.exr")
+    _writeExr(filePath, [("rgba", ["R", "G", "B", "A"]),
+                         ("diffuse", ["R", "G", "B"]),
+                         ("specular", ["R", "G", "B"]),
+                         ("depth", ["depth.Z"])])
+
+    assert Image.getExrLayers(filePath) == ["rgba", "diffuse", "specular", "depth"]
+    assert Image.getExrPartNames(filePath) == ["rgba", "diffuse", "specular", "depth"]
+    assert Image.getExrChannels(filePath, "specular") == ["R", "G", "B"]
+    assert Image.getExrChannels(filePath, "depth") == ["depth.Z"]
+
+
+def test_other_formats_return_none(tmp_path):
+    filePath = str(tmp_path / "beauty.0001.png")
+    open(filePath, "wb").close()
+
+    assert Image.getExrLayers(filePath) is None
+
+
+#   The AOV thumbnail sizing used to decode each image with QPixmap
+def test_header_read_benchmark(tmp_path):
+    QtGui = pytest.importorskip("qtpy.QtGui")
+
+    pngPath = str(tmp_path / "plate.png")
+    qImage = QtGui.QImage(4096, 2160, QtGui.QImage.Format_RGB32)
+    qImage.fill(0x336699)
+    assert qImage.save(pngPath)
+
+    exrPath = str(tmp_path / "beauty.exr")
+    _writeExr(exrPath, [(None, ["R", "G", "B", "A"])], width=4096, height=2160, padding=64 * 1024 * 1024)
+
+    startTime = time.perf_counter()
+    decodedSize = QtGui.QImage(pngPath).size()
+    decodeTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    headerSize = Image.getImageSize(pngPath)
+    headerTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    with open(exrPath, "rb") as f:
+        f.read()
+    exrReadTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    exrSize = Image.getImageSize(exrPath)
+    exrHeaderTime = time.perf_counter() - startTime
+
+    print(f"\nPNG 4096x2160:  decode {decodeTime * 1000:.1f} ms, header {headerTime * 1000:.2f} ms"
+          f"\nEXR 64 MB:  full read {exrReadTime * 1000:.1f} ms, header {exrHeaderTime * 1000:.2f} ms")
+
+    assert headerSize == (decodedSize.width(), decodedSize.height())
+    assert exrSize == (4096, 2160)
+    assert headerTime < decodeTime / 5
+    assert exrHeaderTime < exrReadTime
@@ -0,0 +1,63 @@
+import Libs.Prism_Fusion_lib_Helper as Helper
+
+
+def _item(name:str, stateUID:str, mediaId:str, y:float, wireless:bool=False) -> dict:
+    item = {"id": name, "stateUID": stateUID, "mediaId": mediaId, "pos": [0, y],
+            "nextId": None, "inId": None, "inPos": None, "outId": None, "outPos": None}
+    if wireless:
+        item.update({"nextId": f"{name}_IN", "inId": f"{name}_IN", "inPos": [5, y],
+                     "outId": f"{name}_OUT", "outPos": [6, y]})
+    return item
+
+
+def test_empty():
+    assert Helper.calcLoaderLayout([], [], (0, 0), False) == {}
+
+
+def test_sorted_by_state_then_name():
+    items = [_item("b_Beauty", "s2", "m2", 4),
+             _item("a_Depth", "s1", "m1", 9),
+             _item("a_Beauty", "s1", "m1", 7)]
+
+    positions = Helper.calcLoaderLayout(items, ["s1", "s2"], (10, 20), False, offset=1.5, vertGap=1)
+
+    assert positions == {"a_Beauty": (10, 21.5),
+                         "a_Depth": (10, 22.5),
+                         #   Gap between Media IDs
+                         "b_Beauty": (10, 24.5)}
+
+
+def test_starts_at_topmost_loader():
+    items = [_item("A", "s1", "m1", 8), _item("B", "s1", "m1", 3)]
+
+    positions = Helper.calcLoaderLayout(items, ["s1"], (0, 100), True)
+
+    assert positions["A"] == (0, 3)
+    assert positions["B"] == (0, 4)
+
+
+def test_wireless_follow_loader():
+    items = [_item("A", "s1", "m1", 0, wireless=True)]
+
+    positions = Helper.calcLoaderLayout(items, ["s1"], (0, 0), False, offset=0, horzGap=1.1)
+
+    assert positions["A_IN"] == (2.2, 0)
+    assert positions["A_OUT"] == (2.2 + 1.1, 0)
+
+
+def test_far_wireless_out_is_kept():
+    item = _item("A", "s1", "m1", 0, wireless=True)
+    item["outPos"] = [50, 50]
+
+    positions = Helper.calcLoaderLayout([item], ["s1"], (0, 0), False)
+
+    assert "A_OUT" not in positions
+
+
+def test_large_layout_is_linear():
+    items = [_item(f"L{idx:05d}", f"s{idx % 50}", f"m{idx // 10}", idx) for idx in range(10000)]
+
+    positions = Helper.calcLoaderLayout(items, [f"s{idx}" for idx in range(50)], (0, 0), False)
+
+    assert len(positions) == 10000
+    assert len(set(positions.values())) == 10000
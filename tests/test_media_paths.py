@@ -0,0 +1,100 @@
+import os
+import time
+
+import Libs.Prism_Fusion_lib_Cache as Cache
+import Libs.Prism_Fusion_lib_Render as Render
+
+
+#   Stands in for core.mediaProducts.generateMediaProductPath() on a fake
+#   project tree:  the next version is found by listing the product folder
+class FakeMediaProducts(object):
+    def __init__(self, rootDir:str):
+        self.rootDir = rootDir
+        self.calls = 0
+
+
+    def generateMediaProductPath(self, task:str, extension:str, **kwargs) -> dict:
+        self.calls += 1
+        productDir = os.path.join(self.rootDir, "Renders", "2dRender", task)
+        os.makedirs(productDir, exist_ok=True)
+
+        versions = [name for name in os.listdir(productDir) if name.startswith("v")]
+        version = f"v{len(versions) + 1:04d}"
+        return {"path": os.path.join(productDir, version, f"{task}_{version}.####{extension}"),
+                "version": version}
+
+
+#   Same lookup as Prism_Fusion_Functions.generateMediaProductPath()
+def _generate(mediaProducts, **kwargs) -> dict:
+    key = Cache.getMediaPathKey(kwargs)
+    outputPathData = Cache.getCachedMediaPath(key)
+    if outputPathData:
+        return outputPathData
+
+    outputPathData = mediaProducts.generateMediaProductPath(**kwargs)
+    Cache.saveCachedMediaPath(key, outputPathData)
+    return outputPathData
+
+
+def test_repeated_lookups_use_the_registry(tmp_path):
+    mediaProducts = FakeMediaProducts(str(tmp_path))
+
+    for _ in range(3):
+        for idx in range(30):
+            assert _generate(mediaProducts, task=f"Saver{idx}", extension=".exr")["version"] == "v0001"
+
+    assert mediaProducts.calls == 30
+
+
+def test_new_version_invalidates(tmp_path):
+    mediaProducts = FakeMediaProducts(str(tmp_path))
+    outputPathData = _generate(mediaProducts, task="Beauty", extension=".exr")
+
+    #   A version created by the render drops the product from the registry
+    os.makedirs(os.path.dirname(outputPathData["path"]))
+    Cache.invalidateMediaVersions(outputPathData["path"])
+    assert _generate(mediaProducts, task="Beauty", extension=".exr")["version"] == "v0002"
+
+    #   A version created outside the session changes the product folder mtime
+    productDir = os.path.dirname(os.path.dirname(outputPathData["path"]))
+    os.makedirs(os.path.join(productDir, "v0002"))
+    os.utime(productDir, ns=(0, os.stat(productDir).st_mtime_ns + 1000000))
+    assert _generate(mediaProducts, task="Beauty", extension=".exr")["version"] == "v0003"
+    assert mediaProducts.calls == 3
+
+
+#   Render configuration of a 30 Saver group on a share where every folder
+#   creation takes 20 ms:  the paths are resolved in the main thread, and
+#   the folders are created in a pool
+def test_render_config_benchmark(tmp_path, monkeypatch):
+    makedirs = os.makedirs
+
+    def _slowMakedirs(*args, **kwargs):
+        time.sleep(0.02)
+        return makedirs(*args, **kwargs)
+
+    def _configure(rootDir:str, maxThreads:int) -> float:
+        mediaProducts = FakeMediaProducts(rootDir)
+        startTime = time.perf_counter()
+        paths = [_generate(mediaProducts, task=f"Saver{idx}", extension=".exr")["path"] for idx in range(30)]
+        with monkeypatch.context() as patch:
+            patch.setattr(os, "makedirs", _slowMakedirs)
+            assert Render.createOutputDirs([os.path.dirname(path) for path in paths], maxThreads=maxThreads) == {}
+        assert all(os.path.isdir(os.path.dirname(path)) for path in paths)
+        return time.perf_counter() - startTime
+
+    serialTime = _configure(str(tmp_path / "serial"), 1)
+    parallelTime = _configure(str(tmp_path / "parallel"), Render.OUTPUT_DIR_THREADS)
+
+    print(f"\n30 Savers:  serial {serialTime * 1000:.0f} ms, parallel {parallelTime * 1000:.0f} ms")
+    assert parallelTime < serialTime / 2
+
+
+def test_output_dir_errors(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+
+    errors = Render.createOutputDirs([str(blocker / "v0001"), str(tmp_path / "ok"), None])
+
+    assert list(errors) == [str(blocker / "v0001")]
+    assert (tmp_path / "ok").is_dir()
@@ -0,0 +1,139 @@
+import os
+import time
+
+import Libs.Prism_Fusion_lib_MockFusion as MockFusion
+
+
+def test_addTool_names_and_autoconnect(comp):
+    loader = comp.AddTool("Loader", 0, 0)
+    blur = comp.AddTool("Blur")
+    merge = comp.AddTool("Merge", 5, 5, 0)
+
+    assert [loader.Name, blur.Name, merge.Name] == ["Loader1", "Blur1", "Merge1"]
+    assert blur.Input.GetConnectedOutput().GetTool() is loader
+    assert merge.Background.GetConnectedOutput() is None
+    assert comp.CurrentFrame.FlowView.GetPosTable(blur) == {1: 1.0, 2: 0.0}
+    assert comp.FindTool("Blur1") is blur
+
+
+def test_data_and_attrs(comp):
+    tool = comp.AddTool("Loader", 0, 0)
+    toolData = {"toolName": "Beauty", "frame_start": 1}
+    tool.SetData("Prism_ToolData", toolData)
+    toolData["toolName"] = "Changed"
+
+    assert tool.GetData("Prism_ToolData") == {"toolName": "Beauty", "frame_start": 1}
+    assert tool.GetData("Prism_ToolData.toolName") == "Beauty"
+    assert tool.GetData("Missing") is None
+
+    tool.SetAttrs({"TOOLS_Name": "Beauty", "TOOLB_PassThrough": True})
+    assert tool.GetAttrs("TOOLS_Name") == "Beauty"
+    assert tool.GetAttrs()["TOOLB_PassThrough"] is True
+    assert comp.FindTool("Beauty") is tool
+    assert comp.FindTool("Loader1") is None
+
+
+def test_inputs_and_connections(comp):
+    loader = comp.AddTool("Loader", 0, 0)
+    saver = comp.AddTool("Saver", 1, 0, 0)
+
+    saver.Clip = "/renders/beauty.0001.png"
+    saver["OutputFormat"] = "PNGFormat"
+    saver.GlobalIn[0] = 1001
+    saver.ConnectInput("Input", loader)
+
+    assert saver.Clip[0] == "/renders/beauty.0001.png"
+    assert saver.GetInput("OutputFormat") == "PNGFormat"
+    assert saver.GlobalIn[0] == 1001
+    assert loader.FindMainOutput(1).GetConnectedInputs() == {1: saver.Input}
+
+    saver.ConnectInput("Input", None)
+    assert loader.FindMainOutput(1).GetConnectedInputs() == {}
+
+    loader.Delete()
+    assert comp.GetToolList() == {1: saver}
+
+
+def test_copy_paste_settings(comp):
+    loader = comp.AddTool("Loader", 0, 0)
+    blur = comp.AddTool("Blur", 2, 0)
+    blur.SetData("Prism_UUID", "abc")
+    blur.Size = 4.0
+
+    settings = comp.Copy([loader, blur])
+    assert comp.Paste(settings)
+
+    tools = comp.GetToolList()
+    assert len(tools) == 4
+    pasted = comp.FindTool("Blur2")
+    assert pasted.GetData("Prism_UUID") == "abc"
+    assert pasted.Size[0] == 4.0
+    assert pasted.Input.GetConnectedOutput().GetTool() is comp.FindTool("Loader2")
+
+    other = comp.AddTool("Blur", 4, 0, 0)
+    assert other.LoadSettings(blur.SaveSettings())
+    assert other.GetData("Prism_UUID") == "abc"
+
+
+def test_call_counter_and_latency(fusion, comp):
+    tool = comp.AddTool("Loader", 0, 0)
+    fusion.resetCalls()
+    fusion.methodLatency["Tool.GetData"] = 0.002
+
+    startTime = time.perf_counter()
+    for _ in range(5):
+        tool.GetData("Prism_UUID")
+    elapsed = time.perf_counter() - startTime
+
+    assert fusion.getCallCount("Tool.GetData") == 5
+    assert fusion.getCallCount() == 5
+    assert elapsed >= 0.01
+
+
+def test_populate_is_not_counted(fusion, comp):
+    comp.populate(50, dataFunc=lambda idx, tool: {"Prism_UUID": f"uid{idx}"})
+
+    assert fusion.getCallCount() == 0
+    assert len(comp.GetToolList()) == 50
+    assert fusion.getCallCount("Composition.GetToolList") == 1
+
+
+def test_render_writes_placeholders(tmp_path, comp):
+    saver = comp.AddTool("Saver", 0, 0)
+    saver.Clip = str(tmp_path / "out" / "beauty.0000.png")
+    skipped = comp.AddTool("Saver", 1, 0)
+    skipped.Clip = str(tmp_path / "out" / "skipped.0000.png")
+    skipped.SetAttrs({"TOOLB_PassThrough": True})
+
+    assert comp.Render({"Start": 1, "End": 3, "Wait": True})
+
+    assert sorted(os.listdir(tmp_path / "out")) == ["beauty.0001.png", "beauty.0002.png", "beauty.0003.png"]
+    assert comp.renders == [{"frames": [1, 2, 3], "savers": ["Saver1"]}]
+
+
+def test_save(tmp_path, comp):
+    comp.AddTool("Loader", 0, 0)
+    compPath = str(tmp_path / "shot.comp")
+
+    assert comp.Save(compPath)
+    assert comp.GetAttrs("COMPS_FileName") == compPath
+    assert os.path.getsize(compPath) > 0
+
+
+def test_edits_redraw_unless_locked(comp):
+    comp.populate(3)
+    assert (comp.redraws, comp.undoEntries) == (0, 0)
+
+    tool = comp.AddTool("Blur", 0, 0)
+    tool.Size = 2.0
+    comp.CurrentFrame.FlowView.SetPos(tool, 1, 1)
+    assert (comp.redraws, comp.undoEntries) == (3, 3)
+
+    comp.Lock()
+    comp.StartUndo("Edit")
+    tool.SetData("Prism_UUID", "abc")
+    tool.SetAttrs({"TOOLS_Name": "Soft"})
+    comp.EndUndo()
+    comp.Unlock()
+    assert (comp.redraws, comp.undoEntries) == (3, 3)
+    assert comp.undoSteps == ["Edit"]
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+import Libs.Prism_Fusion_lib_Render as Render
+import Libs.Prism_Fusion_lib_MockFusion as MockFusion
+
+
+@pytest.fixture(autouse=True)
+def fastPoll(monkeypatch):
+    monkeypatch.setattr(Render, "POLL_INTERVAL", 0.02)
+
+
+def _framesOnDisk(outputDir) -> list:
+    return sorted(int(name.split(".")[-2]) for name in os.listdir(outputDir))
+
+
+def test_queue_renders_all_chunks(tmp_path):
+    outputPath = str(tmp_path / "out" / "beauty.0000.png")
+    queue = Render.LocalRenderQueue("fusion", maxProcesses=3, buildArgs=MockFusion.makeMockRenderArgs())
+
+    for start, end in Render.splitFrames(list(range(1, 61)), queue.maxProcesses):
+        queue.addJob(f"beauty ({start}-{end})", str(tmp_path / "shot.comp"), start, end, [outputPath])
+
+    progress = []
+    assert queue.run(onProgress=lambda done, total, running: progress.append((done, total, running)))
+
+    assert len(queue.jobs) == 3
+    assert _framesOnDisk(tmp_path / "out") == list(range(1, 61))
+    assert progress[-1] == (60, 60, 0)
+    assert max(running for _done, _total, running in progress) <= 3
+
+
+def test_queue_retries_missing_frames(tmp_path):
+    outputPath = str(tmp_path / "out" / "beauty.0000.png")
+    mockArgs = MockFusion.makeMockRenderArgs(skipFrames=[5, 6, 7], exitCode=1)
+    fullArgs = MockFusion.makeMockRenderArgs()
+
+    #   The first process dies before frame 5, the retry renders the rest
+    def buildArgs(executable, job):
+        if job["attempt"] == 1:
+            return mockArgs(executable, job)
+        return fullArgs(executable, job)
+
+    queue = Render.LocalRenderQueue("fusion", maxProcesses=1, buildArgs=buildArgs)
+    queue.addJob("beauty", str(tmp_path / "shot.comp"), 1, 10, [outputPath])
+
+    assert queue.run()
+    assert _framesOnDisk(tmp_path / "out") == list(range(1, 11))
+    assert [(job["start"], job["end"]) for job in queue.jobs] == [(1, 10), (5, 7)]
+
+
+def test_queue_fails_after_retries(tmp_path):
+    outputPath = str(tmp_path / "out" / "beauty.0000.png")
+    queue = Render.LocalRenderQueue("fusion", maxProcesses=2,
+                                    buildArgs=MockFusion.makeMockRenderArgs(skipFrames=[3], exitCode=1))
+    queue.addJob("beauty", str(tmp_path / "shot.comp"), 1, 4, [outputPath])
+
+    assert not queue.run()
+    assert len(queue.failed) == 1
+    assert queue.failed[0]["attempt"] == Render.MAX_RETRIES + 1
+
+
+def test_queue_cancel(tmp_path):
+    outputPath = str(tmp_path / "out" / "beauty.0000.png")
+    queue = Render.LocalRenderQueue("fusion", maxProcesses=1,
+                                    buildArgs=MockFusion.makeMockRenderArgs(frameTime=0.5))
+    queue.addJob("beauty", str(tmp_path / "shot.comp"), 1, 20, [outputPath])
+    queue.addJob("beauty", str(tmp_path / "shot.comp"), 21, 40, [outputPath])
+
+    assert not queue.run(isCancelled=lambda: bool(queue.running))
+    assert queue.cancelled
+    assert not queue.pending and not queue.running
+
+
+def test_chunked_render_resumes(tmp_path, comp):
+    outputDir = tmp_path / "out"
+    outputs = [str(outputDir / "beauty.0000.png"), str(outputDir / "depth.0000.png")]
+    compPath = str(tmp_path / "shot.comp")
+    comp.AddTool("Saver", 0, 0)
+    comp.Save(compPath)
+
+    renderCmd = {"Start": 1, "End": 100}
+    frames = Render.getFramesFromRenderCmd(renderCmd)
+    fingerprint = Render.getCompFingerprint(compPath, renderCmd)
+
+    queue = Render.LocalRenderQueue("fusion", maxProcesses=4, buildArgs=MockFusion.makeMockRenderArgs())
+    assert Render.addChunkedJobs(queue, "beauty", compPath, frames, outputs, fingerprint) == 0
+    assert queue.run()
+    assert len(os.listdir(outputDir)) == 200
+
+    #   Damage one frame and remove another
+    open(Render.getFramePath(outputs[0], 42), "wb").close()
+    os.remove(Render.getFramePath(outputs[1], 77))
+
+    queue = Render.LocalRenderQueue("fusion", maxProcesses=4, buildArgs=MockFusion.makeMockRenderArgs())
+    assert Render.addChunkedJobs(queue, "beauty", compPath, frames, outputs, fingerprint) == 98
+    assert sorted((job["start"], job["end"]) for job in queue.jobs) == [(42, 42), (77, 77)]
+    assert queue.run()
+    assert queue.getDoneFrames() == 100
+    assert all(Render.isOutputValid(Render.getFramePath(path, frame)) for path in outputs for frame in frames)
+
+    #   A changed comp renders everything again
+    comp.AddTool("Blur", 1, 0)
+    comp.Save(compPath)
+    queue = Render.LocalRenderQueue("fusion", maxProcesses=4, buildArgs=MockFusion.makeMockRenderArgs())
+    newFingerprint = Render.getCompFingerprint(compPath, renderCmd)
+    assert Render.addChunkedJobs(queue, "beauty", compPath, frames, outputs, newFingerprint) == 0
+
+
+def test_render_comp_attrs_are_restored(comp):
+    renderCmd = {"HiQ": True, "MotionBlur": False, "SizeType": 2}
+    compAttrs = Render.getCompAttrsFromRenderCmd(renderCmd)
+    origAttrs = comp.GetAttrs()
+
+    origCompAttrs = Render.getOrigCompAttrs(comp, compAttrs)
+    comp.SetAttrs(compAttrs)
+    assert comp.GetAttrs("COMPI_ProxyScale") == 2
+
+    comp.SetAttrs(origCompAttrs)
+    assert sorted(origCompAttrs) == sorted(compAttrs)
+    assert comp.GetAttrs() == origAttrs
@@ -0,0 +1,132 @@
+import json
+import time
+
+import pytest
+
+import Libs.Prism_Fusion_lib_Fus as Fus
+
+
+STATE_COUNT = 300
+
+
+@pytest.fixture(autouse=True)
+def resetStore():
+    Fus.invalidateStateStore()
+    yield
+    Fus.invalidateStateStore()
+
+
+#   Records the bytes written with comp.SetData()
+@pytest.fixture
+def writes(comp):
+    written = []
+    setData = comp.SetData
+
+    def _setData(key, value=None):
+        written.append((key, len(value) if isinstance(value, str) else 0))
+        setData(key, value)
+
+    comp.SetData = _setData
+    return written
+
+
+def _makeStates(count:int=STATE_COUNT, withUID:bool=True) -> dict:
+    states = []
+    for idx in range(count):
+        state = {"statename": f"ImageRender_{idx}", "stateclass": "ImageRender",
+                 "taskname": "Comp", "comment": "", "outputFormat": ".exr",
+                 "frames": list(range(1001, 1011))}
+        if withUID:
+            state["stateUID"] = f"uid{idx:04d}"
+        states.append(state)
+
+    return {"states": states}
+
+
+def test_single_state_update_writes_one_entry(comp, writes):
+    stateData = _makeStates()
+    Fus.sm_saveStates(comp, json.dumps(stateData))
+    fullBytes = sum(size for _key, size in writes)
+    writes.clear()
+
+    stateData["states"][150]["comment"] = "changed"
+    startTime = time.perf_counter()
+    Fus.sm_saveStates(comp, json.dumps(stateData))
+    storeTime = time.perf_counter() - startTime
+
+    assert [key for key, _size in writes] == ["prismState_uid0150", "prismStateStore"]
+    assert sum(size for _key, size in writes) < fullBytes / 10
+    assert Fus.getStateDataByUID(comp, "uid0150")["comment"] == "changed"
+
+    #   The previous approach wrote the whole blob for each save
+    writes.clear()
+    startTime = time.perf_counter()
+    comp.SetData("prismStates", f"{json.dumps(stateData, indent=4)}_..._")
+    blobTime = time.perf_counter() - startTime
+    blobBytes = writes[0][1]
+
+    print(f"\n{STATE_COUNT} States, one changed:  store {storeTime * 1000:.2f} ms, "
+          f"legacy blob {blobTime * 1000:.2f} ms, {blobBytes} bytes")
+
+
+def test_reorder_without_uid_keeps_entries(comp, writes):
+    stateData = _makeStates(50, withUID=False)
+    Fus.sm_saveStates(comp, json.dumps(stateData))
+    writes.clear()
+
+    stateData["states"].reverse()
+    Fus.sm_saveStates(comp, json.dumps(stateData))
+
+    assert [key for key, _size in writes] == ["prismStateStore"]
+    names = [state["statename"] for state in Fus.getStatesData(comp)["states"]]
+    assert names == [f"ImageRender_{idx}" for idx in reversed(range(50))]
+
+
+def test_legacy_blob_only_on_scene_save(tmp_path, comp, writes):
+    stateData = _makeStates(20)
+    Fus.sm_saveStates(comp, json.dumps(stateData))
+    Fus.sm_saveImports(comp, "import1")
+    assert "prismStates" not in [key for key, _size in writes]
+
+    assert Fus.saveScene(comp, str(tmp_path / "shot.comp"))
+    legacyData = comp.GetData("prismStates")
+    assert json.loads(legacyData.split("_..._")[0]) == stateData
+    assert legacyData.endswith("_..._import1")
+
+    #   Saving again without changes does not rewrite the blob
+    writes.clear()
+    assert Fus.saveScene(comp, str(tmp_path / "shot.comp"))
+    assert writes == []
+
+    #   Later State changes do not touch the saved blob, and reading the
+    #   Comp again uses the store
+    stateData["states"][0]["comment"] = "changed"
+    Fus.sm_saveStates(comp, json.dumps(stateData))
+    Fus.invalidateStateStore()
+    assert Fus.getStatesData(comp)["states"][0]["comment"] == "changed"
+    assert comp.GetData("prismStates") == legacyData
+
+
+def test_legacy_blob_changed_by_older_version(comp):
+    Fus.sm_saveStates(comp, json.dumps(_makeStates(5)))
+    Fus.writeLegacyStates(comp)
+
+    olderData = _makeStates(2)
+    comp.SetData("prismStates", f"{json.dumps(olderData, indent=4)}_..._")
+    Fus.invalidateStateStore()
+
+    assert Fus.getStatesData(comp) == olderData
+
+
+def test_revision_check_reads_only_the_index(fusion, comp):
+    stateData = _makeStates(20)
+    Fus.sm_saveStates(comp, json.dumps(stateData))
+    revision = Fus.getStateStoreRevision(comp)
+
+    fusion.resetCalls()
+    assert Fus.getStateStoreRevision(comp) == revision
+    assert fusion.getCallCount("Composition.GetData") == 1
+
+    stateData["states"][3]["comment"] = "changed"
+    Fus.sm_saveStates(comp, json.dumps(stateData))
+    assert Fus.getStateStoreRevision(comp) != revision
@@ -0,0 +1,100 @@
+import struct
+import types
+
+import pytest
+
+import Libs.Prism_Fusion_lib_Fus as Fus
+import Libs.Prism_Fusion_lib_Video as Video
+
+
+def _atom(atomType:bytes, data:bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(data), atomType) + data
+
+
+#   Writes a QuickTime file with a video track of the frames in its sample table
+def _writeMov(filePath, frames:int) -> str:
+    hdlr = _atom(b"hdlr", b"\0" * 8 + b"vide" + b"\0" * 12)
+    stts = _atom(b"stts", b"\0" * 4 + struct.pack(">III", 1, frames, 1000))
+    minf = _atom(b"minf", _atom(b"stbl", stts))
+    trak = _atom(b"trak", _atom(b"mdia", hdlr + minf))
+
+    with open(filePath, "wb") as f:
+        f.write(_atom(b"ftyp", b"qt  ") + _atom(b"moov", trak))
+
+    return str(filePath).replace("\\", "/")
+
+
+@pytest.fixture
+def ImageImport():
+    pytest.importorskip("qtpy.QtCore")
+    import StateManagerNodes.fus_Image_Import as ImageImport
+    return ImageImport
+
+
+def test_cached_durations(tmp_path):
+    filePath = _writeMov(tmp_path / "shot.mov", 48)
+
+    assert Video.getCachedDurations([filePath]) == ({}, [filePath])
+    assert Video.getVideoDuration(filePath) == 48
+    assert Video.getCachedDurations([filePath]) == ({filePath: 48}, [])
+
+
+def test_probe_jobs_run_in_pool(tmp_path, ImageImport):
+    goodFile = _writeMov(tmp_path / "good.mov", 24)
+    badFile = str(tmp_path / "bad.mov")
+    with open(badFile, "wb") as f:
+        f.write(b"not a movie")
+
+    QtCore = pytest.importorskip("qtpy.QtCore")
+    app = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+    jobs = [ImageImport.VideoProbeJob(1, filePath, [filePath], None) for filePath in [goodFile, badFile]]
+    finished = []
+    pool = ImageImport.getVideoProbePool()
+    for job in jobs:
+        job.signals.finished.connect(finished.append)
+        pool.start(job)
+    pool.waitForDone()
+    #   The results are delivered on the UI thread
+    app.processEvents()
+
+    assert sorted(job.filePath for job in finished) == sorted([goodFile, badFile])
+    assert jobs[0].frames == 24
+    #   A failed probe is an unknown range, not an error
+    assert jobs[1].frames is None
+
+
+def test_probed_ranges_set_loaders(comp, ImageImport):
+    Fus.invalidateToolIndex()
+    loaderData = {"toolName": "Ldr", "toolUID": "ldr1", "stateUID": "state1",
+                  "filepath": "/media/shot.mov", "frame_start": 1, "frame_end": None}
+    loader = Fus.addTool(comp, "Loader", loaderData)
+
+    state = types.SimpleNamespace(
+        importData={"files": [{"basefile": "/media/shot.mov", "frame_start": 1, "frame_end": None},
+                              {"basefile": "/media/other.mov", "frame_start": 1, "frame_end": None}]},
+        stateUID="state1",
+        videoProbeJobs=[],
+        videoProbeResults=[],
+        videoProbeGeneration=1,
+        fuseFuncts=types.SimpleNamespace(getCurrentComp=lambda: comp),
+        stateManager=types.SimpleNamespace(saveStatesToScene=lambda: None),
+        updateAovChnlTree=lambda: None,
+        )
+    state.setVideoRanges = lambda videoFrames: ImageImport.Image_ImportClass.setVideoRanges(state, videoFrames)
+
+    goodJob = ImageImport.VideoProbeJob(1, "/media/shot.mov", ["/media/shot.mov"], None)
+    failedJob = ImageImport.VideoProbeJob(1, "/media/other.mov", ["/media/other.mov"], None)
+    goodJob.frames = 48
+    state.videoProbeJobs = [goodJob, failedJob]
+
+    #   Ranges are only set once every probe of the import is finished
+    ImageImport.Image_ImportClass.onVideoProbed(state, goodJob)
+    assert state.importData["files"][0]["frame_end"] is None
+
+    ImageImport.Image_ImportClass.onVideoProbed(state, failedJob)
+    assert state.importData["files"][0]["frame_end"] == 48
+    assert state.importData["files"][1]["frame_end"] is None
+    assert Fus.getToolData(loader)["frame_end"] == 48
+    assert loader.GlobalOut[0] == 48
+    assert comp.undoSteps[-1] == "Set Video Ranges"